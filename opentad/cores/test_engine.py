@@ -1,12 +1,13 @@
 import os
 import copy
-import json
 import tqdm
 import torch
 import torch.distributed as dist
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 from opentad.utils import create_folder
-from opentad.models.utils.post_processing import build_classifier, batched_nms
+from opentad.models.utils.post_processing import build_classifier, batched_nms, DetectionResults
 from opentad.evaluations import build_evaluator
 from opentad.datasets.base import SlidingWindowDataset
 
@@ -70,9 +71,17 @@ def eval_one_epoch(
     # whether the testing dataset is sliding window
     cfg.post_processing.sliding_window = isinstance(test_loader.dataset, SlidingWindowDataset)
 
+    # post processing pool: the nms and result building of each batch run in the worker threads,
+    # overlapped with the forward of the next batches
+    num_workers = cfg.post_processing.get("num_workers", 0)
+    post_pool = PostProcessingPool(num_workers) if num_workers > 0 else None
+    extra_kwargs = dict(post_executor=post_pool) if post_pool is not None else {}
+
     # model forward
     model.eval()
-    result_dict = {}
+    result_dict = DetectionResults()
+    update_result_dict = result_dict.extend
+
     for data_dict in tqdm.tqdm(test_loader, disable=(rank != 0)):
         with torch.cuda.amp.autocast(dtype=torch.float16, enabled=use_amp):
             with torch.no_grad():
@@ -82,20 +91,25 @@ def eval_one_epoch(
                     infer_cfg=cfg.inference,
                     post_cfg=cfg.post_processing,
                     ext_cls=external_cls,
+                    **extra_kwargs,
                 )
 
         # update the result dict
-        for k, v in results.items():
-            if k in result_dict.keys():
-                result_dict[k].extend(v)
-            else:
-                result_dict[k] = v
+        if post_pool is not None:
+            for finished_results in post_pool.put(results):
+                update_result_dict(finished_results)
+        else:
+            update_result_dict(results)
 
         # 定期清理GPU缓存以避免OOM
-        if len(result_dict) > 0 and len(list(result_dict.values())[0]) % 10 == 0:
+        if len(result_dict.video_names) > 0 and len(result_dict.video_names) % 10 == 0:
             torch.cuda.empty_cache()
 
-    result_dict = gather_ddp_results(world_size, result_dict, cfg.post_processing)
+    if post_pool is not None:
+        for finished_results in post_pool.close():
+            update_result_dict(finished_results)
+
+    result_dict = gather_ddp_results(world_size, result_dict, cfg.post_processing, rank=rank, work_dir=cfg.work_dir)
 
     # load back the normal model dict
     if model_ema != None:
@@ -105,10 +119,10 @@ def eval_one_epoch(
 
     if rank == 0:
         result_eval = dict(results=result_dict)
-        if cfg.post_processing.save_dict:
-            result_path = os.path.join(cfg.work_dir, "result_detection.json")
-            with open(result_path, "w") as out:
-                json.dump(result_eval, out)
+        if cfg.post_processing.save_dict:  # the json format, {video_name: [dict(segment, label, score)]}
+            result_dict.save(os.path.join(cfg.work_dir, "result_detection.json"))
+        if cfg.post_processing.get("save_npz", False):  # the columnar format, much faster to save and load
+            result_dict.save(os.path.join(cfg.work_dir, "result_detection.npz"))
 
         if not not_eval:
             # build evaluator
@@ -119,44 +133,135 @@ def eval_one_epoch(
             evaluator.logging(logger)
 
 
-def gather_ddp_results(world_size, result_dict, post_cfg):
-    gather_dict_list = [None for _ in range(world_size)]
-    dist.all_gather_object(gather_dict_list, result_dict)
-    result_dict = {}
-    for i in range(world_size):  # update the result dict
-        for k, v in gather_dict_list[i].items():
-            if k in result_dict.keys():
-                result_dict[k].extend(v)
-            else:
-                result_dict[k] = v
+class PostProcessingPool:
+    """A bounded thread pool for the detection post processing, which collects the results in submission order.
+
+    The NMS extension releases the GIL, so the post processing of previous batches runs concurrently with the
+    forward of the next batch. At most max_pending batches are waiting, to bound the memory of the predictions.
+
+    Args:
+        num_workers (int): number of worker threads.
+        max_pending (int | None): the maximum number of unfinished batches. Default: 2 x num_workers.
+    """
+
+    def __init__(self, num_workers, max_pending=None):
+        self.executor = ThreadPoolExecutor(max_workers=num_workers, thread_name_prefix="post_processing")
+        self.max_pending = max_pending or 2 * num_workers
+        self.pending = deque()
+
+    def submit(self, fn, *args, **kwargs):
+        return self.executor.submit(fn, *args, **kwargs)
+
+    def put(self, future):
+        """Add the future of one batch, and return the finished results in order."""
+        self.pending.append(future)
+        finished = []
+        while len(self.pending) > self.max_pending or (len(self.pending) > 0 and self.pending[0].done()):
+            finished.append(self.pending.popleft().result())
+        return finished
+
+    def close(self):
+        """Wait for all the pending batches, and return their results in order."""
+        finished = [future.result() for future in self.pending]
+        self.pending.clear()
+        self.executor.shutdown()
+        return finished
+
+
+def gather_ddp_results(world_size, result_dict, post_cfg, rank=None, work_dir=None):
+    """Gather the DetectionResults of all ranks, and merge the sliding windows of each video by NMS.
+
+    The gather_mode in post_cfg decides how the results are sent:
+        - "tensor" (default): the names are gathered as objects, and the detections as one packed float64 tensor.
+        - "file": each rank saves its shard in work_dir, and rank 0 loads all of them.
+        - "object": all_gather_object of the DetectionResults.
+    If rank is given, only rank 0 merges the results, and the other ranks return their local results.
+    """
+    gather_mode = post_cfg.get("gather_mode", "tensor")
+    if gather_mode == "file":
+        assert work_dir is not None and rank is not None, "work_dir and rank are needed by the file gather_mode"
+        result_dict = gather_results_by_file(world_size, result_dict, rank, work_dir)
+    elif gather_mode == "tensor":
+        result_dict = gather_results_by_tensor(world_size, result_dict)
+    else:
+        gather_dict_list = [None for _ in range(world_size)]
+        dist.all_gather_object(gather_dict_list, result_dict)
+        result_dict = DetectionResults()
+        for i in range(world_size):  # update the result dict
+            result_dict.extend(gather_dict_list[i])
+
+    if rank is not None and rank != 0:
+        return result_dict
 
     # do nms for sliding window, if needed
     if post_cfg.sliding_window == True and post_cfg.nms is not None:
-        # assert sliding_window=True
-        tmp_result_dict = {}
-        for k, v in result_dict.items():
-            segments = torch.Tensor([data["segment"] for data in v])
-            scores = torch.Tensor([data["score"] for data in v])
-            labels = []
-            class_idx = []
-            for data in v:
-                if data["label"] not in class_idx:
-                    class_idx.append(data["label"])
-                labels.append(class_idx.index(data["label"]))
-            labels = torch.Tensor(labels)
-
-            segments, scores, labels = batched_nms(segments, scores, labels, **post_cfg.nms)
-
-            results_per_video = []
-            for segment, label, score in zip(segments, labels, scores):
-                # convert to python scalars
-                results_per_video.append(
-                    dict(
-                        segment=[round(seg.item(), 2) for seg in segment],
-                        label=class_idx[int(label.item())],
-                        score=round(score.item(), 4),
-                    )
-                )
-            tmp_result_dict[k] = results_per_video
-        result_dict = tmp_result_dict
+        result_dict = merge_sliding_windows(result_dict, post_cfg.nms, post_cfg.get("num_workers", 0))
     return result_dict
+
+
+def gather_results_by_tensor(world_size, result_dict):
+    # the video / label names are small, the detections are packed into one tensor [N,5]
+    names_list = [None for _ in range(world_size)]
+    dist.all_gather_object(names_list, (result_dict.video_names, result_dict.label_names))
+
+    if dist.get_backend() == "nccl":
+        device = torch.device("cuda", torch.cuda.current_device())
+    else:
+        device = torch.device("cpu")
+    packed = torch.from_numpy(result_dict.pack()).to(device)
+
+    # all_gather needs the same shape on all ranks, so pad to the max size
+    size = torch.tensor([packed.shape[0]], dtype=torch.long, device=device)
+    size_list = [torch.zeros_like(size) for _ in range(world_size)]
+    dist.all_gather(size_list, size)
+    size_list = [int(size.item()) for size in size_list]
+
+    padded = packed.new_zeros((max(max(size_list), 1), 5))
+    padded[: packed.shape[0]] = packed
+    padded_list = [torch.empty_like(padded) for _ in range(world_size)]
+    dist.all_gather(padded_list, padded)
+
+    result_dict = DetectionResults()
+    for (video_names, label_names), size, padded in zip(names_list, size_list, padded_list):
+        result_dict.extend(DetectionResults.from_packed(video_names, label_names, padded[:size].cpu().numpy()))
+    return result_dict
+
+
+def gather_results_by_file(world_size, result_dict, rank, work_dir):
+    # each rank saves its shard, then rank 0 loads and removes all the shards
+    shard_path = os.path.join(work_dir, "result_shard_rank{}.npz")
+    result_dict.save(shard_path.format(rank))
+    dist.barrier()
+    if rank != 0:
+        return result_dict
+
+    result_dict = DetectionResults()
+    for i in range(world_size):
+        result_dict.extend(DetectionResults.load(shard_path.format(i)))
+        os.remove(shard_path.format(i))
+    return result_dict
+
+
+def merge_sliding_windows(result_dict, nms_cfg, num_workers=0):
+    """Run the NMS on the detections of all windows of each video, in parallel across videos if num_workers > 0.
+    The labels are the global label ids of the DetectionResults, so they are not encoded again per video."""
+    segments = torch.from_numpy(result_dict.segments).float()
+    scores = torch.from_numpy(result_dict.scores).float()
+    labels = torch.from_numpy(result_dict.label_ids)
+
+    def video_nms(inds):
+        inds = torch.from_numpy(inds)
+        return batched_nms(segments[inds], scores[inds], labels[inds], **nms_cfg)
+
+    video_inds = result_dict.split_by_video()
+    if num_workers > 0:  # the nms extension releases the GIL
+        with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            outputs = list(executor.map(video_nms, video_inds))
+    else:
+        outputs = [video_nms(inds) for inds in video_inds]
+
+    merged_dict = DetectionResults()
+    merged_dict.get_label_ids(result_dict.label_names)  # keep the same label ids
+    for video_name, (video_segments, video_scores, video_labels) in zip(result_dict.video_names, outputs):
+        merged_dict.add_label_ids(video_name, video_segments, video_labels, video_scores)
+    return merged_dict
@@ -1,4 +1,5 @@
 from .builder import build_dataset, build_dataloader
+from .samplers import LengthBucketBatchSampler, VideoAffinityBatchSampler
 from .transforms import *
 from .base import *
 from .anet import AnetResizeDataset, AnetPaddingDataset, AnetSlidingDataset
@@ -9,6 +10,8 @@ from .epic_kitchens import EpicKitchensSlidingDataset, EpicKitchensPaddingDatase
 __all__ = [
     "build_dataset",
     "build_dataloader",
+    "LengthBucketBatchSampler",
+    "VideoAffinityBatchSampler",
     "AnetResizeDataset",
     "AnetPaddingDataset",
     "AnetSlidingDataset",
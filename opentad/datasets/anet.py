@@ -40,6 +40,7 @@ class AnetResizeDataset(ResizeDataset):
             dict(
                 video_name=video_name,
                 data_path=self.data_path,
+                **self.get_video_meta(video_name),
                 resize_length=self.resize_length,
                 sample_stride=self.sample_stride,
                 # resize post process setting
@@ -96,6 +97,7 @@ class AnetPaddingDataset(PaddingDataset):
             dict(
                 video_name=video_name,
                 data_path=self.data_path,
+                **self.get_video_meta(video_name),
                 sample_stride=self.sample_stride,
                 snippet_stride=self.snippet_stride,
                 # if fps is not set, use the original fps
@@ -153,6 +155,7 @@ class AnetSlidingDataset(SlidingWindowDataset):
             dict(
                 video_name=video_name,
                 data_path=self.data_path,
+                **self.get_video_meta(video_name),
                 window_size=self.window_size,
                 # trunc window setting
                 feature_start_idx=int(window_snippet_centers[0] / self.snippet_stride),
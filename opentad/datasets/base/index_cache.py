@@ -0,0 +1,70 @@
+import hashlib
+import json
+import os
+import pickle
+
+# bump this version if the data_list format or the annotation parsing is changed
+INDEX_CACHE_VERSION = 1
+
+
+def get_index_cache_path(dataset, cache_dir, params):
+    """The cache file is keyed by the hash of the dataset class, annotation file content, subset,
+    class map, block list, and the dataset parameters which affect the data_list."""
+    hasher = hashlib.sha1()
+    hasher.update(f"v{INDEX_CACHE_VERSION}".encode())
+    hasher.update(f"{type(dataset).__module__}.{type(dataset).__qualname__}".encode())
+
+    with open(dataset.ann_file, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            hasher.update(chunk)
+
+    if dataset.block_list is None or isinstance(dataset.block_list, list):
+        blocked_videos = dataset.block_list
+    else:
+        with open(dataset.block_list, "r") as f:
+            blocked_videos = [line.rstrip("\n") for line in f]
+
+    key_info = dict(
+        subset_name=dataset.subset_name,
+        class_map=dataset.class_map,
+        block_list=blocked_videos,
+        **params,
+    )
+    hasher.update(json.dumps(key_info, sort_keys=True, default=str).encode())
+
+    subset_name = dataset.subset_name if isinstance(dataset.subset_name, str) else "_".join(dataset.subset_name)
+    file_name = f"{type(dataset).__name__}_{subset_name}_{hasher.hexdigest()[:16]}.pkl"
+    return os.path.join(cache_dir, file_name)
+
+
+def load_or_build_data_list(dataset, build_fn, cache_dir, params):
+    """Load the compiled data_list from the index cache, or build it by `build_fn` and save it.
+
+    Args:
+        dataset: the dataset instance, which has ann_file, subset_name, class_map, block_list and logger.
+        build_fn (callable): function to build the data_list from the annotation file.
+        cache_dir (str): folder to save the index cache.
+        params (dict): the dataset parameters which affect the data_list.
+    """
+    cache_path = get_index_cache_path(dataset, cache_dir, params)
+
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, "rb") as f:
+                index = pickle.load(f)
+            if index["version"] == INDEX_CACHE_VERSION:
+                dataset.logger(f"Load {dataset.subset_name} data list from index cache {cache_path}")
+                return index["data_list"]
+        except Exception as e:  # broken cache file, rebuild it
+            dataset.logger(f"Failed to load index cache {cache_path}: {e}, rebuilding it.")
+
+    data_list = build_fn()
+
+    # write to a temporary file first, since multiple ranks may build the same cache at the same time
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(dict(version=INDEX_CACHE_VERSION, data_list=data_list), f, pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, cache_path)
+    dataset.logger(f"Save {dataset.subset_name} data list to index cache {cache_path}")
+    return data_list
@@ -2,6 +2,8 @@ import json
 import os
 import numpy as np
 from ..builder import DATASETS, get_class_index
+from .index_cache import load_or_build_data_list
+from .util import load_video_meta, get_video_meta
 from mmengine.dataset import Compose
 
 
@@ -20,6 +22,8 @@ class ResizeDataset:
         test_mode=False,  # if True, running on test mode with no annotation
         resize_length=128,  # the length of the resized video
         sample_stride=1,  # if you want to extract the feature[::sample_stride]
+        video_meta=None,  # path of the video metadata index, so the E2E pipeline does not open the video to read meta
+        cache_dir=None,  # if set, the parsed data list will be cached in this folder for faster startup
         logger=None,
     ):
         super(ResizeDataset, self).__init__()
@@ -29,6 +33,8 @@ class ResizeDataset:
         self.block_list = block_list
         self.ann_file = ann_file
         self.subset_name = subset_name
+        self.cache_dir = cache_dir
+        self.video_meta = load_video_meta(video_meta)
         self.logger = logger.info if logger != None else print
         self.class_map = self.get_class_map(class_map)
         self.class_agnostic = class_agnostic
@@ -40,8 +46,38 @@ class ResizeDataset:
 
         self.get_dataset()
         self.logger(f"{self.subset_name} subset: {len(self.data_list)} videos")
+        self.preload_feats()
+
+    def preload_feats(self):
+        # build the shared-memory feature arena for the loading transforms with preload=True
+        for transform in self.pipeline.transforms:
+            if getattr(transform, "preload", False):
+                video_names = list(dict.fromkeys(data[0] for data in self.data_list))
+                transform.build_arena(video_names, self.data_path, self.logger)
 
     def get_dataset(self):
+        if self.cache_dir is not None:
+            self.data_list = load_or_build_data_list(
+                self,
+                self.build_data_list,
+                self.cache_dir,
+                self.get_index_params(),
+            )
+        else:
+            self.data_list = self.build_data_list()
+        assert len(self.data_list) > 0, f"No data found in {self.subset_name} subset."
+
+    def get_index_params(self):
+        # the parameters which affect the data list, used as the key of the index cache
+        return dict(
+            filter_gt=self.filter_gt,
+            class_agnostic=self.class_agnostic,
+            test_mode=self.test_mode,
+            resize_length=self.resize_length,
+            sample_stride=self.sample_stride,
+        )
+
+    def build_data_list(self):
         with open(self.ann_file, "r") as f:
             anno_database = json.load(f)["database"]
 
@@ -55,7 +91,7 @@ class ResizeDataset:
         else:
             blocked_videos = []
 
-        self.data_list = []
+        data_list = []
         for video_name, video_info in anno_database.items():
             if (video_name in blocked_videos) or (video_info["subset"] not in self.subset_name):
                 continue
@@ -68,8 +104,11 @@ class ResizeDataset:
                 if video_anno == None:  # have no valid gt
                     continue
 
-            self.data_list.append([video_name, video_info, video_anno])
-        assert len(self.data_list) > 0, f"No data found in {self.subset_name} subset."
+            data_list.append([video_name, video_info, video_anno])
+        return data_list
+
+    def get_video_meta(self, video_name):
+        return get_video_meta(self.video_meta, video_name)
 
     def get_class_map(self, class_map_path):
         if not os.path.exists(class_map_path):
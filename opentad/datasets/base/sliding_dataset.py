@@ -4,6 +4,8 @@ import numpy as np
 from mmengine.dataset import Compose
 
 from ..builder import DATASETS, get_class_index
+from .index_cache import load_or_build_data_list
+from .util import load_video_meta, get_video_meta
 
 
 @DATASETS.register_module()
@@ -28,6 +30,8 @@ class SlidingWindowDataset:
         window_overlap_ratio=0.25,  # the overlap ratio of two adjacent windows
         ioa_thresh=0.75,  # the threshold of the completeness of the gt inside the window
         fps=-1,  # some annotations are based on video-seconds
+        video_meta=None,  # path of the video metadata index, so the E2E pipeline does not open the video to read meta
+        cache_dir=None,  # if set, the parsed data list will be cached in this folder for faster startup
         logger=None,
     ):
         super(SlidingWindowDataset, self).__init__()
@@ -37,6 +41,8 @@ class SlidingWindowDataset:
         self.block_list = block_list
         self.ann_file = ann_file
         self.subset_name = subset_name
+        self.cache_dir = cache_dir
+        self.video_meta = load_video_meta(video_meta)
         self.logger = logger.info if logger != None else print
         self.class_map = self.get_class_map(class_map)
         self.class_agnostic = class_agnostic
@@ -61,8 +67,43 @@ class SlidingWindowDataset:
             f"{self.subset_name} subset: {len(set([data[0] for data in self.data_list]))} videos, "
             f"truncated as {len(self.data_list)} windows."
         )
+        self.preload_feats()
+
+    def preload_feats(self):
+        # build the shared-memory feature arena for the loading transforms with preload=True
+        for transform in self.pipeline.transforms:
+            if getattr(transform, "preload", False):
+                video_names = list(dict.fromkeys(data[0] for data in self.data_list))
+                transform.build_arena(video_names, self.data_path, self.logger)
 
     def get_dataset(self):
+        if self.cache_dir is not None:
+            self.data_list = load_or_build_data_list(
+                self,
+                self.build_data_list,
+                self.cache_dir,
+                self.get_index_params(),
+            )
+        else:
+            self.data_list = self.build_data_list()
+        assert len(self.data_list) > 0, f"No data found in {self.subset_name} subset."
+
+    def get_index_params(self):
+        # the parameters which affect the data list, used as the key of the index cache
+        return dict(
+            filter_gt=self.filter_gt,
+            class_agnostic=self.class_agnostic,
+            test_mode=self.test_mode,
+            feature_stride=self.feature_stride,
+            sample_stride=self.sample_stride,
+            offset_frames=self.offset_frames,
+            fps=self.fps,
+            window_size=self.window_size,
+            window_stride=self.window_stride,
+            ioa_thresh=self.ioa_thresh,
+        )
+
+    def build_data_list(self):
         with open(self.ann_file, "r") as f:
             anno_database = json.load(f)["database"]
 
@@ -76,7 +117,7 @@ class SlidingWindowDataset:
         else:
             blocked_videos = []
 
-        self.data_list = []
+        data_list = []
         for video_name, video_info in anno_database.items():
             if (video_name in blocked_videos) or (video_info["subset"] not in self.subset_name):
                 continue
@@ -90,8 +131,8 @@ class SlidingWindowDataset:
                     continue
 
             tmp_data_list = self.split_video_to_windows(video_name, video_info, video_anno)
-            self.data_list.extend(tmp_data_list)
-        assert len(self.data_list) > 0, f"No data found in {self.subset_name} subset."
+            data_list.extend(tmp_data_list)
+        return data_list
 
     def split_video_to_windows(self, video_name, video_info, video_anno):
         # need: video frame, video duration, video fps
@@ -103,60 +144,42 @@ class SlidingWindowDataset:
         video_snippet_centers = np.arange(0, num_frames, self.snippet_stride)
         snippet_num = len(video_snippet_centers)
 
-        data_list = []
-        last_window = False  # whether it is the last window
+        # compute all the windows of this video at once
+        window_starts, window_ends = compute_windows(snippet_num, self.window_size, self.window_stride)
 
-        for idx in range(max(1, snippet_num // self.window_stride)):  # at least one window
-            window_start = idx * self.window_stride
-            window_end = window_start + self.window_size
+        if (video_anno != {}) and (self.ioa_thresh > 0):
+            gt_segments = video_anno["gt_segments"]
+            gt_labels = video_anno["gt_labels"]
+            anchors = np.stack(
+                [video_snippet_centers[window_starts], video_snippet_centers[window_ends - 1]],
+                axis=1,
+            )  # [W,2]
 
-            if window_end > snippet_num:  # this is the last window
-                window_end = snippet_num
-                window_start = max(0, window_end - self.window_size)
-                last_window = True
+            # truncate the gt segments inside each window and compute the completeness, [W,N] and [W,N,2]
+            gt_completeness, truncated_gt = compute_gt_completeness_batched(gt_segments, anchors)
+            valid_idxs = gt_completeness > self.ioa_thresh
+            has_gt = valid_idxs.any(axis=1)
 
-            window_snippet_centers = video_snippet_centers[window_start:window_end]
-            window_start_frame = window_snippet_centers[0]
-            window_end_frame = window_snippet_centers[-1]
+        data_list = []
+        for idx in range(len(window_starts)):
+            window_snippet_centers = video_snippet_centers[window_starts[idx] : window_ends[idx]]
 
             if (video_anno != {}) and (self.ioa_thresh > 0):
-                gt_segments = video_anno["gt_segments"]
-                gt_labels = video_anno["gt_labels"]
-                anchor = np.array([window_start_frame, window_end_frame])
-
-                # truncate the gt segments inside the window and compute the completeness
-                gt_completeness, truncated_gt = compute_gt_completeness(gt_segments, anchor)
-                valid_idx = gt_completeness > self.ioa_thresh
-
                 # only append window who has gt
-                if np.sum(valid_idx) > 0:
+                if has_gt[idx]:
+                    valid_idx = valid_idxs[idx]
                     window_anno = dict(
-                        gt_segments=truncated_gt[valid_idx],
+                        gt_segments=truncated_gt[idx][valid_idx],
                         gt_labels=gt_labels[valid_idx],
                     )
-                    data_list.append(
-                        [
-                            video_name,
-                            video_info,
-                            window_anno,
-                            window_snippet_centers,
-                        ]
-                    )
+                    data_list.append([video_name, video_info, window_anno, window_snippet_centers])
             else:
-                data_list.append(
-                    [
-                        video_name,
-                        video_info,
-                        video_anno,
-                        window_snippet_centers,
-                    ]
-                )
-
-            if last_window:  # the last window
-                break
-
+                data_list.append([video_name, video_info, video_anno, window_snippet_centers])
         return data_list
 
+    def get_video_meta(self, video_name):
+        return get_video_meta(self.video_meta, video_name)
+
     def get_class_map(self, class_map_path):
         if not os.path.exists(class_map_path):
             class_map = get_class_index(self.ann_file, class_map_path)
@@ -177,6 +200,57 @@ class SlidingWindowDataset:
         return len(self.data_list)
 
 
+def compute_windows(snippet_num, window_size, window_stride):
+    """Compute the start and end snippet index of all the windows in a video.
+    Same as the sliding loop: windows start every window_stride snippets, and the first window exceeding the
+    video is shifted to end at the video end and becomes the last window. There is at least one window.
+
+    Returns:
+        window_starts, window_ends: np.array shape [W], the window is [start, end)
+    """
+    num_windows = max(1, snippet_num // window_stride)
+    window_starts = np.arange(num_windows) * window_stride
+    window_ends = window_starts + window_size
+
+    exceed = np.nonzero(window_ends > snippet_num)[0]
+    if len(exceed) > 0:  # the last window
+        last = exceed[0]
+        window_starts = window_starts[: last + 1]
+        window_ends = window_ends[: last + 1]
+        window_ends[last] = snippet_num
+        window_starts[last] = max(0, snippet_num - window_size)
+    return window_starts, window_ends
+
+
+def compute_gt_completeness_batched(gt_boxes, anchors):
+    """Batched version of compute_gt_completeness for all the windows of a video.
+    The results are identical to calling compute_gt_completeness for each anchor.
+    Args:
+        gt_boxes: np.array shape [N, 2]
+        anchors:  np.array shape [W, 2]
+    Returns:
+        scores: np.array shape [W, N]
+        truncated_gt_boxes: np.array shape [W, N, 2]
+    """
+    # follow the dtype of the per-window computation, which broadcasts a scalar anchor with the gt array
+    dtype = np.maximum(gt_boxes[:1, 0], anchors[0, 0]).dtype
+    anchor_start = anchors[:, 0:1].astype(dtype)  # [W,1]
+    anchor_end = anchors[:, 1:2].astype(dtype)  # [W,1]
+    gt_start = gt_boxes[None, :, 0]  # [1,N]
+    gt_end = gt_boxes[None, :, 1]  # [1,N]
+
+    valid_idx = np.logical_and(gt_start < anchor_end, gt_end > anchor_start)  # [W,N]
+    truncated_start = np.maximum(gt_start, anchor_start)
+    truncated_end = np.minimum(gt_end, anchor_end)
+
+    truncated_gt_len = truncated_end - truncated_start
+    original_gt_len = np.maximum(gt_boxes[:, 1] - gt_boxes[:, 0], 1e-6)[None, :]
+    scores = np.where(valid_idx, (truncated_gt_len / original_gt_len).astype(np.float64), 0.0)
+
+    truncated_gt_boxes = np.stack([truncated_start, truncated_end], axis=2)
+    return scores, truncated_gt_boxes  # shape [W, N]
+
+
 def compute_gt_completeness(gt_boxes, anchors):
     """Compute the completeness of the gt_bboxes.
        GT will be first truncated by the anchor start/end, then the completeness is defined as the ratio of the truncated_gt_len / original_gt_len.
@@ -1,15 +1,16 @@
+import json
 import numpy as np
 
 
 def filter_same_annotation(annotation):
     gt_segments = []
     gt_labels = []
-    gt_both = []
+    gt_both = set()  # set for O(1) membership check
     for gt_segment, gt_label in zip(annotation["gt_segments"].tolist(), annotation["gt_labels"].tolist()):
-        if (gt_segment, gt_label) not in gt_both:
+        if (tuple(gt_segment), gt_label) not in gt_both:
             gt_segments.append(gt_segment)
             gt_labels.append(gt_label)
-            gt_both.append((gt_segment, gt_label))
+            gt_both.add((tuple(gt_segment), gt_label))
         else:
             continue
 
@@ -20,6 +21,28 @@ def filter_same_annotation(annotation):
     return annotation
 
 
+def load_video_meta(video_meta_file):
+    """Load the video metadata index built by `tools/prepare_data/build_video_meta.py`."""
+    if video_meta_file is None:
+        return None
+    with open(video_meta_file, "r") as f:
+        return json.load(f)["videos"]
+
+
+def get_video_meta(video_meta, video_name):
+    """Return the raw video metadata in the keys of the decord transforms, so that the pipeline does not need
+    to open the video container to get total_frames / avg_fps."""
+    if video_meta is None or video_name not in video_meta:
+        return {}
+    meta = video_meta[video_name]
+    return dict(
+        total_frames=meta["frames"],
+        avg_fps=meta["fps"],
+        video_resolution=(meta["height"], meta["width"]),
+        keyframe_inds=meta["keyframes"],
+    )
+
+
 if __name__ == "__main__":
     anno1 = dict(gt_segments=np.array([[3, 5], [3, 6], [3, 5]]), gt_labels=np.array([0, 1, 0]))
     print(filter_same_annotation(anno1))
@@ -1,11 +1,13 @@
 import json
 import torch
+from functools import partial
 from torch.utils.data.dataloader import default_collate
 from collections.abc import Sequence
 from mmengine.registry import Registry, build_from_cfg, TRANSFORMS
 
 DATASETS = Registry("dataset")
 PIPELINES = TRANSFORMS
+SAMPLERS = Registry("sampler")
 
 
 def build_dataset(cfg, default_args=None):
@@ -23,26 +25,56 @@ def build_dataset(cfg, default_args=None):
     return dataset
 
 
-def build_dataloader(dataset, batch_size, rank, world_size, shuffle=False, drop_last=False, **kwargs):
-    sampler = torch.utils.data.distributed.DistributedSampler(
-        dataset,
-        num_replicas=world_size,
-        rank=rank,
-        shuffle=shuffle,
-        drop_last=drop_last,
-    )
-
+def build_dataloader(
+    dataset,
+    batch_size,
+    rank,
+    world_size,
+    shuffle=False,
+    drop_last=False,
+    sampler=None,
+    dynamic_padding=False,
+    **kwargs,
+):
+    """Build the dataloader. By default, the DistributedSampler is used. A batch sampler registered in SAMPLERS
+    can be used instead by `sampler=dict(type="LengthBucketBatchSampler", ...)`.
+
+    If `dynamic_padding` is True or an int, the inputs and masks are padded to the longest sample in each batch
+    (rounded up to a multiple of the int) in collate, instead of a fixed length in the pipeline.
+    """
     assert batch_size % world_size == 0, f"batch size {batch_size} should be divided by world size {world_size}"
 
+    if sampler is None:
+        sampler = torch.utils.data.distributed.DistributedSampler(
+            dataset,
+            num_replicas=world_size,
+            rank=rank,
+            shuffle=shuffle,
+            drop_last=drop_last,
+        )
+        sampler_kwargs = {"batch_size": batch_size // world_size, "sampler": sampler}
+    else:
+        default_args = dict(
+            dataset=dataset,
+            batch_size=batch_size // world_size,
+            num_replicas=world_size,
+            rank=rank,
+            shuffle=shuffle,
+            drop_last=drop_last,
+        )
+        if getattr(SAMPLERS.get(sampler["type"]), "worker_aware", False):
+            default_args["num_workers"] = kwargs.get("num_workers", 0)
+        batch_sampler = build_from_cfg(sampler, SAMPLERS, default_args)
+        sampler_kwargs = {"batch_sampler": batch_sampler}
+
     # 从 kwargs 中获取 num_workers，用于条件设置
     num_workers = kwargs.get('num_workers', 0)
 
     # 构建 DataLoader 参数
     dataloader_kwargs = {
-        'batch_size': batch_size // world_size,
-        'collate_fn': collate,
+        'collate_fn': partial(collate, pad_divisor=int(dynamic_padding)) if dynamic_padding else collate,
         'pin_memory': True,
-        'sampler': sampler,
+        **sampler_kwargs,
     }
 
     # 只在 num_workers > 0 时设置 prefetch_factor 和 persistent_workers
@@ -67,11 +99,21 @@ def build_dataloader(dataset, batch_size, rank, world_size, shuffle=False, drop_
     return dataloader
 
 
-def collate(batch):
+def collate(batch, pad_divisor=None):
+    """Collate the samples. The inputs, masks and inputs_scale are stacked, and the others are kept as lists.
+
+    Args:
+        batch (list[dict]): the samples from the pipeline.
+        pad_divisor (int | None): if set, the inputs [C,T] and masks [T] of different lengths are padded at the end
+            to the longest sample in the batch, rounded up to a multiple of pad_divisor. Default: None.
+    """
     if not isinstance(batch, Sequence):
         raise TypeError(f"{batch.dtype} is not supported.")
 
-    gpu_stack_keys = ["inputs", "masks"]
+    if pad_divisor is not None and "masks" in batch[0]:
+        batch = pad_to_batch_max(batch, pad_divisor)
+
+    gpu_stack_keys = ["inputs", "masks", "inputs_scale"]
 
     collate_data = {}
     for key in batch[0]:
@@ -82,6 +124,22 @@ def collate(batch):
     return collate_data
 
 
+def pad_to_batch_max(batch, pad_divisor=1):
+    max_len = max(sample["masks"].shape[-1] for sample in batch)
+    max_len = (max_len + pad_divisor - 1) // pad_divisor * pad_divisor
+
+    padded_batch = []
+    for sample in batch:
+        pad_len = max_len - sample["masks"].shape[-1]
+        if pad_len > 0:
+            inputs, masks = sample["inputs"], sample["masks"]
+            sample = dict(sample)  # do not modify the original sample
+            sample["inputs"] = torch.cat([inputs, inputs.new_zeros(inputs.shape[:-1] + (pad_len,))], dim=-1)
+            sample["masks"] = torch.cat([masks.bool(), masks.new_zeros(pad_len, dtype=torch.bool)], dim=-1)
+        padded_batch.append(sample)
+    return padded_batch
+
+
 def get_class_index(gt_json_path, class_map_path):
     with open(gt_json_path, "r") as f:
         anno = json.load(f)
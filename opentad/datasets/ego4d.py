@@ -38,6 +38,7 @@ class Ego4DPaddingDataset(PaddingDataset):
             dict(
                 video_name=video_name,
                 data_path=self.data_path,
+                **self.get_video_meta(video_name),
                 sample_stride=self.sample_stride,
                 snippet_stride=self.snippet_stride,
                 fps=video_info["frame"] / video_info["duration"],
@@ -82,6 +83,7 @@ class Ego4DResizeDataset(ResizeDataset):
             dict(
                 video_name=video_name,
                 data_path=self.data_path,
+                **self.get_video_meta(video_name),
                 resize_length=self.resize_length,
                 sample_stride=self.sample_stride,
                 fps=-1,
@@ -126,6 +128,7 @@ class Ego4DSlidingDataset(SlidingWindowDataset):
             dict(
                 video_name=video_name,
                 data_path=self.data_path,
+                **self.get_video_meta(video_name),
                 window_size=self.window_size,
                 # trunc window setting
                 feature_start_idx=int(window_snippet_centers[0] / self.snippet_stride),
@@ -38,6 +38,7 @@ class EpicKitchensPaddingDataset(PaddingDataset):
             dict(
                 video_name=video_name,
                 data_path=self.data_path,
+                **self.get_video_meta(video_name),
                 sample_stride=self.sample_stride,
                 snippet_stride=self.snippet_stride,
                 fps=self.fps,
@@ -83,6 +84,7 @@ class EpicKitchensSlidingDataset(SlidingWindowDataset):
             dict(
                 video_name=video_name,
                 data_path=self.data_path,
+                **self.get_video_meta(video_name),
                 window_size=self.window_size,
                 # trunc window setting
                 feature_start_idx=int(window_snippet_centers[0] / self.snippet_stride),
@@ -0,0 +1,255 @@
+import math
+import numpy as np
+from torch.utils.data import Sampler
+
+from .builder import SAMPLERS
+
+
+@SAMPLERS.register_module()
+class LengthBucketBatchSampler(Sampler):
+    """Distributed batch sampler which groups videos of similar feature length into the same batch.
+
+    In each epoch, the shuffled indices are split into buckets of `bucket_size` global batches, and sorted by
+    length inside each bucket. Then each bucket is cut into global batches (batch_size x num_replicas samples),
+    each rank takes its contiguous part, and the order of global batches is shuffled. All the randomness is seeded
+    by seed + epoch, so all the ranks get the same plan without communication.
+
+    The lengths are read from `dataset.get_data_lengths()`, which is estimated from the annotation instead of
+    opening the feature files.
+
+    Args:
+        dataset: the dataset, which should implement get_data_lengths().
+        batch_size (int): batch size per rank.
+        num_replicas (int): world size.
+        rank (int): rank of current process.
+        shuffle (bool): whether to shuffle. If False, the videos are only sorted by length for less padding.
+        drop_last (bool): drop the last incomplete global batch. Otherwise, it is filled by repeating samples.
+        seed (int): random seed, should be the same across ranks.
+        bucket_size (int): number of global batches in a bucket. Larger buckets give less padding but less
+            randomness. Default: 32.
+        max_length (int | None): clip the lengths, e.g. the trunc_len of RandomTrunc. Default: None.
+    """
+
+    def __init__(
+        self,
+        dataset,
+        batch_size,
+        num_replicas=1,
+        rank=0,
+        shuffle=True,
+        drop_last=False,
+        seed=0,
+        bucket_size=32,
+        max_length=None,
+    ):
+        assert hasattr(dataset, "get_data_lengths"), f"{type(dataset).__name__} should implement get_data_lengths()"
+        self.lengths = np.asarray(dataset.get_data_lengths(), dtype=np.int64)
+        if max_length is not None:
+            self.lengths = np.minimum(self.lengths, max_length)
+
+        self.batch_size = batch_size
+        self.num_replicas = num_replicas
+        self.rank = rank
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+        self.seed = seed
+        self.bucket_size = bucket_size
+        self.epoch = 0
+        self.padding_efficiency = None  # of the last iterated epoch
+
+        self.global_batch_size = self.batch_size * self.num_replicas
+        if self.drop_last:
+            self.num_batches = len(self.lengths) // self.global_batch_size
+        else:
+            self.num_batches = math.ceil(len(self.lengths) / self.global_batch_size)
+
+    def set_epoch(self, epoch):
+        self.epoch = epoch
+
+    def get_global_batches(self, bucketing=True):
+        """Return the list of global batches of current epoch, each is an array of global_batch_size indices."""
+        rng = np.random.default_rng(self.seed + self.epoch)
+        if self.shuffle:
+            indices = rng.permutation(len(self.lengths))
+        else:
+            indices = np.arange(len(self.lengths))
+
+        # make the number of samples divisible by the global batch size
+        total_size = self.num_batches * self.global_batch_size
+        if total_size > len(indices):
+            repeat = math.ceil(total_size / len(indices))
+            indices = np.tile(indices, repeat)
+        indices = indices[:total_size]
+
+        if bucketing:
+            if self.shuffle:  # sort inside each bucket
+                bucket_len = self.bucket_size * self.global_batch_size
+                buckets = [indices[i : i + bucket_len] for i in range(0, total_size, bucket_len)]
+                indices = np.concatenate([b[np.argsort(self.lengths[b], kind="stable")] for b in buckets])
+            else:  # sort the whole dataset
+                indices = indices[np.argsort(self.lengths[indices], kind="stable")]
+
+        batches = indices.reshape(self.num_batches, self.global_batch_size)
+        if self.shuffle:
+            batches = batches[rng.permutation(self.num_batches)]
+        return batches
+
+    def __iter__(self):
+        global_batches = self.get_global_batches()
+        self.padding_efficiency = self.get_padding_efficiency(global_batches)  # from the batches of this epoch
+        for global_batch in global_batches:
+            start = self.rank * self.batch_size
+            yield global_batch[start : start + self.batch_size].tolist()
+
+    def __len__(self):
+        return self.num_batches
+
+    def get_padding_efficiency(self, global_batches):
+        """Valid length / padded length of the global batches, where each per-rank batch is padded to its
+        longest video."""
+        batches = global_batches.reshape(-1, self.batch_size)  # per-rank batches
+        lengths = self.lengths[batches]
+        return float(lengths.sum() / max(1, (lengths.max(axis=1) * self.batch_size).sum()))
+
+    def padding_stats(self):
+        """Padding efficiency of current epoch, compared with the same batches without bucketing. It builds the
+        batches of the epoch twice, so it is only logged once at startup."""
+        return dict(
+            num_batches=self.num_batches,
+            padding_efficiency=self.get_padding_efficiency(self.get_global_batches(bucketing=True)),
+            padding_efficiency_no_bucket=self.get_padding_efficiency(self.get_global_batches(bucketing=False)),
+        )
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(epoch={self.epoch}, batches={self.num_batches}, "
+            f"bucket_size={self.bucket_size}, padding_efficiency={self.padding_efficiency})"
+        )
+
+
+@SAMPLERS.register_module()
+class VideoAffinityBatchSampler(Sampler):
+    """Distributed batch sampler which keeps all the windows of one video on the same rank and DataLoader worker.
+
+    The videos are assigned to num_replicas x num_workers streams, balanced by the number of windows. Each stream
+    yields the windows of its videos contiguously, and the streams of a rank are interleaved in round-robin, since
+    the DataLoader sends the k-th batch to the (k % num_workers)-th worker. Therefore, per-worker caches (e.g. the
+    FeatureCache in LoadFeats) are hit by all the following windows of a video.
+
+    All the streams are cut into the same number of batches, so that the k-th batch of each rank is always loaded
+    by the same worker, and all the ranks yield the same number of batches. Without drop_last, each stream is split
+    into batches of at most batch_size windows, and a stream with fewer windows than batches repeats its windows.
+    With drop_last, each stream is cut into full batches, the tail windows of the long streams are dropped, and the
+    short streams repeat their windows.
+
+    Args:
+        dataset: the dataset, whose data_list[i][0] is the video name of the i-th sample.
+        batch_size (int): batch size per rank.
+        num_replicas (int): world size.
+        rank (int): rank of current process.
+        shuffle (bool): whether to shuffle the order of videos in each epoch.
+        drop_last (bool): drop the last incomplete batch of each stream.
+        seed (int): random seed, should be the same across ranks.
+        num_workers (int): number of DataLoader workers, passed by build_dataloader. Default: 0.
+        shuffle_windows (bool): whether to also shuffle the windows inside each video. Default: False.
+    """
+
+    worker_aware = True  # build_dataloader passes num_workers to this sampler
+
+    def __init__(
+        self,
+        dataset,
+        batch_size,
+        num_replicas=1,
+        rank=0,
+        shuffle=True,
+        drop_last=False,
+        seed=0,
+        num_workers=0,
+        shuffle_windows=False,
+    ):
+        self.batch_size = batch_size
+        self.num_replicas = num_replicas
+        self.rank = rank
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+        self.seed = seed
+        self.num_workers = max(1, num_workers)
+        self.shuffle_windows = shuffle_windows
+        self.epoch = 0
+
+        # group the sample indices by video, keeping the window order
+        video_windows = {}
+        for idx, data in enumerate(dataset.data_list):
+            video_windows.setdefault(data[0], []).append(idx)
+        self.video_windows = [np.asarray(indices, dtype=np.int64) for indices in video_windows.values()]
+        self.num_samples = len(dataset.data_list)
+
+    def set_epoch(self, epoch):
+        self.epoch = epoch
+
+    def get_streams(self):
+        """Return the window indices of each stream, indexed by [rank][worker]."""
+        rng = np.random.default_rng(self.seed + self.epoch)
+        video_order = rng.permutation(len(self.video_windows)) if self.shuffle else range(len(self.video_windows))
+
+        # greedily assign each video to the stream with the fewest windows
+        num_streams = self.num_replicas * self.num_workers
+        loads = np.zeros(num_streams, dtype=np.int64)
+        streams = [[] for _ in range(num_streams)]
+        for video_idx in video_order:
+            windows = self.video_windows[video_idx]
+            if self.shuffle and self.shuffle_windows:
+                windows = windows[rng.permutation(len(windows))]
+            stream_idx = int(np.argmin(loads))
+            streams[stream_idx].append(windows)
+            loads[stream_idx] += len(windows)
+
+        streams = [np.concatenate(s) if len(s) > 0 else np.zeros(0, dtype=np.int64) for s in streams]
+        return [streams[r * self.num_workers : (r + 1) * self.num_workers] for r in range(self.num_replicas)]
+
+    def get_num_batches(self, streams):
+        """Number of batches of each stream."""
+        if self.drop_last:
+            if self.num_samples < self.batch_size * self.num_replicas:
+                return 0
+            return max(1, self.num_samples // (self.batch_size * len(streams)))
+        return max(-(-len(stream) // self.batch_size) for stream in streams)
+
+    def get_all_batches(self):
+        """Return the batches of each rank, where the k-th batch is loaded by the (k % num_workers)-th worker."""
+        streams = [stream for worker_streams in self.get_streams() for stream in worker_streams]
+        num_batches = self.get_num_batches(streams)
+        fallback = next(stream for stream in streams if len(stream) > 0)  # for the empty streams
+
+        stream_batches = []
+        for stream in streams:
+            if len(stream) == 0:
+                stream = fallback
+            if self.drop_last:  # truncate or repeat the stream to full batches
+                stream = np.resize(stream, num_batches * self.batch_size)
+                stream_batches.append(np.split(stream, num_batches) if num_batches > 0 else [])
+            else:
+                if len(stream) < num_batches:  # at least one window in each batch
+                    stream = np.resize(stream, num_batches)
+                stream_batches.append(np.array_split(stream, num_batches))
+
+        # interleave the workers of each rank in round-robin, as the DataLoader sends the batches to the workers
+        all_batches = []
+        for r in range(self.num_replicas):
+            worker_batches = stream_batches[r * self.num_workers : (r + 1) * self.num_workers]
+            all_batches.append([batches[k].tolist() for k in range(num_batches) for batches in worker_batches])
+        return all_batches
+
+    def __iter__(self):
+        yield from self.get_all_batches()[self.rank]
+
+    def __len__(self):
+        streams = [stream for worker_streams in self.get_streams() for stream in worker_streams]
+        return self.get_num_batches(streams) * self.num_workers
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(epoch={self.epoch}, videos={len(self.video_windows)}, "
+            f"windows={self.num_samples}, streams={self.num_replicas}x{self.num_workers})"
+        )
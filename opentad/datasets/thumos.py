@@ -42,6 +42,7 @@ class ThumosSlidingDataset(SlidingWindowDataset):
             dict(
                 video_name=video_name,
                 data_path=self.data_path,
+                **self.get_video_meta(video_name),
                 window_size=self.window_size,
                 # trunc window setting
                 feature_start_idx=int(window_snippet_centers[0] / self.snippet_stride),
@@ -96,6 +97,7 @@ class ThumosPaddingDataset(PaddingDataset):
             dict(
                 video_name=video_name,
                 data_path=self.data_path,
+                **self.get_video_meta(video_name),
                 sample_stride=self.sample_stride,
                 snippet_stride=self.snippet_stride,
                 fps=video_info["frame"] / video_info["duration"],
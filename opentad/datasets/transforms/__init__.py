@@ -1,6 +1,9 @@
 from .loading import LoadFeats, SlidingWindowTrunc, RandomTrunc
 from .formatting import Collect, ConvertToTensor, Rearrange, Reduce, Padding, ChannelReduction
-from .end_to_end import PrepareVideoInfo, LoadSnippetFrames, LoadFrames
+from .end_to_end import PrepareVideoInfo, LoadSnippetFrames, LoadFrames, ClipKey
+from .frame_cache import CachedDecordInit, CachedDecordDecode
+from .frame_store import FrameStoreInit, FrameStoreDecode
+from .augmentation import TensorResize, TensorRandomResizedCrop, TensorCenterCrop, TensorFlip, TensorFormatShape
 
 __all__ = [
     "LoadFeats",
@@ -15,4 +18,14 @@ __all__ = [
     "PrepareVideoInfo",
     "LoadSnippetFrames",
     "LoadFrames",
+    "ClipKey",
+    "CachedDecordInit",
+    "CachedDecordDecode",
+    "FrameStoreInit",
+    "FrameStoreDecode",
+    "TensorResize",
+    "TensorRandomResizedCrop",
+    "TensorCenterCrop",
+    "TensorFlip",
+    "TensorFormatShape",
 ]
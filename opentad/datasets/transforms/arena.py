@@ -0,0 +1,53 @@
+import torch
+
+
+class FeatureArena:
+    """All the features of a dataset packed in one shared-memory tensor, with an index of each video.
+
+    The arena is built once in the main process. Since the storage is in shared memory, DataLoader workers
+    (either forked or spawned) access the same memory, and `get` returns a zero-copy view of the video features.
+    It is meant for small feature datasets which fit in RAM, such as THUMOS / Multi-THUMOS.
+
+    The returned views are shared by all the workers and epochs, see the note of FeatureCache.
+
+    Args:
+        feats_list (list[tuple[str, np.ndarray | Tensor]]): the video names and features, the features
+            should have the same dtype and the same shape except the first (temporal) dim.
+    """
+
+    def __init__(self, feats_list):
+        assert len(feats_list) > 0, "no features to build the arena"
+        first = torch.as_tensor(feats_list[0][1])
+        total_len = sum(feats.shape[0] for _, feats in feats_list)
+
+        self.storage = torch.empty((total_len,) + tuple(first.shape[1:]), dtype=first.dtype)
+        self.index = {}
+
+        start = 0
+        for i, (video_name, feats) in enumerate(feats_list):
+            feats = torch.as_tensor(feats)
+            assert feats.shape[1:] == first.shape[1:], f"feature shape of {video_name} mismatches: {feats.shape}"
+            end = start + feats.shape[0]
+            self.storage[start:end] = feats
+            self.index[video_name] = (start, end)
+            feats_list[i] = None  # release the memory as soon as it is copied
+            start = end
+
+        self.storage.share_memory_()
+
+    def get(self, video_name):
+        start, end = self.index[video_name]
+        return self.storage[start:end]
+
+    @property
+    def nbytes(self):
+        return self.storage.element_size() * self.storage.nelement()
+
+    def __contains__(self, video_name):
+        return video_name in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(videos={len(self)}, memory={self.nbytes / 1024**2:.1f}MB)"
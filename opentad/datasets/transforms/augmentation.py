@@ -0,0 +1,239 @@
+import random
+import numpy as np
+import torch
+from torch.nn import functional as F
+
+from ..builder import PIPELINES
+
+
+def to_frames_tensor(imgs):
+    """Stack the decoded frames into one uint8 tensor [T,H,W,C], the tensor input is returned as it is."""
+    if isinstance(imgs, torch.Tensor):
+        return imgs
+    if isinstance(imgs, np.ndarray):
+        return torch.from_numpy(imgs)
+    return torch.from_numpy(np.stack(imgs))
+
+
+def resize_frames(imgs, size, interpolation="bilinear", chunk_size=128):
+    """Resize the frames [T,H,W,C] to size (h, w) in chunks of frames, the dtype is kept."""
+    if tuple(imgs.shape[1:3]) == tuple(size):
+        return imgs
+
+    out = torch.empty((imgs.shape[0], size[0], size[1], imgs.shape[3]), dtype=imgs.dtype)
+    kwargs = dict(align_corners=False) if interpolation in ["bilinear", "bicubic"] else {}
+    for start in range(0, imgs.shape[0], chunk_size):  # avoid converting the whole window to float at once
+        chunk = imgs[start : start + chunk_size].permute(0, 3, 1, 2).float()
+        chunk = F.interpolate(chunk, size=tuple(size), mode=interpolation, **kwargs)
+        if imgs.dtype == torch.uint8:
+            chunk = chunk.round_().clamp_(0, 255)
+        out[start : start + chunk_size] = chunk.permute(0, 2, 3, 1).to(imgs.dtype)
+    return out
+
+
+@PIPELINES.register_module()
+class TensorResize:
+    """Batched version of mmaction.Resize, which resizes all the frames of the window in one call.
+
+    Required keys are "imgs", added or modified keys are "imgs", "img_shape", "keep_ratio" and "scale_factor".
+    The frames are stacked into a uint8 tensor [T,H,W,C], which can be used by the following Tensor* transforms.
+
+    Args:
+        scale (float | tuple[int]): if keep_ratio is True, it is the scale factor or the maximum size, and -1 means
+            no limit on that side, e.g. (-1, 256) resizes the short side to 256. Otherwise, it is the target (w, h).
+        keep_ratio (bool): whether to keep the aspect ratio. Default: True.
+        interpolation (str): interpolation mode of F.interpolate. Default: "bilinear".
+    """
+
+    def __init__(self, scale, keep_ratio=True, interpolation="bilinear"):
+        if isinstance(scale, float):
+            assert scale > 0, f"Invalid scale {scale}"
+        elif isinstance(scale, tuple) or isinstance(scale, list):
+            max_long_edge, max_short_edge = max(scale), min(scale)
+            if max_short_edge == -1:  # assign np.inf to the long edge to rescale the short edge
+                scale = (np.inf, max_long_edge)
+        else:
+            raise TypeError(f"Scale must be float or tuple of int, but got {type(scale)}")
+        self.scale = scale
+        self.keep_ratio = keep_ratio
+        self.interpolation = interpolation
+
+    def get_new_shape(self, img_h, img_w):
+        if not self.keep_ratio:
+            return int(self.scale[1]), int(self.scale[0])
+        if isinstance(self.scale, float):
+            scale_factor = self.scale
+        else:
+            max_long_edge, max_short_edge = max(self.scale), min(self.scale)
+            scale_factor = min(max_long_edge / max(img_h, img_w), max_short_edge / min(img_h, img_w))
+        return int(img_h * float(scale_factor) + 0.5), int(img_w * float(scale_factor) + 0.5)
+
+    def __call__(self, results):
+        imgs = to_frames_tensor(results["imgs"])
+        img_h, img_w = imgs.shape[1:3]
+        new_h, new_w = self.get_new_shape(img_h, img_w)
+
+        results["imgs"] = resize_frames(imgs, (new_h, new_w), self.interpolation)
+        results["img_shape"] = (new_h, new_w)
+        results["keep_ratio"] = self.keep_ratio
+        results["scale_factor"] = np.array([new_w / img_w, new_h / img_h], dtype=np.float32)
+        return results
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(scale={self.scale}, keep_ratio={self.keep_ratio}, "
+            f"interpolation={self.interpolation})"
+        )
+
+
+@PIPELINES.register_module()
+class TensorRandomResizedCrop:
+    """Batched version of mmaction.RandomResizedCrop, one crop box is sampled and shared by all the frames.
+
+    Required keys are "imgs", added or modified keys are "imgs", "crop_bbox" and "img_shape".
+
+    Args:
+        area_range (tuple[float]): range of the crop area ratio. Default: (0.08, 1.0).
+        aspect_ratio_range (tuple[float]): range of the crop aspect ratio. Default: (3 / 4, 4 / 3).
+    """
+
+    def __init__(self, area_range=(0.08, 1.0), aspect_ratio_range=(3 / 4, 4 / 3)):
+        self.area_range = area_range
+        self.aspect_ratio_range = aspect_ratio_range
+
+    @staticmethod
+    def get_crop_bbox(img_shape, area_range, aspect_ratio_range, max_attempts=10):
+        # the same sampling as mmaction, return the crop box (left, top, right, bottom)
+        img_h, img_w = img_shape
+        area = img_h * img_w
+
+        min_ar, max_ar = aspect_ratio_range
+        aspect_ratios = np.exp(np.random.uniform(np.log(min_ar), np.log(max_ar), size=max_attempts))
+        target_areas = np.random.uniform(*area_range, size=max_attempts) * area
+        candidate_crop_w = np.round(np.sqrt(target_areas * aspect_ratios)).astype(np.int32)
+        candidate_crop_h = np.round(np.sqrt(target_areas / aspect_ratios)).astype(np.int32)
+
+        for i in range(max_attempts):
+            crop_w = candidate_crop_w[i]
+            crop_h = candidate_crop_h[i]
+            if crop_h <= img_h and crop_w <= img_w:
+                x_offset = random.randint(0, img_w - crop_w)
+                y_offset = random.randint(0, img_h - crop_h)
+                return x_offset, y_offset, x_offset + crop_w, y_offset + crop_h
+
+        # fallback to the center crop
+        crop_size = min(img_h, img_w)
+        x_offset = (img_w - crop_size) // 2
+        y_offset = (img_h - crop_size) // 2
+        return x_offset, y_offset, x_offset + crop_size, y_offset + crop_size
+
+    def __call__(self, results):
+        imgs = to_frames_tensor(results["imgs"])
+        left, top, right, bottom = self.get_crop_bbox(imgs.shape[1:3], self.area_range, self.aspect_ratio_range)
+
+        results["imgs"] = imgs[:, top:bottom, left:right]  # a view, no copy
+        results["crop_bbox"] = np.array([left, top, right, bottom])
+        results["img_shape"] = (bottom - top, right - left)
+        return results
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(area_range={self.area_range}, "
+            f"aspect_ratio_range={self.aspect_ratio_range})"
+        )
+
+
+@PIPELINES.register_module()
+class TensorCenterCrop:
+    """Batched version of mmaction.CenterCrop.
+
+    Required keys are "imgs", added or modified keys are "imgs", "crop_bbox" and "img_shape".
+
+    Args:
+        crop_size (int | tuple[int]): (w, h) of the crop.
+    """
+
+    def __init__(self, crop_size):
+        self.crop_size = (crop_size, crop_size) if isinstance(crop_size, int) else tuple(crop_size)
+
+    def __call__(self, results):
+        imgs = to_frames_tensor(results["imgs"])
+        img_h, img_w = imgs.shape[1:3]
+        crop_w, crop_h = self.crop_size
+
+        left = (img_w - crop_w) // 2
+        top = (img_h - crop_h) // 2
+        right, bottom = left + crop_w, top + crop_h
+
+        results["imgs"] = imgs[:, top:bottom, left:right]
+        results["crop_bbox"] = np.array([left, top, right, bottom])
+        results["img_shape"] = (bottom - top, right - left)
+        return results
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(crop_size={self.crop_size})"
+
+
+@PIPELINES.register_module()
+class TensorFlip:
+    """Batched version of mmaction.Flip, all the frames of the window are flipped or not together.
+
+    Required keys are "imgs", added or modified keys are "imgs", "flip" and "flip_direction".
+
+    Args:
+        flip_ratio (float): probability of flipping. Default: 0.5.
+        direction (str): "horizontal" or "vertical". Default: "horizontal".
+    """
+
+    def __init__(self, flip_ratio=0.5, direction="horizontal"):
+        assert direction in ["horizontal", "vertical"], f"Direction {direction} is not supported"
+        self.flip_ratio = flip_ratio
+        self.direction = direction
+
+    def __call__(self, results):
+        imgs = to_frames_tensor(results["imgs"])
+        flip = np.random.rand() < self.flip_ratio
+        if flip:
+            imgs = imgs.flip(2 if self.direction == "horizontal" else 1)
+
+        results["imgs"] = imgs
+        results["flip"] = flip
+        results["flip_direction"] = self.direction
+        return results
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(flip_ratio={self.flip_ratio}, direction={self.direction})"
+
+
+@PIPELINES.register_module()
+class TensorFormatShape:
+    """Batched version of mmaction.FormatShape, which formats the frames [N*T,H,W,C] into [N,C,T,H,W] (NCTHW)
+    or [N*T,C,H,W] (NCHW), where N is the num_clips and T is the clip_len given by LoadFrames.
+
+    Required keys are "imgs", "num_clips" and "clip_len", added or modified keys are "imgs" and "input_shape".
+    The output is a contiguous uint8 tensor, which is normalized on the device by the BackboneWrapper.
+
+    Args:
+        input_format (str): "NCTHW" or "NCHW". Default: "NCTHW".
+    """
+
+    def __init__(self, input_format="NCTHW"):
+        assert input_format in ["NCTHW", "NCHW"], f"Input format {input_format} is not supported"
+        self.input_format = input_format
+
+    def __call__(self, results):
+        imgs = to_frames_tensor(results["imgs"])
+        if self.input_format == "NCTHW":
+            num_clips = results["num_clips"]
+            clip_len = results["clip_len"]
+            imgs = imgs.reshape((-1, num_clips, clip_len) + tuple(imgs.shape[1:]))  # [M,N,T,H,W,C]
+            imgs = imgs.permute(0, 1, 5, 2, 3, 4).flatten(0, 1)  # [M*N,C,T,H,W]
+        else:
+            imgs = imgs.permute(0, 3, 1, 2)  # [N*T,C,H,W]
+
+        results["imgs"] = imgs.contiguous()
+        results["input_shape"] = tuple(results["imgs"].shape)
+        return results
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(input_format={self.input_format})"
@@ -0,0 +1,128 @@
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import torch
+
+
+class FeatureCache:
+    """A bounded LRU cache for the per-video features.
+
+    In sliding window datasets, one video is split into many windows, and each window used to read and decode
+    the whole feature file again. With this cache, the full video feature is loaded once and all the windows of
+    this video are sliced from the cached array. The entry is keyed by the video name and the modification time of
+    its feature files, so a re-extracted feature file will never be served from a stale entry.
+
+    Note that the cached features are shared by all the windows, the following transforms should not modify them
+    in place (none of the transforms in OpenTAD does).
+
+    Args:
+        max_bytes (int): the byte budget of the cache. The least recently used videos are evicted once exceeded.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = int(max_bytes)
+        self.cur_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_mtime(path):
+        if os.path.exists(path):
+            return os.stat(path).st_mtime_ns
+        # videos inside a shard store are not files, use the mtime of the store index instead
+        index_path = os.path.join(os.path.dirname(path), "index.json")
+        if os.path.exists(index_path):
+            return os.stat(index_path).st_mtime_ns
+        return -1
+
+    @staticmethod
+    def make_key(video_name, file_paths):
+        """The key is the video name, plus the path and mtime of every feature file of this video."""
+        mtimes = [FeatureCache.get_mtime(path) for path in file_paths]
+        return (video_name,) + tuple(zip(file_paths, mtimes))
+
+    @staticmethod
+    def nbytes(feats):
+        if isinstance(feats, torch.Tensor):
+            return feats.element_size() * feats.nelement()
+        elif isinstance(feats, np.ndarray):
+            return feats.nbytes
+        elif isinstance(feats, (list, tuple)):
+            return sum(FeatureCache.nbytes(f) for f in feats)
+        return 0
+
+    def get(self, key):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, feats):
+        size = self.nbytes(feats)
+        if size > self.max_bytes:  # a single video larger than the whole budget is never cached
+            return
+
+        with self._lock:
+            if key in self._data:
+                self.cur_bytes -= self.nbytes(self._data.pop(key))
+
+            while self.cur_bytes + size > self.max_bytes and len(self._data) > 0:
+                _, evicted = self._data.popitem(last=False)
+                self.cur_bytes -= self.nbytes(evicted)
+                self.evictions += 1
+
+            self._data[key] = feats
+            self.cur_bytes += size
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.cur_bytes = 0
+
+    def stats(self):
+        total = self.hits + self.misses
+        return dict(
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            hit_rate=self.hits / total if total > 0 else 0.0,
+            num_videos=len(self._data),
+            cur_bytes=self.cur_bytes,
+            max_bytes=self.max_bytes,
+        )
+
+    def __len__(self):
+        return len(self._data)
+
+    def __repr__(self):
+        stats = self.stats()
+        return (
+            f"{self.__class__.__name__}(videos={stats['num_videos']}, "
+            f"memory={stats['cur_bytes'] / 1024**2:.1f}/{stats['max_bytes'] / 1024**2:.1f}MB, "
+            f"hits={stats['hits']}, misses={stats['misses']}, hit_rate={stats['hit_rate']:.3f})"
+        )
+
+
+# one cache per process, shared by all the loading transforms (e.g. train / val pipelines) in this process
+_FEATURE_CACHE = None
+
+
+def get_feature_cache(max_bytes=None):
+    """Return the feature cache of the current process. The cache is created at the first call,
+    and a later call with a larger budget will enlarge it."""
+    global _FEATURE_CACHE
+    if _FEATURE_CACHE is None:
+        if max_bytes is None:
+            return None
+        _FEATURE_CACHE = FeatureCache(max_bytes)
+    elif max_bytes is not None and max_bytes > _FEATURE_CACHE.max_bytes:
+        _FEATURE_CACHE.max_bytes = int(max_bytes)
+    return _FEATURE_CACHE
@@ -1,4 +1,5 @@
 import copy
+import hashlib
 import os
 import pickle
 import random
@@ -329,6 +330,58 @@ class LoadFrames:
         return results
 
 
+@PIPELINES.register_module()
+class ClipKey:
+    """Compute a key which identifies the input clip, used by the feature cache of the frozen backbone.
+
+    It should be put after all the augmentations, and "clip_key" is added to the metas by Collect. The key is the
+    hash of the video name, the frame indices, and the crop / resize / flip parameters given by the augmentations.
+
+    Args:
+        keys (list[str]): the keys of results which decide the input clip.
+        snippet_keys (bool): if True, also compute one key per snippet (per row of the 2-D frame_inds given by
+            LoadSnippetFrames) as "snippet_keys", used by the snippet feature reuse of the backbone. Default: False.
+    """
+
+    def __init__(
+        self,
+        keys=("video_name", "frame_inds", "crop_bbox", "img_shape", "flip", "flip_direction"),
+        snippet_keys=False,
+    ):
+        self.keys = keys
+        self.snippet_keys = snippet_keys
+
+    @staticmethod
+    def get_hasher(results, keys):
+        hasher = hashlib.sha1()
+        for key in keys:
+            if key in results.keys():
+                value = results[key]
+                if isinstance(value, np.ndarray):
+                    value = value.tolist()
+                hasher.update(f"{key}={value};".encode())
+        return hasher
+
+    def __call__(self, results):
+        results["clip_key"] = self.get_hasher(results, self.keys).hexdigest()
+
+        if self.snippet_keys:
+            frame_inds = np.asarray(results["frame_inds"])
+            assert frame_inds.ndim == 2, "snippet_keys needs the 2-D frame_inds of LoadSnippetFrames"
+            # the shared part of the snippet keys, the frame indices of each snippet are added below
+            hasher = self.get_hasher(results, [key for key in self.keys if key != "frame_inds"])
+            snippet_keys = []
+            for snippet_inds in frame_inds.tolist():
+                snippet_hasher = hasher.copy()
+                snippet_hasher.update(f"frame_inds={snippet_inds};".encode())
+                snippet_keys.append(snippet_hasher.hexdigest())
+            results["snippet_keys"] = snippet_keys
+        return results
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(keys={self.keys}, snippet_keys={self.snippet_keys})"
+
+
 @PIPELINES.register_module()
 class Interpolate:
     def __init__(self, keys, size=128, mode="linear"):
@@ -27,6 +27,14 @@ def to_tensor(data):
     raise TypeError(f"type {type(data)} cannot be converted to tensor.")
 
 
+def to_float(feats):
+    """Convert the features to float32, but keep the compact features (float16 / int8) loaded with
+    `LoadFeats(keep_dtype=True)` as they are, which will be upcasted on the device by the detector."""
+    if feats.dtype in [torch.float16, torch.int8]:
+        return feats
+    return feats.float()
+
+
 @PIPELINES.register_module()
 class Collect:
     def __init__(
@@ -43,6 +51,8 @@ class Collect:
             "resize_length",
             "window_size",
             "offset_frames",
+            "clip_key",
+            "snippet_keys",
         ],
     ):
         self.inputs = inputs
@@ -55,6 +65,11 @@ class Collect:
         # input key
         data["inputs"] = results[self.inputs]  # [C,T]
 
+        # per-channel scale of the int8 features, the detector will use it to upcast the [C,T] inputs
+        if self.inputs == "feats" and "feats_scale" in results.keys():
+            data["inputs_scale"] = to_tensor(results["feats_scale"]).float()
+            assert data["inputs"].shape[0] == len(data["inputs_scale"]), "the int8 feats should be [C,T] in Collect"
+
         # AutoAugment key: gt_segments, gt_labels, masks
         for key in self.keys:
             if key == "masks" and key not in results.keys():
@@ -249,7 +264,7 @@ class Padding:
 
         feat_len = feats.shape[0]
         if feat_len < self.length:
-            pad = torch.ones((self.length - feat_len, feats.shape[1])) * self.pad_value
+            pad = torch.full((self.length - feat_len, feats.shape[1]), self.pad_value, dtype=feats.dtype)
             new_feats = torch.cat((feats, pad), dim=0)
 
             if self.channel_first:
@@ -267,7 +282,7 @@ class Padding:
             results["snippet_stride"] = results["snippet_stride"] * feat_len / self.length
             results["offset_frames"] = results["offset_frames"] * feat_len / self.length
             new_feats = F.interpolate(
-                feats.permute(1, 0)[None],  # [b,c,t]
+                feats.float().permute(1, 0)[None],  # [b,c,t]
                 size=self.length,
                 mode="linear",
                 align_corners=False,
@@ -293,4 +308,6 @@ class ChannelReduction:
 
         # select the features
         results["feats"] = results["feats"][:, self.index[0] : self.index[1]]
+        if "feats_scale" in results.keys():
+            results["feats_scale"] = results["feats_scale"][self.index[0] : self.index[1]]
         return results
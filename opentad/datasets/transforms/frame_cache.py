@@ -0,0 +1,281 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from mmengine.logging import print_log
+
+from ..builder import PIPELINES
+from .cache import FeatureCache
+
+
+class VideoReaderCache:
+    """A small LRU cache of the opened decord VideoReader, so the windows of one video do not reopen the container.
+
+    Args:
+        max_handles (int): the maximum number of opened videos.
+        num_threads (int): decoding threads of each VideoReader.
+    """
+
+    def __init__(self, max_handles=4, num_threads=1):
+        self.max_handles = max_handles
+        self.num_threads = num_threads
+        self._readers = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, filename):
+        with self._lock:
+            if filename in self._readers:
+                self._readers.move_to_end(filename)
+                return self._readers[filename]
+
+        try:
+            import decord
+        except ImportError:
+            raise ImportError("Please run `pip install decord` to use the cached decord transforms.")
+
+        reader = decord.VideoReader(filename, num_threads=self.num_threads)
+        with self._lock:
+            self._readers[filename] = reader
+            while len(self._readers) > self.max_handles:
+                self._readers.popitem(last=False)
+        return reader
+
+    def __len__(self):
+        return len(self._readers)
+
+
+class LazyVideoReader:
+    """Open the video from the reader cache at the first decoding."""
+
+    def __init__(self, filename):
+        self.filename = filename
+
+    def get_batch(self, indices):
+        return get_reader_cache().get(self.filename).get_batch(indices)
+
+
+class DecodePool:
+    """A pool of decoding threads, each owning its own VideoReaders, which decodes the frames GOP by GOP.
+
+    The requested frames are sorted and grouped by the keyframe before them, i.e. by GOP. The GOPs are split into
+    at most pool_size contiguous groups, and each group is decoded by one thread with one batched forward seek,
+    so that every GOP is decoded once, and the sparse frames of random_trunc are decoded in parallel.
+
+    Args:
+        pool_size (int): number of decoding threads.
+        max_handles (int): the maximum number of opened videos in each thread.
+        report_interval (int): log the decoding statistics every report_interval requests, 0 to disable it.
+            Default: 0.
+    """
+
+    def __init__(self, pool_size=4, max_handles=4, report_interval=0):
+        self.pool_size = pool_size
+        self.max_handles = max_handles
+        self.report_interval = report_interval
+        self.executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="decode")
+        self._local = threading.local()
+        self._keyframes = OrderedDict()
+        self.num_requests = 0
+        self.num_frames = 0
+        self.num_gops = 0
+        self.decode_time = 0.0
+
+    def get_thread_reader(self, filename):
+        if not hasattr(self._local, "readers"):
+            self._local.readers = VideoReaderCache(self.max_handles, num_threads=1)
+        return self._local.readers.get(filename)
+
+    def get_keyframes(self, filename, keyframe_inds=None):
+        if keyframe_inds is not None and len(keyframe_inds) > 0:
+            return np.asarray(keyframe_inds)
+        if filename not in self._keyframes:
+            keyframes = self.executor.submit(lambda: self.get_thread_reader(filename).get_key_indices()).result()
+            self._keyframes[filename] = np.asarray(keyframes)
+            while len(self._keyframes) > 64:
+                self._keyframes.popitem(last=False)
+        return self._keyframes[filename]
+
+    def decode(self, filename, frame_inds, keyframe_inds=None):
+        """Decode the sorted unique frame_inds of one video, return the frames [N,H,W,3] in the same order."""
+        tic = time.time()
+        frame_inds = np.asarray(frame_inds)
+        keyframes = self.get_keyframes(filename, keyframe_inds)
+        gop_ids = np.searchsorted(keyframes, frame_inds, side="right") - 1
+
+        # split the gops into at most pool_size contiguous groups with similar frame numbers
+        gop_starts = np.flatnonzero(np.diff(gop_ids, prepend=gop_ids[0] - 1))
+        num_groups = min(self.pool_size, len(gop_starts))
+        group_starts = gop_starts[np.linspace(0, len(gop_starts), num_groups, endpoint=False).astype(int)]
+        groups = np.split(frame_inds, group_starts[1:])
+
+        def _decode(inds):
+            return self.get_thread_reader(filename).get_batch(inds.tolist()).asnumpy()
+
+        frames = np.concatenate(list(self.executor.map(_decode, groups)), axis=0)
+
+        self.num_requests += 1
+        self.num_frames += len(frame_inds)
+        self.num_gops += len(gop_starts)
+        self.decode_time += time.time() - tic
+        if self.report_interval > 0 and self.num_requests % self.report_interval == 0:
+            print_log(f"[pid {os.getpid()}] {self}", logger="current")
+        return frames
+
+    def __repr__(self):
+        fps = self.num_frames / self.decode_time if self.decode_time > 0 else 0.0
+        return (
+            f"{self.__class__.__name__}(pool_size={self.pool_size}, requests={self.num_requests}, "
+            f"frames={self.num_frames}, gops={self.num_gops}, decode_fps={fps:.1f})"
+        )
+
+
+# one reader cache, one frame cache and one decode pool per process (i.e. per DataLoader worker)
+_READER_CACHE = None
+_FRAME_CACHE = None
+_DECODE_POOL = None
+
+
+def get_reader_cache(max_handles=4, num_threads=1):
+    global _READER_CACHE
+    if _READER_CACHE is None:
+        _READER_CACHE = VideoReaderCache(max_handles, num_threads)
+    return _READER_CACHE
+
+
+def get_frame_cache(max_bytes):
+    """Return the decoded frame cache of the current process, a later call with a larger budget will enlarge it."""
+    global _FRAME_CACHE
+    if _FRAME_CACHE is None:
+        _FRAME_CACHE = FeatureCache(max_bytes)
+    elif max_bytes > _FRAME_CACHE.max_bytes:
+        _FRAME_CACHE.max_bytes = int(max_bytes)
+    return _FRAME_CACHE
+
+
+def get_decode_pool(pool_size, max_handles=4, report_interval=0):
+    global _DECODE_POOL
+    if _DECODE_POOL is None:
+        _DECODE_POOL = DecodePool(pool_size, max_handles, report_interval)
+    return _DECODE_POOL
+
+
+@PIPELINES.register_module()
+class CachedDecordInit:
+    """Drop-in replacement of mmaction.DecordInit, which reuses the opened VideoReader of the same video.
+
+    Required keys are "filename", added or modified keys are "video_reader", "total_frames" and "avg_fps".
+    If "total_frames" and "avg_fps" are already given by the video meta index of the dataset, the video is not
+    opened here, and CachedDecordDecode opens it only when some frames are not in the frame cache.
+
+    Args:
+        num_threads (int): decoding threads of each VideoReader. Default: 1.
+        max_handles (int): the maximum number of opened videos in each process. Default: 4.
+    """
+
+    def __init__(self, num_threads=1, max_handles=4):
+        self.num_threads = num_threads
+        self.max_handles = max_handles
+
+    def __call__(self, results):
+        reader_cache = get_reader_cache(self.max_handles, self.num_threads)
+        if "total_frames" in results.keys() and "avg_fps" in results.keys():
+            # the metadata is given by the video meta index, the video is opened in decoding only if necessary
+            results["video_reader"] = None
+            return results
+
+        reader = reader_cache.get(results["filename"])
+        results["video_reader"] = reader
+        results["total_frames"] = len(reader)
+        results["avg_fps"] = reader.get_avg_fps()
+        return results
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(num_threads={self.num_threads}, max_handles={self.max_handles})"
+
+
+@PIPELINES.register_module()
+class CachedDecordDecode:
+    """Drop-in replacement of mmaction.DecordDecode, which caches the decoded frames by (video, frame index).
+
+    In sliding window datasets, the adjacent windows overlap (25% by default), and the test set is decoded again
+    in every evaluation. With this cache, each frame is decoded once, and only the missing frames are decoded
+    in one sorted batch. The cache is per process, so it works best with the VideoAffinityBatchSampler.
+
+    Note that the cached frames are shared by all the windows, the following transforms should not modify them
+    in place before resizing or cropping.
+
+    Required keys are "filename" and "frame_inds", and the optional "video_reader". Added or modified keys are
+    "imgs", "original_shape" and "img_shape".
+
+    With pool_size > 0, the missing frames are decoded by the per-process DecodePool, GOP by GOP in parallel
+    threads, which suits the sparse and seek-heavy frames of random_trunc. The keyframes are read from the
+    "keyframe_inds" given by the video meta index if possible.
+
+    Args:
+        cache_bytes (int): byte budget of the per-process frame cache, 0 to disable it. Default: 2GB.
+        pool_size (int): number of decoding threads of the DecodePool, 0 to decode in the current thread.
+            Default: 0.
+        report_interval (int): log the statistics of the DecodePool every report_interval requests of each
+            worker, 0 to disable it. Default: 0.
+    """
+
+    def __init__(self, cache_bytes=2 * 1024**3, pool_size=0, report_interval=0):
+        self.cache_bytes = cache_bytes
+        self.pool_size = pool_size
+        self.report_interval = report_interval
+
+    def decode(self, results, reader, frame_inds):
+        # frame_inds are sorted and unique
+        if self.pool_size > 0:
+            pool = get_decode_pool(self.pool_size, report_interval=self.report_interval)
+            return pool.decode(results["filename"], frame_inds, results.get("keyframe_inds", None))
+        return reader.get_batch(frame_inds).asnumpy()
+
+    def __call__(self, results):
+        frame_inds = results["frame_inds"]
+        if frame_inds.ndim != 1:
+            frame_inds = np.squeeze(frame_inds)
+        reader = results.get("video_reader", None)
+        if reader is None:
+            reader = LazyVideoReader(results["filename"])
+
+        if self.cache_bytes > 0:
+            cache = get_frame_cache(self.cache_bytes)
+            # the mtime is in the key, so a re-encoded video will never be served from a stale entry
+            video_key = (results["filename"], FeatureCache.get_mtime(results["filename"]))
+
+            frames = {}
+            missing = []
+            for idx in np.unique(frame_inds).tolist():
+                frame = cache.get(video_key + (idx,))
+                if frame is None:
+                    missing.append(idx)
+                else:
+                    frames[idx] = frame
+
+            if len(missing) > 0:  # the missing frames are sorted, so they are decoded with forward seeks only
+                decoded = self.decode(results, reader, missing)
+                for idx, frame in zip(missing, decoded):
+                    # a copy, so that the cache does not keep the whole decoded batch alive behind a view
+                    frames[idx] = frame.copy()
+                    cache.put(video_key + (idx,), frames[idx])
+        else:
+            unique_inds = np.unique(frame_inds).tolist()
+            frames = dict(zip(unique_inds, self.decode(results, reader, unique_inds)))
+
+        imgs = [frames[idx] for idx in frame_inds.reshape(-1).tolist()]
+
+        results["video_reader"] = None  # the reader is kept in the reader cache
+        results["frame_inds"] = frame_inds
+        results["imgs"] = imgs
+        results["original_shape"] = imgs[0].shape[:2]
+        results["img_shape"] = imgs[0].shape[:2]
+        return results
+
+    def __repr__(self):
+        cache = _FRAME_CACHE if self.cache_bytes > 0 else None
+        pool = _DECODE_POOL if self.pool_size > 0 else None
+        return f"{self.__class__.__name__}(cache_bytes={self.cache_bytes}, cache={cache}, pool={pool})"
@@ -0,0 +1,121 @@
+import json
+import os
+import numpy as np
+
+from ..builder import PIPELINES
+
+
+FRAME_STORE_VERSION = 1
+INDEX_FILENAME = "index.json"
+
+
+class FrameStoreReader:
+    """Reader of the pre-decoded frame store, which is written by `tools/prepare_data/predecode_frames.py`.
+
+    The store is a folder containing one `<video>.npy` uint8 array [N,H,W,3] per video, and an `index.json`,
+    which records the frame_stride, and the total_frames, avg_fps and the shape of each video. The i-th stored
+    frame is the (i x frame_stride)-th frame of the original video, resized to the configured short side.
+
+    Args:
+        store_dir (str): folder of the frame store.
+    """
+
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+        with open(os.path.join(store_dir, INDEX_FILENAME), "r") as f:
+            index = json.load(f)
+        assert index["version"] == FRAME_STORE_VERSION, f"frame store version {index['version']} is not supported"
+        self.frame_stride = index["frame_stride"]
+        self.videos = index["videos"]
+        self._arrays = {}
+
+    def get_array(self, video_name):
+        # the memmap is opened lazily in each process, so it can be used in DataLoader workers
+        if video_name not in self._arrays:
+            path = os.path.join(self.store_dir, f"{video_name}.npy")
+            self._arrays[video_name] = np.load(path, mmap_mode="r")
+        return self._arrays[video_name]
+
+    def read(self, video_name, frame_inds):
+        """Read the frames by the frame indices of the original video, the nearest stored frames are returned."""
+        array = self.get_array(video_name)
+        rows = np.round(np.asarray(frame_inds).reshape(-1) / self.frame_stride).astype(int)
+        rows = np.clip(rows, 0, len(array) - 1)
+
+        # read each unique frame once in sorted order, then map back to the requested order
+        unique_rows, inverse = np.unique(rows, return_inverse=True)
+        frames = np.asarray(array[unique_rows])  # copy from the memmap
+        return [frames[i] for i in inverse.reshape(-1)]
+
+    def __contains__(self, video_name):
+        return video_name in self.videos
+
+
+# one reader per store folder in each process
+_FRAME_STORE_READERS = {}
+
+
+def get_frame_store(store_dir):
+    if store_dir not in _FRAME_STORE_READERS:
+        _FRAME_STORE_READERS[store_dir] = FrameStoreReader(store_dir)
+    return _FRAME_STORE_READERS[store_dir]
+
+
+@PIPELINES.register_module()
+class FrameStoreInit:
+    """Replacement of PrepareVideoInfo + mmaction.DecordInit for the pre-decoded frame store.
+
+    The total_frames and avg_fps are read from the store index, without opening the video container.
+    The data_path of the dataset should be the store folder.
+
+    Args:
+        prefix (str): prefix of the video name in the store. Default: "".
+        modality (str): modality of the frames. Default: "RGB".
+    """
+
+    def __init__(self, prefix="", modality="RGB"):
+        self.prefix = prefix
+        self.modality = modality
+
+    def __call__(self, results):
+        store = get_frame_store(results["data_path"])
+        video_key = self.prefix + results["video_name"]
+        assert video_key in store, f"{video_key} is not in the frame store {results['data_path']}"
+
+        video_meta = store.videos[video_key]
+        results["modality"] = self.modality
+        results["filename"] = os.path.join(results["data_path"], f"{video_key}.npy")
+        results["frame_store_key"] = video_key
+        results["total_frames"] = video_meta["total_frames"]
+        results["avg_fps"] = video_meta["avg_fps"]
+        return results
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(prefix={self.prefix}, modality={self.modality})"
+
+
+@PIPELINES.register_module()
+class FrameStoreDecode:
+    """Replacement of mmaction.DecordDecode for the pre-decoded frame store.
+
+    The frame_inds given by LoadFrames / LoadSnippetFrames are read from the memory-mapped uint8 array directly.
+    Since the store only keeps every frame_stride-th frame, the frame_inds should be multiples of the frame_stride
+    (as in the sliding_window and random_trunc methods of LoadFrames), otherwise the nearest stored frame is used.
+    """
+
+    def __call__(self, results):
+        frame_inds = results["frame_inds"]
+        if frame_inds.ndim != 1:
+            frame_inds = np.squeeze(frame_inds)
+
+        store = get_frame_store(results["data_path"])
+        imgs = store.read(results["frame_store_key"], frame_inds)
+
+        results["frame_inds"] = frame_inds
+        results["imgs"] = imgs
+        results["original_shape"] = imgs[0].shape[:2]
+        results["img_shape"] = imgs[0].shape[:2]
+        return results
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}()"
@@ -6,17 +6,62 @@ import torch
 import random
 import pandas as pd
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 
 from ..builder import PIPELINES
 from torch.nn import functional as F
+from .cache import FeatureCache, get_feature_cache
+from .shard_store import get_shard_reader, decode_feats
+from .formatting import to_float
+from .arena import FeatureArena
 
 
 @PIPELINES.register_module()
 class LoadFeats:
-    def __init__(self, feat_format, prefix="", suffix=""):
+    """Load the pre-extracted features of a video.
+
+    Args:
+        feat_format (str | list[str]): the format of the feature file, should be one of npy, npz, pt, csv, pkl,
+            or shard. If multiple data_path are given, the feat_format can be a list for each data_path.
+            For shard, the data_path is the folder of a shard store packed by tools/prepare_data/pack_features.py.
+        prefix (str): prefix of the feature file name.
+        suffix (str): suffix of the feature file name.
+        cache_bytes (int): byte budget of the per-process LRU feature cache, 0 to disable it. It is useful for
+            sliding window datasets, since all the windows of one video can be served from one load.
+        mmap (bool): memory-map the npy / shard features instead of reading the whole file. In sliding window
+            datasets, only the rows of the current window are paged in and converted, and `feats_offset` is recorded
+            for SlidingWindowTrunc. Otherwise, the features are kept memory-mapped, so that RandomTrunc only touches
+            the truncated rows. Only single-stream npy / shard features are memory-mapped, others are read as usual.
+        keep_dtype (bool): keep the compact on-disk dtype (float16, or int8 of the shard store) instead of upcasting
+            to float32 on the CPU. The int8 per-channel scale is passed as `feats_scale`, and the detector upcasts
+            the inputs on the device. Only single-stream npy / shard features are supported.
+        preload (bool): load all the features of the dataset once into a shared-memory arena when the dataset is
+            built, and the DataLoader workers hand out zero-copy views from it. Only for datasets fit in RAM.
+        preload_threads (int): number of threads to load the features when preloading.
+    """
+
+    def __init__(
+        self,
+        feat_format,
+        prefix="",
+        suffix="",
+        cache_bytes=0,
+        mmap=False,
+        keep_dtype=False,
+        preload=False,
+        preload_threads=8,
+    ):
         self.feat_format = feat_format
         self.prefix = prefix
         self.suffix = suffix
+        self.cache_bytes = cache_bytes
+        self.mmap = mmap
+        self.keep_dtype = keep_dtype
+        self.preload = preload
+        self.preload_threads = preload_threads
+        self.arena = None
+        assert not (self.mmap and self.cache_bytes > 0), "mmap and feature cache can not be used together"
+        assert not (self.mmap and self.preload), "mmap and preload can not be used together"
         # check feat format
         if isinstance(self.feat_format, str):
             self.check_feat_format(self.feat_format)
@@ -25,7 +70,7 @@ class LoadFeats:
                 self.check_feat_format(feat_format)
 
     def check_feat_format(self, feat_format):
-        assert feat_format in ["npy", "npz", "pt", "csv", "pkl"], print(f"not support {feat_format}")
+        assert feat_format in ["npy", "npz", "pt", "csv", "pkl", "shard"], print(f"not support {feat_format}")
 
     def read_from_tensor(self, file_path):
         feats = torch.load(file_path).float()
@@ -35,6 +80,52 @@ class LoadFeats:
         feats = np.load(file_path).astype(np.float32)
         return feats
 
+    def read_from_shard(self, file_path):
+        # file_path is {store_dir}/{prefix}{video_name}{suffix}
+        reader = get_shard_reader(os.path.dirname(file_path))
+        name = os.path.basename(file_path)
+        feats = decode_feats(reader.read(name), reader.read_scale(name))
+        return feats
+
+    def read_direct(self, file_path, feat_format, results):
+        """Read single-stream npy / shard features, with memory-mapping or the compact dtype."""
+        scale = None
+        try:
+            if feat_format == "npy":
+                # copy-on-write mapping, see FeatureShardReader.get_shard
+                feats = np.load(file_path, mmap_mode="c" if self.mmap else None)
+            elif feat_format == "shard":
+                reader = get_shard_reader(os.path.dirname(file_path))
+                feats = reader.read(os.path.basename(file_path))
+                scale = reader.read_scale(os.path.basename(file_path))
+        except:
+            print("Missing data:", file_path)
+            exit()
+
+        if self.keep_dtype:
+            if scale is not None:
+                results["feats_scale"] = np.array(scale)
+            target_dtype = feats.dtype if feats.dtype in [np.float16, np.int8] else np.float32
+        else:
+            if scale is not None:  # int8 features should be decoded on the CPU
+                feats = decode_feats(feats, scale)
+            target_dtype = np.float32
+
+        sample_stride = results.get("sample_stride", 1)
+        if "feature_start_idx" in results.keys() and "feature_end_idx" in results.keys():
+            # sliding window: only page in the rows of current window, the index is after sampling
+            start_idx = results["feature_start_idx"]
+            end_idx = results["feature_end_idx"] + 1
+            feats = feats[start_idx * sample_stride : end_idx * sample_stride : sample_stride]
+            results["feats_offset"] = start_idx
+            return np.ascontiguousarray(feats, dtype=target_dtype)
+
+        if sample_stride > 1:
+            feats = feats[::sample_stride]
+        if feats.dtype != target_dtype:  # the later transforms expect float32 or the compact features
+            feats = feats.astype(target_dtype)
+        return feats
+
     def read_from_npz(self, file_path):
         feats = np.load(file_path)["feats"].astype(np.float32)
         return feats
@@ -61,40 +152,94 @@ class LoadFeats:
                 feats = self.read_from_csv(file_path)
             elif feat_format == "pkl":
                 feats = self.read_from_pkl(file_path)
+            elif feat_format == "shard":
+                feats = self.read_from_shard(file_path)
         except:
             print("Missing data:", file_path)
             exit()
         return feats
 
-    def __call__(self, results):
+    def get_file_path(self, data_path, video_name, feat_format):
+        if feat_format == "shard":  # the key of the video inside the shard store
+            return os.path.join(data_path, f"{self.prefix}{video_name}{self.suffix}")
+        return os.path.join(data_path, f"{self.prefix}{video_name}{self.suffix}.{feat_format}")
+
+    def get_file_paths(self, results):
         video_name = results["video_name"]
+        data_paths = results["data_path"]
+        if isinstance(data_paths, str):
+            return [self.get_file_path(data_paths, video_name, self.feat_format)]
+
+        # check if the feat_format is a list
+        if isinstance(self.feat_format, str):
+            self.feat_format = [self.feat_format] * len(data_paths)
+
+        return [
+            self.get_file_path(data_path, video_name, feat_format)
+            for data_path, feat_format in zip(data_paths, self.feat_format)
+        ]
 
+    def load_video_feats(self, results, file_paths):
         if isinstance(results["data_path"], str):
-            file_path = os.path.join(results["data_path"], f"{self.prefix}{video_name}{self.suffix}.{self.feat_format}")
-            feats = self.load_single_feat(file_path, self.feat_format)
-        elif isinstance(results["data_path"], list):
-            feats = []
-
-            # check if the feat_format is a list
-            if isinstance(self.feat_format, str):
-                self.feat_format = [self.feat_format] * len(results["data_path"])
-
-            for data_path, feat_format in zip(results["data_path"], self.feat_format):
-                file_path = os.path.join(data_path, f"{self.prefix}{video_name}{self.suffix}.{feat_format}")
-                feats.append(self.load_single_feat(file_path, feat_format))
-
-            max_len = max([feat.shape[0] for feat in feats])
-            for i in range(len(feats)):
-                if feats[i].shape[0] != max_len:
-                    # assume the first dimension is T
-                    tmp_feat = F.interpolate(
-                        torch.Tensor(feats[i]).permute(1, 0).unsqueeze(0),
-                        size=max_len,
-                        mode="linear",
-                        align_corners=False,
-                    ).squeeze(0)
-                    feats[i] = tmp_feat.permute(1, 0).numpy()
-            feats = np.concatenate(feats, axis=1)
+            return self.load_single_feat(file_paths[0], self.feat_format)
+
+        feats = []
+        for file_path, feat_format in zip(file_paths, self.feat_format):
+            feats.append(self.load_single_feat(file_path, feat_format))
+
+        max_len = max([feat.shape[0] for feat in feats])
+        for i in range(len(feats)):
+            if feats[i].shape[0] != max_len:
+                # assume the first dimension is T
+                tmp_feat = F.interpolate(
+                    torch.Tensor(feats[i]).permute(1, 0).unsqueeze(0),
+                    size=max_len,
+                    mode="linear",
+                    align_corners=False,
+                ).squeeze(0)
+                feats[i] = tmp_feat.permute(1, 0).numpy()
+        feats = np.concatenate(feats, axis=1)
+        return feats
+
+    def build_arena(self, video_names, data_path, logger=print):
+        """Preload the features of all the videos into a shared-memory arena, called by the dataset."""
+
+        def _load(video_name):
+            results = dict(video_name=video_name, data_path=data_path)
+            return video_name, self.load_video_feats(results, self.get_file_paths(results))
+
+        with ThreadPoolExecutor(max_workers=self.preload_threads) as executor:
+            feats_list = list(executor.map(_load, video_names))
+        self.arena = FeatureArena(feats_list)
+        logger(f"Preloaded features into shared memory: {self.arena}")
+
+    def __call__(self, results):
+        # zero-copy view from the preloaded arena
+        if self.arena is not None and results["video_name"] in self.arena:
+            feats = self.arena.get(results["video_name"])
+            sample_stride = results.get("sample_stride", 1)
+            if sample_stride > 1:
+                feats = feats[::sample_stride]
+            results["feats"] = feats
+            return results
+
+        file_paths = self.get_file_paths(results)
+
+        # memory-mapped or compact reading, sample_stride is handled inside
+        if (self.mmap or self.keep_dtype) and isinstance(results["data_path"], str):
+            if self.feat_format in ["npy", "shard"]:
+                results["feats"] = self.read_direct(file_paths[0], self.feat_format, results)
+                return results
+
+        cache = get_feature_cache(self.cache_bytes) if self.cache_bytes > 0 else None
+        if cache is not None:
+            key = FeatureCache.make_key(results["video_name"], file_paths)
+            feats = cache.get(key)
+            if feats is None:
+                feats = self.load_video_feats(results, file_paths)
+                cache.put(key, feats)
+        else:
+            feats = self.load_video_feats(results, file_paths)
 
         # sample the feature
         sample_stride = results.get("sample_stride", 1)
@@ -105,7 +250,11 @@ class LoadFeats:
         return results
 
     def __repr__(self):
-        repr_str = f"{self.__class__.__name__}(" f"feat_format={self.feat_format}"
+        repr_str = (
+            f"{self.__class__.__name__}("
+            f"feat_format={self.feat_format}, cache_bytes={self.cache_bytes}, mmap={self.mmap}, "
+            f"keep_dtype={self.keep_dtype}, preload={self.preload})"
+        )
         return repr_str
 
 
@@ -122,16 +271,18 @@ class SlidingWindowTrunc:
         assert isinstance(results["feats"], torch.Tensor)
         window_size = results["window_size"]
 
-        feats_length = results["feats"].shape[0]
-        start_idx = min(results["feature_start_idx"], feats_length)
-        end_idx = min(results["feature_end_idx"] + 1, feats_length)
+        # if LoadFeats only read the window features, feats[0] is the feature at feats_offset
+        feats_offset = results.pop("feats_offset", 0)
+        feats_length = results["feats"].shape[0] + feats_offset
+        start_idx = min(results["feature_start_idx"], feats_length) - feats_offset
+        end_idx = min(results["feature_end_idx"] + 1, feats_length) - feats_offset
 
         window_feats = results["feats"][start_idx:end_idx]
         valid_len = window_feats.shape[0]
 
         # if the valid window is smaller than window size, pad with -1
         if valid_len < window_size:
-            pad_data = torch.zeros(window_size - valid_len, window_feats.shape[1])
+            pad_data = torch.zeros(window_size - valid_len, window_feats.shape[1], dtype=window_feats.dtype)
             window_feats = torch.cat((window_feats, pad_data), dim=0)
 
         # if we need padding mask (valid is 1, pad is 0)
@@ -142,7 +293,7 @@ class SlidingWindowTrunc:
                 masks = torch.ones(window_size)
             results["masks"] = masks.bool()
 
-        results["feats"] = window_feats.float()
+        results["feats"] = to_float(window_feats)
         return results
 
 
@@ -161,6 +312,7 @@ class RandomTrunc:
         no_trunc=False,
         pad_value=0,
         channel_first=False,
+        pad=True,  # if False, do not pad to trunc_len, and leave the padding to the collate function
     ):
         self.trunc_len = trunc_len
         self.trunc_thresh = trunc_thresh
@@ -170,6 +322,7 @@ class RandomTrunc:
         self.no_trunc = no_trunc
         self.pad_value = pad_value
         self.channel_first = channel_first
+        self.pad = pad
 
     def trunc_features(self, feats, gt_segments, gt_labels, offset):
         feat_len = feats.shape[0]
@@ -227,8 +380,8 @@ class RandomTrunc:
 
     def pad_features(self, feats):
         feat_len = feats.shape[0]
-        if feat_len < self.trunc_len:
-            feats_pad = torch.ones((self.trunc_len - feat_len,) + feats.shape[1:]) * self.pad_value
+        if self.pad and feat_len < self.trunc_len:
+            feats_pad = torch.full((self.trunc_len - feat_len,) + feats.shape[1:], self.pad_value, dtype=feats.dtype)
             feats = torch.cat([feats, feats_pad], dim=0)
             masks = torch.cat([torch.ones(feat_len), torch.zeros(self.trunc_len - feat_len)])
             return feats, masks
@@ -253,7 +406,7 @@ class RandomTrunc:
         # pad the features to the fixed length
         feats, masks = self.pad_features(feats)
 
-        results["feats"] = feats.float()
+        results["feats"] = to_float(feats)
         results["masks"] = masks.bool()
         results["gt_segments"] = gt_segments
         results["gt_labels"] = gt_labels
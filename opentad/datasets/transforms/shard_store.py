@@ -0,0 +1,176 @@
+import json
+import os
+import numpy as np
+
+
+SHARD_STORE_VERSION = 1
+INDEX_FILENAME = "index.json"
+
+
+class FeatureShardWriter:
+    """Pack many per-video feature arrays into a few large contiguous shard files.
+
+    The store is a folder containing `shard_xxxxx.bin` files and an `index.json`, which records the
+    shard id, byte offset, shape and dtype of each video. Each array is aligned to `align` bytes,
+    so that it can be viewed from the memory-mapped shard without copy.
+
+    The features can be stored in a reduced precision by `encoding`:
+        - None: keep the original dtype.
+        - float16: half precision, which is lossless enough for most video features.
+        - int8: symmetric int8 with a float32 scale per channel (the last dim), feats = int8 * scale.
+
+    Args:
+        out_dir (str): folder of the shard store.
+        shard_bytes (int): a new shard is started once the current one exceeds this size. Default: 4GB.
+        align (int): byte alignment of each array inside the shard. Default: 64.
+        encoding (str | None): the on-disk encoding of the features. Default: None.
+    """
+
+    def __init__(self, out_dir, shard_bytes=4 * 1024**3, align=64, encoding=None):
+        assert encoding in [None, "float16", "int8"], f"not support encoding {encoding}"
+        self.out_dir = out_dir
+        self.shard_bytes = int(shard_bytes)
+        self.align = align
+        self.encoding = encoding
+
+        os.makedirs(self.out_dir, exist_ok=True)
+        self.shards = []
+        self.videos = {}
+        self._file = None
+        self._offset = 0
+
+    def _open_new_shard(self):
+        if self._file is not None:
+            self._file.close()
+        shard_name = f"shard_{len(self.shards):05d}.bin"
+        self.shards.append(shard_name)
+        self._file = open(os.path.join(self.out_dir, shard_name), "wb")
+        self._offset = 0
+
+    def _write(self, array):
+        # pad to the alignment
+        pad = (-self._offset) % self.align
+        if pad > 0:
+            self._file.write(b"\0" * pad)
+            self._offset += pad
+
+        offset = self._offset
+        self._file.write(array.tobytes())
+        self._offset += array.nbytes
+        return offset
+
+    def add(self, name, feats):
+        assert name not in self.videos, f"{name} is already in the shard store"
+        feats, scale = encode_feats(feats, self.encoding)
+
+        nbytes = feats.nbytes + (scale.nbytes if scale is not None else 0)
+        if self._file is None or (self._offset > 0 and self._offset + nbytes > self.shard_bytes):
+            self._open_new_shard()
+
+        info = dict(shard=len(self.shards) - 1, shape=list(feats.shape), dtype=feats.dtype.str)
+        info["offset"] = self._write(feats)
+        if scale is not None:  # the scale is stored right after the features in the same shard
+            info["scale_offset"] = self._write(scale)
+        self.videos[name] = info
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+        index = dict(version=SHARD_STORE_VERSION, shards=self.shards, videos=self.videos)
+        with open(os.path.join(self.out_dir, INDEX_FILENAME), "w") as f:
+            json.dump(index, f)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class FeatureShardReader:
+    """O(1) indexed reading from a shard store written by FeatureShardWriter.
+
+    The shards are memory-mapped once at the first access, and `read` returns a zero-copy view of the video
+    features, so that slicing it only pages in the needed rows.
+    """
+
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+        with open(os.path.join(store_dir, INDEX_FILENAME), "r") as f:
+            index = json.load(f)
+        assert index["version"] == SHARD_STORE_VERSION, f"unsupported shard store version {index['version']}"
+
+        self.shards = index["shards"]
+        self.videos = index["videos"]
+        self._mmaps = [None] * len(self.shards)
+
+    def get_shard(self, shard_id):
+        if self._mmaps[shard_id] is None:
+            # copy-on-write mapping, so that torch.from_numpy can share the memory without warning
+            shard_path = os.path.join(self.store_dir, self.shards[shard_id])
+            self._mmaps[shard_id] = np.memmap(shard_path, dtype=np.uint8, mode="c")
+        return self._mmaps[shard_id]
+
+    def read(self, name):
+        """Return the stored (maybe reduced precision) features of the video, without decoding."""
+        info = self.videos[name]
+        dtype = np.dtype(info["dtype"])
+        shape = tuple(info["shape"])
+        nbytes = int(np.prod(shape)) * dtype.itemsize
+
+        shard = self.get_shard(info["shard"])
+        return shard[info["offset"] : info["offset"] + nbytes].view(dtype).reshape(shape)
+
+    def read_scale(self, name):
+        """Return the per-channel scale of int8 features, or None for other encodings."""
+        info = self.videos[name]
+        if "scale_offset" not in info.keys():
+            return None
+
+        num_channels = info["shape"][-1]
+        shard = self.get_shard(info["shard"])
+        return shard[info["scale_offset"] : info["scale_offset"] + num_channels * 4].view(np.float32)
+
+    def __contains__(self, name):
+        return name in self.videos
+
+    def __len__(self):
+        return len(self.videos)
+
+
+def encode_feats(feats, encoding=None):
+    """Encode the features to the on-disk dtype, return the encoded features and the int8 scale (or None)."""
+    feats = np.ascontiguousarray(feats)
+    if encoding is None:
+        return feats, None
+    elif encoding == "float16":
+        return feats.astype(np.float16), None
+    elif encoding == "int8":
+        feats = feats.astype(np.float32)
+        reduce_axis = tuple(range(feats.ndim - 1))
+        scale = np.abs(feats).max(axis=reduce_axis) / 127.0 if feats.size > 0 else np.ones(feats.shape[-1])
+        scale = np.where(scale > 0, scale, 1.0).astype(np.float32)
+        feats = np.clip(np.round(feats / scale), -127, 127).astype(np.int8)
+        return feats, scale
+    raise ValueError(f"not support encoding {encoding}")
+
+
+def decode_feats(feats, scale=None):
+    """Decode the stored features to float32, the inverse of `encode_feats`."""
+    feats = feats.astype(np.float32)
+    if scale is not None:
+        feats *= scale
+    return feats
+
+
+# the index of each store is parsed only once per process
+_SHARD_READERS = {}
+
+
+def get_shard_reader(store_dir):
+    store_dir = os.path.normpath(store_dir)
+    if store_dir not in _SHARD_READERS:
+        _SHARD_READERS[store_dir] = FeatureShardReader(store_dir)
+    return _SHARD_READERS[store_dir]
@@ -1,3 +1,5 @@
+import numpy as np
+import pandas as pd
 from mmengine.registry import Registry
 
 EVALUATORS = Registry("evaluators")
@@ -28,3 +30,29 @@ def remove_duplicate_annotations(ants, tol=1e-3):
         if valid:
             valid_events.append(event)
     return valid_events
+
+
+def is_columnar(results):
+    # the DetectionResults of opentad.models.utils.post_processing, checked without importing the models
+    return hasattr(results, "video_idxs") and hasattr(results, "label_names")
+
+
+def columnar_to_dataframe(results, blocked_videos=(), activity_index=None):
+    """Convert the columnar detection results to the prediction data frame, in the same order as the JSON format.
+    If activity_index is given, the label names are converted to the class indices, and the labels not in the
+    annotation get len(activity_index), otherwise the label column is skipped."""
+    order = np.concatenate([np.zeros(0, dtype=np.int64)] + results.split_by_video())
+    video_ids = np.array(results.video_names, dtype=object)[results.video_idxs[order]]
+    keep = ~np.isin(video_ids, list(blocked_videos))
+    order = order[keep]
+
+    prediction = {
+        "video-id": video_ids[keep].tolist(),
+        "t-start": results.segments[order, 0],
+        "t-end": results.segments[order, 1],
+    }
+    if activity_index is not None:
+        label_map = [activity_index.get(label, len(activity_index)) for label in results.label_names]
+        prediction["label"] = np.array(label_map, dtype=np.int64)[results.label_ids[order]]
+    prediction["score"] = results.scores[order]
+    return pd.DataFrame(prediction)
@@ -3,7 +3,7 @@ import numpy as np
 import pandas as pd
 import multiprocessing as mp
 
-from .builder import EVALUATORS, remove_duplicate_annotations
+from .builder import EVALUATORS, remove_duplicate_annotations, is_columnar, columnar_to_dataframe
 
 
 @EVALUATORS.register_module()
@@ -123,6 +123,10 @@ class mAP:
         if not all([field in list(data.keys()) for field in self.pred_fields]):
             raise IOError("Please input a valid prediction file.")
 
+        # the columnar results are converted without building the per-detection dicts
+        if is_columnar(data["results"]):
+            return columnar_to_dataframe(data["results"], self.blocked_videos, self.activity_index)
+
         # Read predictions.
         video_lst, t_start_lst, t_end_lst = [], [], []
         label_lst, score_lst = [], []
@@ -295,57 +299,79 @@ def compute_average_precision_detection(ground_truth, prediction, tiou_threshold
     ap : float
         Average precision score.
     """
+    tiou_thresholds = np.asarray(tiou_thresholds, dtype=float).reshape(-1)
     npos = float(len(ground_truth))
-    lock_gt = np.ones((len(tiou_thresholds), len(ground_truth))) * -1
     # Sort predictions by decreasing score order.
     sort_idx = prediction["score"].values.argsort()[::-1]
-    prediction = prediction.loc[sort_idx].reset_index(drop=True)
+    pred_videos = prediction["video-id"].values[sort_idx]
+    pred_segments = prediction[["t-start", "t-end"]].values.astype(float)[sort_idx]
+    gt_segments = ground_truth[["t-start", "t-end"]].values.astype(float)
+
+    # Group the ground truths and the sorted predictions by video once, keeping their orders.
+    gt_groups = ground_truth.groupby("video-id").indices
+    pred_groups = pd.DataFrame({"video-id": pred_videos}).groupby("video-id").indices
+
+    # The predictions of videos without ground truth are false positives.
+    tp = np.zeros((len(tiou_thresholds), len(prediction)), dtype=bool)
+    for video_id, pred_idx in pred_groups.items():
+        if video_id in gt_groups:
+            tp[:, pred_idx] = match_detections(
+                pred_segments[pred_idx],
+                gt_segments[gt_groups[video_id]],
+                tiou_thresholds,
+            )
 
-    # Initialize true positive and false positive vectors.
-    tp = np.zeros((len(tiou_thresholds), len(prediction)))
-    fp = np.zeros((len(tiou_thresholds), len(prediction)))
+    # Computing prec-rec of all the thresholds at once
+    tp_cumsum = np.cumsum(tp, axis=1).astype(float)
+    fp_cumsum = np.cumsum(~tp, axis=1).astype(float)
+    rec = tp_cumsum / npos
+    prec = tp_cumsum / (tp_cumsum + fp_cumsum)
 
-    # Adaptation to query faster
-    ground_truth_gbvn = ground_truth.groupby("video-id")
+    ap = np.zeros(len(tiou_thresholds))
+    for tidx in range(len(tiou_thresholds)):
+        ap[tidx] = interpolated_prec_rec(prec[tidx], rec[tidx])
+    return ap
 
-    # Assigning true positive to truly grount truth instances.
-    for idx, this_pred in prediction.iterrows():
-        try:
-            # Check if there is at least one ground truth in the video associated.
-            ground_truth_videoid = ground_truth_gbvn.get_group(this_pred["video-id"])
-        except Exception as e:
-            fp[:, idx] = 1
-            continue
 
-        this_gt = ground_truth_videoid.reset_index()
-        tiou_arr = segment_iou(this_pred[["t-start", "t-end"]].values, this_gt[["t-start", "t-end"]].values)
-        # We would like to retrieve the predictions with highest tiou score.
-        tiou_sorted_idx = tiou_arr.argsort()[::-1]
-        for tidx, tiou_thr in enumerate(tiou_thresholds):
-            for jdx in tiou_sorted_idx:
-                if tiou_arr[jdx] < tiou_thr:
-                    fp[tidx, idx] = 1
-                    break
-                if lock_gt[tidx, this_gt.loc[jdx]["index"]] >= 0:
-                    continue
-                # Assign as true positive after the filters above.
-                tp[tidx, idx] = 1
-                lock_gt[tidx, this_gt.loc[jdx]["index"]] = idx
-                break
-
-            if fp[tidx, idx] == 0 and tp[tidx, idx] == 0:
-                fp[tidx, idx] = 1
+def match_detections(pred_segments, gt_segments, tiou_thresholds):
+    """Greedy matching of the predictions of one video to its ground truths, for all the thresholds at once.
 
-    ap = np.zeros(len(tiou_thresholds))
+    Each prediction, in decreasing score order, is matched to the unmatched ground truth with the highest tIoU
+    above the threshold, which gives the same result as the per-prediction loop.
 
-    for tidx in range(len(tiou_thresholds)):
-        # Computing prec-rec
-        this_tp = np.cumsum(tp[tidx, :]).astype(float)
-        this_fp = np.cumsum(fp[tidx, :]).astype(float)
-        rec = this_tp / npos
-        prec = this_tp / (this_tp + this_fp)
-        ap[tidx] = interpolated_prec_rec(prec, rec)
-    return ap
+    Args:
+        pred_segments (ndarray): [P,2] predictions sorted by decreasing score.
+        gt_segments (ndarray): [G,2] ground truths.
+        tiou_thresholds (ndarray): [T] tIoU thresholds.
+
+    Returns:
+        ndarray: [T,P] bool, whether each prediction is a true positive at each threshold.
+    """
+    num_thresholds = len(tiou_thresholds)
+    tp = np.zeros((num_thresholds, len(pred_segments)), dtype=bool)
+    tiou = pairwise_segment_iou(pred_segments, gt_segments)  # [P,G]
+
+    # the predictions under the lowest threshold are false positives at all the thresholds
+    candidates = np.flatnonzero(tiou.max(axis=1) >= tiou_thresholds.min())
+    if len(candidates) == 0:
+        return tp
+
+    # ground truths of each prediction in decreasing tIoU order, the same tie order as segment_iou().argsort()
+    gt_order = np.argsort(tiou[candidates], axis=1)[:, ::-1]
+    sorted_tiou = np.take_along_axis(tiou[candidates], gt_order, axis=1)
+    above = sorted_tiou[:, None, :] >= tiou_thresholds[None, :, None]  # [C,T,G]
+
+    locked = np.zeros((num_thresholds, len(gt_segments)), dtype=bool)
+    thresholds = np.arange(num_thresholds)
+    for i, pidx in enumerate(candidates.tolist()):
+        order = gt_order[i]
+        # the first ground truth above the threshold and not matched yet
+        free = above[i] & ~locked[:, order]
+        first = free.argmax(axis=1)
+        matched = free[thresholds, first]
+        tp[matched, pidx] = True
+        locked[thresholds[matched], order[first[matched]]] = True
+    return tp
 
 
 def compute_topkx_recall_detection(
@@ -451,12 +477,28 @@ def k_segment_iou(target_segments, candidate_segments):
     return np.stack([segment_iou(target_segment, candidate_segments) for target_segment in target_segments])
 
 
+def pairwise_segment_iou(target_segments, candidate_segments):
+    """Compute the tIoU matrix [N,M] between N target segments and M candidate segments,
+    which is the same as stacking segment_iou of each target segment."""
+    tt1 = np.maximum(target_segments[:, None, 0], candidate_segments[None, :, 0])
+    tt2 = np.minimum(target_segments[:, None, 1], candidate_segments[None, :, 1])
+    segments_intersection = (tt2 - tt1).clip(0)
+    # keep the same order of the operations as segment_iou, so the results are bitwise identical
+    segments_union = (
+        (candidate_segments[None, :, 1] - candidate_segments[None, :, 0])
+        + (target_segments[:, None, 1] - target_segments[:, None, 0])
+        - segments_intersection
+    )
+    tIoU = segments_intersection.astype(float) / segments_union.clip(1e-8)
+    return tIoU
+
+
 def interpolated_prec_rec(prec, rec):
     """Interpolated AP - VOCdevkit from VOC 2011."""
     mprec = np.hstack([[0], prec, [0]])
     mrec = np.hstack([[0], rec, [1]])
-    for i in range(len(mprec) - 1)[::-1]:
-        mprec[i] = max(mprec[i], mprec[i + 1])
+    # the running maximum from the right
+    mprec = np.maximum.accumulate(mprec[::-1])[::-1]
     idx = np.where(mrec[1::] != mrec[0:-1])[0] + 1
     ap = np.sum((mrec[idx] - mrec[idx - 1]) * mprec[idx])
     return ap
@@ -3,7 +3,8 @@ import numpy as np
 import pandas as pd
 import multiprocessing as mp
 
-from .builder import EVALUATORS
+from .builder import EVALUATORS, is_columnar
+from .mAP import compute_average_precision_detection
 
 
 @EVALUATORS.register_module()
@@ -132,6 +133,10 @@ class mAP_EPIC:
         if not all([field in list(data.keys()) for field in self.pred_fields]):
             raise IOError("Please input a valid prediction file.")
 
+        # the noun / verb / action fields are only in the JSON format
+        if is_columnar(data["results"]):
+            data = dict(results=data["results"].to_dict())
+
         # Read predictions.
         video_lst, t_start_lst, t_end_lst = [], [], []
         label_lst, score_lst = [], []
@@ -230,120 +235,3 @@ class mAP_EPIC:
         for tiou, mAP in zip(self.tiou_thresholds, self.mAPs):
             pprint("mAP at tIoU {:.2f} is {:>4.2f}%".format(tiou, mAP * 100))
 
-
-def compute_average_precision_detection(ground_truth, prediction, tiou_thresholds=np.linspace(0.5, 0.95, 10)):
-    """Compute average precision (detection task) between ground truth and
-    predictions data frames. If multiple predictions occurs for the same
-    predicted segment, only the one with highest score is matches as
-    true positive. This code is greatly inspired by Pascal VOC devkit.
-
-    Parameters
-    ----------
-    ground_truth : df
-        Data frame containing the ground truth instances.
-        Required fields: ['video-id', 't-start', 't-end']
-    prediction : df
-        Data frame containing the prediction instances.
-        Required fields: ['video-id, 't-start', 't-end', 'score']
-    tiou_thresholds : 1darray, optional
-        Temporal intersection over union threshold.
-
-    Outputs
-    -------
-    ap : float
-        Average precision score.
-    """
-    npos = float(len(ground_truth))
-    lock_gt = np.ones((len(tiou_thresholds), len(ground_truth))) * -1
-    # Sort predictions by decreasing score order.
-    sort_idx = prediction["score"].values.argsort()[::-1]
-    prediction = prediction.loc[sort_idx].reset_index(drop=True)
-
-    # Initialize true positive and false positive vectors.
-    tp = np.zeros((len(tiou_thresholds), len(prediction)))
-    fp = np.zeros((len(tiou_thresholds), len(prediction)))
-
-    # Adaptation to query faster
-    ground_truth_gbvn = ground_truth.groupby("video-id")
-
-    # Assigning true positive to truly grount truth instances.
-    for idx, this_pred in prediction.iterrows():
-        try:
-            # Check if there is at least one ground truth in the video associated.
-            ground_truth_videoid = ground_truth_gbvn.get_group(this_pred["video-id"])
-        except Exception as e:
-            fp[:, idx] = 1
-            continue
-
-        this_gt = ground_truth_videoid.reset_index()
-        tiou_arr = segment_iou(this_pred[["t-start", "t-end"]].values, this_gt[["t-start", "t-end"]].values)
-        # We would like to retrieve the predictions with highest tiou score.
-        tiou_sorted_idx = tiou_arr.argsort()[::-1]
-        for tidx, tiou_thr in enumerate(tiou_thresholds):
-            for jdx in tiou_sorted_idx:
-                if tiou_arr[jdx] < tiou_thr:
-                    fp[tidx, idx] = 1
-                    break
-                if lock_gt[tidx, this_gt.loc[jdx]["index"]] >= 0:
-                    continue
-                # Assign as true positive after the filters above.
-                tp[tidx, idx] = 1
-                lock_gt[tidx, this_gt.loc[jdx]["index"]] = idx
-                break
-
-            if fp[tidx, idx] == 0 and tp[tidx, idx] == 0:
-                fp[tidx, idx] = 1
-
-    ap = np.zeros(len(tiou_thresholds))
-
-    for tidx in range(len(tiou_thresholds)):
-        # Computing prec-rec
-        this_tp = np.cumsum(tp[tidx, :]).astype(float)
-        this_fp = np.cumsum(fp[tidx, :]).astype(float)
-        rec = this_tp / npos
-        prec = this_tp / (this_tp + this_fp)
-        ap[tidx] = interpolated_prec_rec(prec, rec)
-    return ap
-
-
-def segment_iou(target_segment, candidate_segments):
-    """Compute the temporal intersection over union between a
-    target segment and all the test segments.
-
-    Parameters
-    ----------
-    target_segment : 1d array
-        Temporal target segment containing [starting, ending] times.
-    candidate_segments : 2d array
-        Temporal candidate segments containing N x [starting, ending] times.
-
-    Outputs
-    -------
-    tiou : 1d array
-        Temporal intersection over union score of the N's candidate segments.
-    """
-    tt1 = np.maximum(target_segment[0], candidate_segments[:, 0])
-    tt2 = np.minimum(target_segment[1], candidate_segments[:, 1])
-    # Intersection including Non-negative overlap score.
-    segments_intersection = (tt2 - tt1).clip(0)
-    # Segment union.
-    segments_union = (
-        (candidate_segments[:, 1] - candidate_segments[:, 0])
-        + (target_segment[1] - target_segment[0])
-        - segments_intersection
-    )
-    # Compute overlap as the ratio of the intersection
-    # over union of two segments.
-    tIoU = segments_intersection.astype(float) / segments_union.clip(1e-8)
-    return tIoU
-
-
-def interpolated_prec_rec(prec, rec):
-    """Interpolated AP - VOCdevkit from VOC 2011."""
-    mprec = np.hstack([[0], prec, [0]])
-    mrec = np.hstack([[0], rec, [1]])
-    for i in range(len(mprec) - 1)[::-1]:
-        mprec[i] = max(mprec[i], mprec[i + 1])
-    idx = np.where(mrec[1::] != mrec[0:-1])[0] + 1
-    ap = np.sum((mrec[idx] - mrec[idx - 1]) * mprec[idx])
-    return ap
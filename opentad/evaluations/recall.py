@@ -2,7 +2,7 @@ import json
 import numpy as np
 import pandas as pd
 
-from .builder import EVALUATORS, remove_duplicate_annotations
+from .builder import EVALUATORS, remove_duplicate_annotations, is_columnar, columnar_to_dataframe
 from .mAP import segment_iou
 
 
@@ -119,6 +119,10 @@ class Recall:
         if not all([field in list(data.keys()) for field in self.pred_fields]):
             raise IOError("Please input a valid proposal file.")
 
+        # the columnar results are converted without building the per-detection dicts
+        if is_columnar(data["results"]):
+            return columnar_to_dataframe(data["results"], self.blocked_videos)
+
         # Read predictions.
         video_lst, t_start_lst, t_end_lst = [], [], []
         score_lst = []
@@ -1,13 +1,18 @@
 import copy
+from collections import OrderedDict
 import torch
 import torch.nn as nn
+import torch.nn.functional as F
 from torch.nn.modules.batchnorm import _BatchNorm
+from torch.nn.modules.utils import _pair
 import torch.utils.checkpoint as cp
 
 from mmengine.dataset import Compose
 from mmengine.registry import MODELS as MM_BACKBONES
 from mmengine.runner import load_checkpoint
 
+from .feature_cache import DiskFeatureCache, get_module_hash
+
 BACKBONES = MM_BACKBONES
 
 
@@ -63,21 +68,127 @@ class BackboneWrapper(nn.Module):
             self.temporal_checkpointing_chunk_num = custom_cfg.temporal_checkpointing_chunk_num
             self.temporal_checkpointing_chunk_dim = custom_cfg.temporal_checkpointing_chunk_dim
 
+        # 7. feature_cache_dir: memoize the pooled features of the frozen backbone on disk in evaluation,
+        # keyed by the clip_key of each sample (see the ClipKey transform) and the hash of the backbone
+        self.feature_cache_dir = getattr(custom_cfg, "feature_cache_dir", None)
+        if self.feature_cache_dir is not None:
+            assert self.freeze_backbone, "feature_cache_dir can only be used with freeze_backbone=True"
+        self.feature_cache = None
+        self.clip_keys = None
+
+        # 8. activation_cache_dir: for adapter / LoRA / ladder ViTs, cache the tokens at the first trainable block
+        # on disk in low precision (activation_cache_dtype), and resume the forward from there in training.
+        # The backbone should implement forward_frozen and forward_trainable.
+        # The clip key does not cover the random augmentations (e.g. color jitter), and a random crop gives a new key
+        # in each epoch, so the cache is only used in training if activation_cache_deterministic=True is set for a
+        # train pipeline without random augmentations. activation_cache_max_gb limits the size of the cache on disk.
+        self.activation_cache_dir = getattr(custom_cfg, "activation_cache_dir", None)
+        self.activation_cache_dtype = getattr(torch, getattr(custom_cfg, "activation_cache_dtype", "float16"))
+        self.activation_cache_deterministic = getattr(custom_cfg, "activation_cache_deterministic", False)
+        self.activation_cache_max_gb = getattr(custom_cfg, "activation_cache_max_gb", None)
+        if self.activation_cache_dir is not None:
+            if not self.activation_cache_deterministic:
+                print(
+                    "Warning: activation cache is only used in evaluation, set activation_cache_deterministic=True "
+                    "to use it in training if the train pipeline has no random augmentation."
+                )
+            assert hasattr(self.model.backbone, "forward_frozen"), "the backbone does not support activation cache"
+            assert not (
+                self.use_temporal_checkpointing and self.temporal_checkpointing_chunk_dim != 0
+            ), "only temporal_checkpointing_chunk_dim=0 is supported with activation cache"
+        self.activation_cache = None
+
+        # 9. batched_normalize: the uint8 frames are transferred to the device, then normalized by mean / std in one
+        # batched op, instead of the per-sample data_preprocessor, default is False. Optionally, resize
+        # (device_resize=(H,W)) and center crop (device_center_crop=size) the frames on the device before the
+        # normalization.
+        self.batched_normalize = getattr(custom_cfg, "batched_normalize", False)
+        self.device_resize = getattr(custom_cfg, "device_resize", None)
+        self.device_center_crop = getattr(custom_cfg, "device_center_crop", None)
+
+        # 10. inference chunking: in evaluation, split the [B*N,3,T,H,W] input along inference_chunk_dim (0 or 2),
+        # and forward the chunks under no_grad, so that the peak memory does not grow with the window length.
+        # The chunk size is given by inference_chunk_size, or chosen from inference_memory_budget (in GB) by
+        # profiling the first chunk of inference_chunk_align samples / frames (e.g. the tubelet size for dim=2).
+        self.inference_chunk_dim = getattr(custom_cfg, "inference_chunk_dim", 0)
+        self.inference_chunk_size = getattr(custom_cfg, "inference_chunk_size", None)
+        self.inference_memory_budget = getattr(custom_cfg, "inference_memory_budget", None)
+        self.inference_chunk_align = getattr(custom_cfg, "inference_chunk_align", 1)
+        self.use_inference_chunking = self.inference_chunk_size is not None or self.inference_memory_budget is not None
+        assert self.inference_chunk_dim in [0, 2], "inference_chunk_dim should be 0 or 2"
+        self.auto_chunk_sizes = {}  # input shape -> chunk size chosen by the memory budget
+
+        # 11. snippet_feature_reuse: in sliding-window evaluation with LoadSnippetFrames, each snippet is forwarded
+        # independently, so the backbone outputs of the snippets in the overlap of adjacent windows are the same.
+        # They are kept in a rolling buffer of snippet_buffer_size snippets, keyed by the snippet_keys of ClipKey.
+        # The buffer holds the unpooled backbone outputs on the device, and only the snippets of the previous window
+        # can be reused, so it keeps two windows of snippets by default (snippet_buffer_size=None).
+        self.snippet_feature_reuse = getattr(custom_cfg, "snippet_feature_reuse", False)
+        self.snippet_buffer_size = getattr(custom_cfg, "snippet_buffer_size", None)
+        self.snippet_buffer = OrderedDict()
+        self.snippet_keys = None
+
+        self.model_info = repr(model_cfg) + repr(custom_cfg.get("pre_processing_pipeline", None))
+        self.model_info += repr(custom_cfg.get("post_processing_pipeline", None))
+
+    def set_clip_keys(self, metas):
+        # called by the detector before the forward, the keys are only used by the next forward
+        use_cache = self.feature_cache_dir is not None or self.activation_cache_dir is not None
+        if use_cache and all("clip_key" in meta for meta in metas):
+            self.clip_keys = [meta["clip_key"] for meta in metas]
+        else:
+            self.clip_keys = None
+
+        if self.snippet_feature_reuse and all("snippet_keys" in meta for meta in metas):
+            self.snippet_keys = [key for meta in metas for key in meta["snippet_keys"]]
+        else:
+            self.snippet_keys = None
+
     def forward(self, frames, masks=None):
         # two types: snippet or frame
 
         # snippet: 3D backbone, [bs, T, 3, clip_len, H, W]
         # frame: 3D backbone, [bs, 1, 3, T, H, W]
 
+        if self.training and len(self.snippet_buffer) > 0:  # the buffered features are stale after training
+            self.snippet_buffer.clear()
+
+        clip_keys, self.clip_keys = self.clip_keys, None
+        snippet_keys, self.snippet_keys = self.snippet_keys, None
+        if clip_keys is not None and self.feature_cache_dir is not None and not self.training:
+            features = self.forward_with_cache(frames, clip_keys)
+        else:
+            features = self.extract_features(frames, clip_keys, snippet_keys)
+
+        # apply mask
+        if masks is not None and features.dim() == 3:
+            features = features * masks.unsqueeze(1).detach().float()
+
+        # make sure detector has the float32 input
+        features = features.to(torch.float32)
+        return features
+
+    def forward_with_cache(self, frames, clip_keys):
+        if self.feature_cache is None:
+            namespace = get_module_hash(self.model, self.model_info)
+            self.feature_cache = DiskFeatureCache(self.feature_cache_dir, namespace)
+
+        # only the missing clips go through the backbone
+        features = [self.feature_cache.get(key) for key in clip_keys]
+        missing = [i for i, feature in enumerate(features) if feature is None]
+        if len(missing) > 0:
+            new_features = self.extract_features(frames[missing], [clip_keys[i] for i in missing])
+            for i, feature in zip(missing, new_features):
+                features[i] = feature
+                self.feature_cache.put(clip_keys[i], feature)
+        return torch.stack([feature.to(device=frames.device, dtype=torch.float32) for feature in features])
+
+    def extract_features(self, frames, clip_keys=None, snippet_keys=None):
         # set all normalization layers
         self.set_norm_layer()
 
         # data preprocessing: normalize mean and std
-        frames, _ = self.model.data_preprocessor.preprocess(
-            self.tensor_to_list(frames),  # need list input
-            data_samples=None,
-            training=False,  # for blending, which is not used in openTAD
-        )
+        frames = self.preprocess(frames)
 
         # pre_processing_pipeline:
         if self.pre_processing_pipeline is not None:
@@ -88,7 +199,17 @@ class BackboneWrapper(nn.Module):
         frames = frames.flatten(0, 1).contiguous()  # [bs*num_seg, ...]
 
         # go through the video backbone
-        if self.freeze_backbone:  # freeze everything even in training
+        use_activation_cache = not self.training or self.activation_cache_deterministic
+        if clip_keys is not None and self.activation_cache_dir is not None and use_activation_cache:
+            features = self.forward_with_activation_cache(frames, clip_keys, batches, num_segs)
+
+        elif snippet_keys is not None and len(snippet_keys) == frames.shape[0] and not self.training:
+            features = self.forward_with_snippet_reuse(frames, snippet_keys, num_segs)
+
+        elif self.use_inference_chunking and not self.training:
+            features = self.chunked_inference(frames)
+
+        elif self.freeze_backbone:  # freeze everything even in training
             with torch.no_grad():
                 if self.use_temporal_checkpointing:
                     features = self.temporal_checkpointing(
@@ -114,15 +235,171 @@ class BackboneWrapper(nn.Module):
             features = torch.cat([self.unflatten_and_pool_features(f, batches, num_segs) for f in features], dim=1)
         else:
             features = self.unflatten_and_pool_features(features, batches, num_segs)
+        return features
 
-        # apply mask
-        if masks is not None and features.dim() == 3:
-            features = features * masks.unsqueeze(1).detach().float()
+    def forward_with_activation_cache(self, frames, clip_keys, batches, num_segs):
+        backbone = self.model.backbone
+        if self.activation_cache is None:
+            # only the frozen weights decide the cached activations
+            namespace = get_module_hash(backbone, self.model_info, exclude=("adapter", "lora", "ladders"))
+            max_bytes = None
+            if self.activation_cache_max_gb is not None:
+                max_bytes = int(self.activation_cache_max_gb * 1024**3)
+            self.activation_cache = DiskFeatureCache(self.activation_cache_dir, namespace, max_bytes)
+
+        if hasattr(backbone, "_freeze_layers"):  # called in backbone.forward, which is bypassed here
+            backbone._freeze_layers()
+
+        # the frozen part only runs for the missing clips, each clip has num_segs inputs
+        tokens = [self.activation_cache.get(key) for key in clip_keys]
+        missing = [i for i, token in enumerate(tokens) if token is None]
+        if len(missing) > 0:
+            missing_frames = frames.unflatten(0, (batches, num_segs))[missing].flatten(0, 1)
+            with torch.no_grad():
+                new_tokens = backbone.forward_frozen(missing_frames).unflatten(0, (len(missing), num_segs))
+            for i, token in zip(missing, new_tokens):
+                tokens[i] = token
+                self.activation_cache.put(clip_keys[i], token.to(self.activation_cache_dtype))
+        tokens = torch.cat([token.to(device=frames.device, dtype=frames.dtype) for token in tokens], dim=0)
+
+        # resume the forward from the first trainable block
+        h = frames.shape[-2] // backbone.patch_size
+        w = frames.shape[-1] // backbone.patch_size
+        if self.freeze_backbone:
+            with torch.no_grad():
+                return backbone.forward_trainable(tokens, h, w)
+        if self.use_temporal_checkpointing:
+            return self.temporal_checkpointing(
+                tokens,
+                self.temporal_checkpointing_chunk_num,
+                0,
+                forward_fn=lambda x: backbone.forward_trainable(x, h, w),
+            )
+        return backbone.forward_trainable(tokens, h, w)
 
-        # make sure detector has the float32 input
-        features = features.to(torch.float32)
+    @torch.no_grad()
+    def forward_with_snippet_reuse(self, frames, snippet_keys, num_segs):
+        """Forward only the snippets which are not in the rolling buffer, the windows of one video should be
+        evaluated in order (e.g. with the VideoAffinityBatchSampler) to reuse the overlapped snippets.
+
+        Args:
+            frames (Tensor): input snippets, [B*N,3,clip_len,H,W]
+            snippet_keys (list[str]): key of each snippet, B*N keys.
+            num_segs (int): number of snippets in each window, N.
+        """
+        # the repeated snippets in this batch (e.g. the padded ones) are forwarded once
+        missing = {}
+        for i, key in enumerate(snippet_keys):
+            if key in self.snippet_buffer:
+                self.snippet_buffer.move_to_end(key)
+            elif key not in missing:
+                missing[key] = i
+
+        if len(missing) > 0:
+            missing_frames = frames[list(missing.values())]
+            if self.use_inference_chunking:
+                new_features = self.chunked_inference(missing_frames)
+            else:
+                new_features = self.model.backbone(missing_frames)
+            assert isinstance(new_features, torch.Tensor), "snippet_feature_reuse only supports the tensor output"
+
+            for key, feature in zip(missing.keys(), new_features):
+                self.snippet_buffer[key] = feature.clone()  # not a view, which keeps the whole batch output alive
+        features = torch.stack([self.snippet_buffer[key] for key in snippet_keys])
+
+        buffer_size = self.snippet_buffer_size or 2 * num_segs
+        while len(self.snippet_buffer) > buffer_size:
+            self.snippet_buffer.popitem(last=False)
         return features
 
+    @torch.no_grad()
+    def chunked_inference(self, frames):
+        """Forward the backbone chunk by chunk without gradients, and concatenate the outputs.
+
+        Args:
+            frames (Tensor): input frames, [B*N,3,T,H,W]
+        """
+        dim = self.inference_chunk_dim
+        length = frames.shape[dim]
+        shape_key = tuple(frames.shape[:dim] + frames.shape[dim + 1 :])
+        chunk_size = self.inference_chunk_size or self.auto_chunk_sizes.get(shape_key, None)
+
+        video_feat = []
+        start = 0
+        if chunk_size is None:
+            if frames.is_cuda:  # profile the first chunk to choose the chunk size of this input shape
+                chunk_size = self.inference_chunk_align
+                torch.cuda.synchronize(frames.device)
+                torch.cuda.reset_peak_memory_stats(frames.device)
+                base_memory = torch.cuda.memory_allocated(frames.device)
+                video_feat.append(self.model.backbone(frames.narrow(dim, 0, min(chunk_size, length))))
+                peak_memory = torch.cuda.max_memory_allocated(frames.device) - base_memory
+                start = chunk_size
+
+                memory_per_unit = max(peak_memory / chunk_size, 1)
+                chunk_size = int(self.inference_memory_budget * 1024**3 // memory_per_unit)
+                chunk_size = max(chunk_size // self.inference_chunk_align, 1) * self.inference_chunk_align
+            else:  # no memory statistics on cpu
+                chunk_size = length
+            self.auto_chunk_sizes[shape_key] = chunk_size
+
+        for chunk_start in range(start, length, chunk_size):
+            mini_frames = frames.narrow(dim, chunk_start, min(chunk_size, length - chunk_start))
+            video_feat.append(self.model.backbone(mini_frames))
+
+        if isinstance(video_feat[0], (tuple, list)):
+            video_feat = [torch.cat([f[idx] for f in video_feat], dim=dim) for idx in range(len(video_feat[0]))]
+        else:
+            video_feat = torch.cat(video_feat, dim=dim)
+        return video_feat
+
+    def preprocess(self, frames):
+        data_preprocessor = self.model.data_preprocessor
+        if not (self.batched_normalize and self.support_batched_normalize(data_preprocessor)):
+            assert self.device_resize is None and self.device_center_crop is None, "need batched_normalize=True"
+            frames, _ = data_preprocessor.preprocess(
+                self.tensor_to_list(frames),  # need list input
+                data_samples=None,
+                training=False,  # for blending, which is not used in openTAD
+            )
+            return frames
+
+        frames = frames.float()
+        if self.device_resize is not None or self.device_center_crop is not None:
+            frames = self.resize_and_crop(frames)
+        if getattr(data_preprocessor, "_enable_normalize", False):
+            frames = (frames - data_preprocessor.mean) / data_preprocessor.std
+        return frames
+
+    @staticmethod
+    def support_batched_normalize(data_preprocessor):
+        # the same results as data_preprocessor.preprocess, if it only casts and normalizes the frames
+        return (
+            hasattr(data_preprocessor, "mean")
+            and getattr(data_preprocessor, "format_shape", "NCTHW") in ["NCTHW", "NCHW"]
+            and not getattr(data_preprocessor, "to_rgb", False)  # ActionDataPreprocessor
+            and not getattr(data_preprocessor, "_channel_conversion", False)  # mmengine ImgDataPreprocessor
+            and getattr(data_preprocessor, "pad_size_divisor", 1) == 1
+        )
+
+    def resize_and_crop(self, frames):
+        # frames: [B,N,C,T,H,W], resize and crop each frame
+        assert frames.dim() == 6, "device_resize / device_center_crop only support the NCTHW format"
+        B, N, C, T, H, W = frames.shape
+        frames = frames.permute(0, 1, 3, 2, 4, 5).flatten(0, 2)  # [B*N*T,C,H,W]
+
+        if self.device_resize is not None:
+            frames = F.interpolate(frames, size=tuple(self.device_resize), mode="bilinear", align_corners=False)
+
+        if self.device_center_crop is not None:
+            crop_h, crop_w = _pair(self.device_center_crop)
+            top = (frames.shape[-2] - crop_h) // 2
+            left = (frames.shape[-1] - crop_w) // 2
+            frames = frames[..., top : top + crop_h, left : left + crop_w]
+
+        frames = frames.unflatten(0, (B, N, T)).permute(0, 1, 3, 2, 4, 5).contiguous()
+        return frames
+
     def tensor_to_list(self, tensor):
         return [t for t in tensor]
 
@@ -144,7 +421,7 @@ class BackboneWrapper(nn.Module):
                     for param in m.parameters():
                         param.requires_grad = False
 
-    def temporal_checkpointing(self, frames, chunk_num, chunk_dim):
+    def temporal_checkpointing(self, frames, chunk_num, chunk_dim, forward_fn=None):
         """Temporal Checkpointing for Video Backbone.
 
         Temporal checkpointing will 1) split the video frames along the temporal dimension and sequentially forward each chunk with
@@ -155,9 +432,12 @@ class BackboneWrapper(nn.Module):
             frames (Tensor): input frames, [B*N,3,T,H,W]
             chunk_num (int): number of chunks to split the temporal dimension
             chunk_dim (int): input shape is [B*N,3,T,H,W], so either dim=0 or 2 is fine
+            forward_fn (callable | None): the function to checkpoint, default is the backbone forward
         """
 
         def _inner_forward(frames):
+            if forward_fn is not None:
+                return forward_fn(frames)
             return self.model.backbone(frames)
 
         video_feat = []
@@ -0,0 +1,110 @@
+import hashlib
+import os
+from collections import OrderedDict
+import torch
+
+
+class DiskFeatureCache:
+    """A disk cache of tensors, one file per key, used to memoize the outputs of a frozen backbone.
+
+    The files are saved in `cache_dir/namespace/key[:2]/key.pt`, where the namespace should identify the model
+    (e.g. the hash of its config and weights), so that the entries of a different model are never used.
+    With max_bytes, the least recently used files (by mtime, which is updated on each hit) are removed once the
+    namespace grows over max_bytes. Each process only tracks the files it has seen at start-up, read or written.
+
+    Args:
+        cache_dir (str): root folder of the cache.
+        namespace (str): sub folder of current model.
+        max_bytes (int, optional): size limit of the namespace in bytes. Default: None, no limit.
+    """
+
+    def __init__(self, cache_dir, namespace, max_bytes=None):
+        self.cache_dir = os.path.join(cache_dir, namespace)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # path -> size, from the least to the most recently used
+        self.total_bytes = 0
+        if self.max_bytes is not None:
+            self.scan()
+
+    def scan(self):
+        files = []
+        for root, _, names in os.walk(self.cache_dir):
+            for name in names:
+                if name.endswith(".pt"):
+                    path = os.path.join(root, name)
+                    stat = os.stat(path)
+                    files.append((stat.st_mtime, path, stat.st_size))
+        for _, path, size in sorted(files):
+            self.entries[path] = size
+        self.total_bytes = sum(self.entries.values())
+
+    def get_path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.pt")
+
+    def get(self, key):
+        path = self.get_path(key)
+        if os.path.exists(path):
+            try:
+                value = torch.load(path, map_location="cpu")
+                self.hits += 1
+                if self.max_bytes is not None:
+                    os.utime(path)  # keep the order of use across runs
+                    self.touch(path)
+                return value
+            except Exception:  # broken file, e.g. the writer was killed, recompute it
+                pass
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        path = self.get_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # write to a temporary file first, since multiple ranks may write the same key at the same time
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        torch.save(value.detach().cpu().clone(), tmp_path)
+        os.replace(tmp_path, path)
+        if self.max_bytes is not None:
+            self.touch(path)
+            self.evict()
+
+    def touch(self, path):
+        self.total_bytes -= self.entries.pop(path, 0)
+        self.entries[path] = os.path.getsize(path)
+        self.total_bytes += self.entries[path]
+
+    def evict(self):
+        # the latest entry is always kept, even if it is larger than max_bytes
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            path, size = self.entries.popitem(last=False)
+            self.total_bytes -= size
+            try:
+                os.remove(path)
+            except FileNotFoundError:  # removed by another process
+                pass
+
+    def __repr__(self):
+        total = self.hits + self.misses
+        hit_rate = self.hits / total if total > 0 else 0.0
+        return f"{self.__class__.__name__}(dir={self.cache_dir}, hits={self.hits}, hit_rate={hit_rate:.3f})"
+
+
+@torch.no_grad()
+def get_module_hash(module, extra_info="", exclude=()):
+    """A fingerprint of the module weights and extra info (e.g. the config).
+
+    The raw bytes of each parameter / buffer are hashed with its name, dtype and shape, so that any change of the
+    weights gives a new fingerprint. All the weights are read once, so it is computed once per cache. The weights
+    whose names contain any of `exclude` (e.g. the trainable adapters) are skipped.
+    """
+    hasher = hashlib.sha1(extra_info.encode())
+    for name, tensor in list(module.named_parameters()) + list(module.named_buffers()):
+        if any(key in name for key in exclude):
+            continue
+        tensor = tensor.detach().contiguous()
+        hasher.update(f"{name}:{tensor.dtype}:{tuple(tensor.shape)}".encode())
+        hasher.update(tensor.reshape(-1).view(torch.uint8).cpu().numpy())
+    return hasher.hexdigest()[:16]
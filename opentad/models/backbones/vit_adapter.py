@@ -378,6 +378,7 @@ class VisionTransformerAdapter(BaseModule):
 
         self.embed_dims = embed_dims
         self.patch_size = patch_size
+        self.adapter_index = adapter_index
 
         self.patch_embed = PatchEmbed(
             in_channels=in_channels,
@@ -450,9 +451,21 @@ class VisionTransformerAdapter(BaseModule):
         """
         self._freeze_layers()
 
-        b, _, _, h, w = x.shape
-        h //= self.patch_size
-        w //= self.patch_size
+        h = x.shape[-2] // self.patch_size
+        w = x.shape[-1] // self.patch_size
+        x = self.forward_frozen(x)
+        return self.forward_trainable(x, h, w)
+
+    @property
+    def frozen_depth(self):
+        # the blocks before the first adapter are totally frozen
+        return min(self.adapter_index) if len(self.adapter_index) > 0 else len(self.blocks)
+
+    def forward_frozen(self, x: Tensor) -> Tensor:
+        """Forward the frozen part: patch embedding and the blocks before the first adapter.
+        The output tokens [B,N,C] can be cached by the activation cache of BackboneWrapper."""
+        h = x.shape[-2] // self.patch_size
+        w = x.shape[-1] // self.patch_size
         x = self.patch_embed(x)[0]
         if (h, w) != self.grid_size:
             pos_embed = self.pos_embed.reshape(-1, *self.grid_size, self.embed_dims)
@@ -466,7 +479,14 @@ class VisionTransformerAdapter(BaseModule):
         x = x + pos_embed
         x = self.pos_drop(x)
 
-        for blk in self.blocks:
+        for blk in self.blocks[: self.frozen_depth]:
+            x = blk(x, h, w)
+        return x
+
+    def forward_trainable(self, x: Tensor, h: int, w: int) -> Tensor:
+        """Forward the rest blocks from the output tokens of forward_frozen, h and w are the token grid size."""
+        b = x.shape[0]
+        for blk in self.blocks[self.frozen_depth :]:
             x = blk(x, h, w)
 
         x = self.norm(x)
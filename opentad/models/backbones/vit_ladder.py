@@ -426,6 +426,19 @@ class VisionTransformerLadder(BaseModule):
         out = out.permute(0, 4, 1, 2, 3)
         return out
 
+    def forward_frozen(self, x: Tensor) -> Tensor:
+        """Forward the frozen ViT, and stack the tokens of the adapter_index blocks into [B,L,N,C].
+        The output can be cached by the activation cache of BackboneWrapper."""
+        return torch.stack(self.forward_vit(x), dim=1)
+
+    def forward_trainable(self, x: Tensor, h: int, w: int) -> Tensor:
+        """Forward the ladder network from the output of forward_frozen, h and w are the token grid size."""
+        b = x.shape[0]
+        out = self.ladders(list(x.unbind(dim=1)), h, w)
+        out = out.reshape(b, -1, h, w, self.embed_dims)
+        out = out.permute(0, 4, 1, 2, 3)
+        return out
+
     @torch.no_grad()
     def forward_vit(self, x: Tensor) -> Tensor:
         self._freeze_layers()
@@ -24,6 +24,7 @@ class ActionFormer(SingleStageDetector):
         rpn_head,        # RPN（区域提议网络）头：用于生成动作检测的候选区域
         neck=None,       # 特征融合层（可选）：用于融合多尺度特征
         backbone=None,   # 骨干网络（可选）：用于提取视频特征
+        dynamic_padding=False,  # 动态填充：只填充到 batch 内最大长度（按 max_div_factor 取整），而不是 max_seq_len
     ):
         """
         初始化 ActionFormer 模型
@@ -33,6 +34,7 @@ class ActionFormer(SingleStageDetector):
             rpn_head: 区域提议网络头，负责生成动作检测结果
             neck: 可选的特征融合层
             backbone: 可选的骨干网络，用于特征提取
+            dynamic_padding: 是否使用动态填充，需配合 dataloader 的 dynamic_padding 使用
         """
         # 调用父类初始化方法，设置基础组件
         super().__init__(
@@ -70,6 +72,7 @@ class ActionFormer(SingleStageDetector):
             if max_div_factor < stride:
                 max_div_factor = stride
         self.max_div_factor = max_div_factor
+        self.dynamic_padding = dynamic_padding
 
     def pad_data(self, inputs, masks):
         """
@@ -88,8 +91,14 @@ class ActionFormer(SingleStageDetector):
         # 获取当前特征序列的长度（最后一个维度）
         feat_len = inputs.shape[-1]
         
+        # 动态填充：只填充到下一个可被 max_div_factor 整除的长度，可以短于最大序列长度
+        if self.dynamic_padding:
+            stride = self.max_div_factor
+            max_len = (feat_len + (stride - 1)) // stride * stride
+            if max_len == feat_len:
+                return inputs, masks
         # 如果长度正好等于最大序列长度，直接返回
-        if feat_len == self.max_seq_len:
+        elif feat_len == self.max_seq_len:
             return inputs, masks
         # 如果长度小于最大序列长度，填充到最大序列长度
         elif feat_len < self.max_seq_len:
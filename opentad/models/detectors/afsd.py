@@ -5,7 +5,7 @@ import numpy as np
 
 from ..builder import DETECTORS
 from .two_stage import TwoStageDetector
-from ..utils.post_processing import batched_nms, convert_to_seconds
+from ..utils.post_processing import batched_nms, convert_to_seconds, DetectionResults
 
 
 @DETECTORS.register_module()
@@ -180,7 +180,7 @@ class AFSD(TwoStageDetector):
         pre_nms_thresh = getattr(post_cfg, "pre_nms_thresh", 0.001)
         pre_nms_topk = getattr(post_cfg, "pre_nms_topk", 2000)
 
-        results = {}
+        results = DetectionResults()
         for i in range(len(metas)):  # processing each video
             loc = locs[i]  # [T,2]
             conf = nn.Softmax(dim=-1)(confs[i])  # [N,num_class]
@@ -255,21 +255,7 @@ class AFSD(TwoStageDetector):
             else:
                 segments, labels, scores = ext_cls(video_id, segments, scores)
 
-            results_per_video = []
-            for segment, label, score in zip(segments, labels, scores):
-                # convert to python scalars
-                results_per_video.append(
-                    dict(
-                        segment=[round(seg.item(), 2) for seg in segment],
-                        label=label,
-                        score=round(score.item(), 4),
-                    )
-                )
-
-            if video_id in results.keys():
-                results[video_id].extend(results_per_video)
-            else:
-                results[video_id] = results_per_video
+            results.add(video_id, segments, labels, scores)
         return results
 
 
@@ -20,12 +20,39 @@ class BaseDetector(torch.nn.Module):
         post_cfg=None,
         **kwargs
     ):
+        # compact features (float16 / int8) are upcasted on the device
+        inputs = self.upcast_inputs(inputs, kwargs.pop("inputs_scale", None))
+
+        # the frozen backbone can reuse the cached features by the clip keys, see BackboneWrapper
+        if hasattr(getattr(self, "backbone", None), "set_clip_keys"):
+            self.backbone.set_clip_keys(metas)
+
         if return_loss:
             return self.forward_train(inputs, masks, metas, gt_segments=gt_segments, gt_labels=gt_labels, **kwargs)
         else:
             return self.forward_detection(inputs, masks, metas, infer_cfg, post_cfg, **kwargs)
 
+    @staticmethod
+    def upcast_inputs(inputs, inputs_scale=None):
+        """Upcast the compact features loaded by `LoadFeats(keep_dtype=True)` to float32.
+
+        Args:
+            inputs (Tensor): float16 or int8 features, [B,C,T] as given by Collect.
+            inputs_scale (Tensor | None): per-channel scale of the int8 features, [B,C].
+        """
+        if inputs_scale is not None:
+            assert inputs.dim() == 3 and inputs.shape[1] == inputs_scale.shape[1], "inputs_scale needs [B,C,T] inputs"
+            inputs_scale = inputs_scale.to(device=inputs.device, dtype=torch.float32)
+            return inputs.float() * inputs_scale.unsqueeze(-1)
+        elif inputs.dtype in [torch.float16, torch.int8]:
+            return inputs.float()
+        return inputs
+
     def forward_detection(self, inputs, masks, metas, infer_cfg, post_cfg, **kwargs):
+        """Return the DetectionResults of the batch. If post_executor is given in kwargs (the PostProcessingPool of
+        eval_one_epoch), the post processing is submitted to it, and a concurrent.futures.Future of the results is
+        returned instead, which should be passed to PostProcessingPool.put.
+        """
         # step1: inference the model
         if infer_cfg.load_from_raw_predictions:  # easier and faster to tune the hyper parameter in postprocessing
             predictions = load_predictions(metas, infer_cfg)
@@ -36,5 +63,13 @@ class BaseDetector(torch.nn.Module):
                 save_predictions(predictions, metas, infer_cfg.folder)
 
         # step2: detection post processing
+        post_executor = kwargs.pop("post_executor", None)
+        if post_executor is not None:  # run in the post processing pool, overlapped with the next forward
+            return post_executor.submit(self.post_processing_no_grad, predictions, metas, post_cfg, **kwargs)
         results = self.post_processing(predictions, metas, post_cfg, **kwargs)
         return results
+
+    @torch.no_grad()
+    def post_processing_no_grad(self, predictions, metas, post_cfg, **kwargs):
+        # the grad mode is thread local, so it is set again in the worker thread
+        return self.post_processing(predictions, metas, post_cfg, **kwargs)
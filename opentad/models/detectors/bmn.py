@@ -3,7 +3,7 @@ import torch.nn as nn
 
 from ..builder import DETECTORS
 from .two_stage import TwoStageDetector
-from ..utils.post_processing import boundary_choose, batched_nms, convert_to_seconds
+from ..utils.post_processing import boundary_choose, batched_nms, convert_to_seconds, DetectionResults
 
 
 @DETECTORS.register_module()
@@ -82,7 +82,7 @@ class BMN(TwoStageDetector):
         start_end_map = start_mask.unsqueeze(2) * end_mask.unsqueeze(1)
         pred_iou_map = pred_iou_map[:, 0, :, :] * pred_iou_map[:, 1, :, :]
 
-        results = {}
+        results = DetectionResults()
         for i in range(len(metas)):  # processing each video
             start_end_mask = start_end_map[i][
                 start_end_index[:, :, 0].view(-1).long(),
@@ -122,21 +122,7 @@ class BMN(TwoStageDetector):
             # merge with external classifier
             segments, labels, scores = ext_cls(video_id, segments, scores)
 
-            results_per_video = []
-            for segment, label, score in zip(segments, labels, scores):
-                # convert to python scalars
-                results_per_video.append(
-                    dict(
-                        segment=[round(seg.item(), 2) for seg in segment],
-                        label=label,
-                        score=round(score.item(), 4),
-                    )
-                )
-
-            if video_id in results.keys():
-                results[video_id].extend(results_per_video)
-            else:
-                results[video_id] = results_per_video
+            results.add(video_id, segments, labels, scores)
 
         return results
 
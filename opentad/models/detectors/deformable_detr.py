@@ -5,7 +5,7 @@ from ..builder import DETECTORS
 from .detr import DETR
 from ..bricks import AffineDropPath
 from ..utils.bbox_tools import proposal_cw_to_se
-from ..utils.post_processing import batched_nms, convert_to_seconds
+from ..utils.post_processing import batched_nms, convert_to_seconds, DetectionResults
 
 
 @DETECTORS.register_module()
@@ -102,7 +102,7 @@ class DeformableDETR(DETR):
         batch_proposals = proposal_cw_to_se(pred_boxes) * torch.sum(masks, dim=1)[:, None, None]  # cw -> sw, 0~tscale
         batch_proposals = torch.gather(batch_proposals, 1, topk_boxes.unsqueeze(-1).repeat(1, 1, 2))
 
-        results = {}
+        results = DetectionResults()
         for i in range(len(metas)):  # processing each video
             segments = batch_proposals[i].detach().cpu()  # [N,2]
             scores = batch_scores[i].detach().cpu()  # [N,class]
@@ -123,21 +123,7 @@ class DeformableDETR(DETR):
             else:
                 segments, labels, scores = ext_cls(video_id, segments, scores)
 
-            results_per_video = []
-            for segment, label, score in zip(segments, labels, scores):
-                # convert to python scalars
-                results_per_video.append(
-                    dict(
-                        segment=[round(seg.item(), 2) for seg in segment],
-                        label=label,
-                        score=round(score.item(), 4),
-                    )
-                )
-
-            if video_id in results.keys():
-                results[video_id].extend(results_per_video)
-            else:
-                results[video_id] = results_per_video
+            results.add(video_id, segments, labels, scores)
 
         return results
 
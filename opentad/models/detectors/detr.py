@@ -3,7 +3,7 @@ import torch
 from .base import BaseDetector
 from ..builder import DETECTORS, build_transformer, build_backbone, build_projection, build_neck
 from ..utils.bbox_tools import proposal_cw_to_se
-from ..utils.post_processing import batched_nms, convert_to_seconds
+from ..utils.post_processing import batched_nms, convert_to_seconds, DetectionResults
 
 
 @DETECTORS.register_module()
@@ -104,7 +104,7 @@ class DETR(BaseDetector):
         pre_nms_topk = 200
         num_classes = batch_scores.shape[-1]
 
-        results = {}
+        results = DetectionResults()
         for i in range(len(metas)):  # processing each video
             segments = batch_proposals[i].detach().cpu()  # [N,2]
             scores = batch_scores[i].detach().cpu()  # [N,class]
@@ -145,20 +145,6 @@ class DETR(BaseDetector):
             else:
                 segments, labels, scores = ext_cls(video_id, segments, scores)
 
-            results_per_video = []
-            for segment, label, score in zip(segments, labels, scores):
-                # convert to python scalars
-                results_per_video.append(
-                    dict(
-                        segment=[round(seg.item(), 2) for seg in segment],
-                        label=label,
-                        score=round(score.item(), 4),
-                    )
-                )
-
-            if video_id in results.keys():
-                results[video_id].extend(results_per_video)
-            else:
-                results[video_id] = results_per_video
+            results.add(video_id, segments, labels, scores)
 
         return results
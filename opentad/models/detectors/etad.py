@@ -3,7 +3,7 @@ import torch.nn as nn
 
 from ..builder import DETECTORS
 from .two_stage import TwoStageDetector
-from ..utils.post_processing import boundary_choose, batched_nms, convert_to_seconds
+from ..utils.post_processing import boundary_choose, batched_nms, convert_to_seconds, DetectionResults
 
 
 @DETECTORS.register_module()
@@ -68,7 +68,7 @@ class ETAD(TwoStageDetector):
         end_mask = boundary_choose(tem_score[:, 1, :])
         end_mask[:, -1] = True
 
-        results = {}
+        results = DetectionResults()
         for i in range(len(metas)):  # processing each video
             start_idx = proposals[i][:, 0].int().clip(0, tscale - 1)
             end_idx = proposals[i][:, 1].int().clip(0, tscale - 1)
@@ -90,19 +90,5 @@ class ETAD(TwoStageDetector):
             # merge with external classifier
             segments, labels, scores = ext_cls(video_id, segments, scores)
 
-            results_per_video = []
-            for segment, label, score in zip(segments, labels, scores):
-                # convert to python scalars
-                results_per_video.append(
-                    dict(
-                        segment=[round(seg.item(), 2) for seg in segment],
-                        label=label,
-                        score=round(score.item(), 4),
-                    )
-                )
-
-            if video_id in results.keys():
-                results[video_id].extend(results_per_video)
-            else:
-                results[video_id] = results_per_video
+            results.add(video_id, segments, labels, scores)
         return results
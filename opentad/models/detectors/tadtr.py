@@ -3,7 +3,7 @@ import torch
 from ..builder import DETECTORS
 from .deformable_detr import DeformableDETR
 from ..utils.bbox_tools import proposal_cw_to_se
-from ..utils.post_processing import batched_nms, convert_to_seconds
+from ..utils.post_processing import batched_nms, convert_to_seconds, DetectionResults
 
 
 @DETECTORS.register_module()
@@ -47,7 +47,7 @@ class TadTR(DeformableDETR):
         batch_proposals = proposal_cw_to_se(pred_boxes) * masks.shape[-1]  # cw -> sw, 0~tscale
         batch_proposals = torch.gather(batch_proposals, 1, topk_boxes.unsqueeze(-1).repeat(1, 1, 2))
 
-        results = {}
+        results = DetectionResults()
         for i in range(len(metas)):  # processing each video
             segments = batch_proposals[i].detach().cpu()  # [N,2]
             scores = batch_scores[i].detach().cpu()  # [N,class]
@@ -68,21 +68,7 @@ class TadTR(DeformableDETR):
             else:
                 segments, labels, scores = ext_cls(video_id, segments, scores)
 
-            results_per_video = []
-            for segment, label, score in zip(segments, labels, scores):
-                # convert to python scalars
-                results_per_video.append(
-                    dict(
-                        segment=[round(seg.item(), 2) for seg in segment],
-                        label=label,
-                        score=round(score.item(), 4),
-                    )
-                )
-
-            if video_id in results.keys():
-                results[video_id].extend(results_per_video)
-            else:
-                results[video_id] = results_per_video
+            results.add(video_id, segments, labels, scores)
 
         return results
 
@@ -4,7 +4,7 @@ import torch.nn as nn
 from ..builder import DETECTORS
 from .single_stage import SingleStageDetector
 from ..bricks import Scale, AffineDropPath
-from ..utils.post_processing import batched_nms, convert_to_seconds
+from ..utils.post_processing import batched_nms, convert_to_seconds, DetectionResults
 
 
 @DETECTORS.register_module()
@@ -15,6 +15,7 @@ class TriDet(SingleStageDetector):
         rpn_head,
         neck=None,
         backbone=None,
+        dynamic_padding=False,  # pad to the next divisible size instead of max_seq_len, see collate(pad_divisor)
     ):
         super(TriDet, self).__init__(
             backbone=backbone,
@@ -32,10 +33,16 @@ class TriDet(SingleStageDetector):
             if max_div_factor < stride:
                 max_div_factor = stride
         self.max_div_factor = max_div_factor
+        self.dynamic_padding = dynamic_padding
 
     def pad_data(self, inputs, masks):
         feat_len = inputs.shape[-1]
-        if feat_len <= self.max_seq_len:
+        if self.dynamic_padding:
+            stride = self.max_div_factor
+            max_len = (feat_len + (stride - 1)) // stride * stride
+            if max_len == feat_len:
+                return inputs, masks
+        elif feat_len <= self.max_seq_len:
             max_len = self.max_seq_len
         else:
             max_len = feat_len
@@ -57,7 +64,7 @@ class TriDet(SingleStageDetector):
             x = inputs
 
         # pad the features and unsqueeze the mask
-        if not self.training:
+        if not self.training or self.dynamic_padding:
             x, masks = self.pad_data(x, masks)
 
         if self.with_projection:
@@ -105,7 +112,7 @@ class TriDet(SingleStageDetector):
         num_classes = rpn_scores.shape[-1]
         points = points.cpu()
 
-        results = {}
+        results = DetectionResults()
         for i in range(len(metas)):  # processing each video
             scores = rpn_scores[i].detach().cpu()  # [N]
             reg = rpn_reg[i].detach().cpu()  # [num_classes, N, 2]
@@ -152,21 +159,7 @@ class TriDet(SingleStageDetector):
             else:
                 segments, labels, scores = ext_cls(video_id, segments, scores)
 
-            results_per_video = []
-            for segment, label, score in zip(segments, labels, scores):
-                # convert to python scalars
-                results_per_video.append(
-                    dict(
-                        segment=[round(seg.item(), 2) for seg in segment],
-                        label=label,
-                        score=round(score.item(), 4),
-                    )
-                )
-
-            if video_id in results.keys():
-                results[video_id].extend(results_per_video)
-            else:
-                results[video_id] = results_per_video
+            results.add(video_id, segments, labels, scores)
 
         return results
 
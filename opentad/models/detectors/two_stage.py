@@ -1,7 +1,7 @@
 import torch
 from .base import BaseDetector
 from ..builder import DETECTORS, build_backbone, build_projection, build_head, build_neck
-from ..utils.post_processing import batched_nms, convert_to_seconds
+from ..utils.post_processing import batched_nms, convert_to_seconds, DetectionResults
 
 
 @DETECTORS.register_module()
@@ -131,7 +131,7 @@ class TwoStageDetector(BaseDetector):
         pre_nms_topk = 2000
         num_classes = roi_scores[0].shape[-1]
 
-        results = {}
+        results = DetectionResults()
         for i in range(len(metas)):  # processing each video
             segments = roi_proposals[i].detach().cpu()  # [N,2]
             scores = (rpn_scores[i].unsqueeze(-1) * roi_scores[i]).detach().cpu()  # [N,class]
@@ -178,20 +178,6 @@ class TwoStageDetector(BaseDetector):
             else:
                 segments, labels, scores = ext_cls(video_id, segments, scores)
 
-            results_per_video = []
-            for segment, label, score in zip(segments, labels, scores):
-                # convert to python scalars
-                results_per_video.append(
-                    dict(
-                        segment=[round(seg.item(), 2) for seg in segment],
-                        label=label,
-                        score=round(score.item(), 4),
-                    )
-                )
-
-            if video_id in results.keys():
-                results[video_id].extend(results_per_video)
-            else:
-                results[video_id] = results_per_video
+            results.add(video_id, segments, labels, scores)
 
         return results
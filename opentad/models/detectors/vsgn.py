@@ -2,7 +2,7 @@ import torch
 import torch.nn as nn
 from .two_stage import TwoStageDetector
 from ..builder import DETECTORS
-from ..utils.post_processing import batched_nms, convert_to_seconds
+from ..utils.post_processing import batched_nms, convert_to_seconds, DetectionResults
 
 
 @DETECTORS.register_module()
@@ -97,7 +97,7 @@ class VSGN(TwoStageDetector):
         tscale = tem_logits.shape[-1]
         start_scores, end_scores, _ = tem_logits.sigmoid().detach().cpu().unbind(dim=1)  # [B,T]
 
-        results = {}
+        results = DetectionResults()
 
         for i in range(len(metas)):  # processing each video
             segments = roi_proposals[i].detach().cpu()  # [N,2]
@@ -158,20 +158,6 @@ class VSGN(TwoStageDetector):
             else:
                 segments, labels, scores = ext_cls(video_id, segments, scores)
 
-            results_per_video = []
-            for segment, label, score in zip(segments, labels, scores):
-                # convert to python scalars
-                results_per_video.append(
-                    dict(
-                        segment=[round(seg.item(), 2) for seg in segment],
-                        label=label,
-                        score=round(score.item(), 4),
-                    )
-                )
-
-            if video_id in results.keys():
-                results[video_id].extend(results_per_video)
-            else:
-                results[video_id] = results_per_video
+            results.add(video_id, segments, labels, scores)
 
         return results
@@ -1,6 +1,7 @@
 from .nms.nms import batched_nms
 from .utils import boundary_choose, save_predictions, load_predictions, convert_to_seconds
 from .classifier import build_classifier
+from .results import DetectionResults
 
 __all__ = [
     "boundary_choose",
@@ -9,4 +10,5 @@ __all__ = [
     "load_predictions",
     "convert_to_seconds",
     "build_classifier",
+    "DetectionResults",
 ]
@@ -129,7 +129,24 @@ def batched_nms(
             torch.zeros([0], dtype=cls_idxs.dtype),
         )
 
-    if multiclass:
+    if multiclass and hasattr(nms_1d_cpu, "batched_nms"):
+        # multiclass nms: apply nms on each class independently in one native call, parallel across classes
+        new_segs, new_scores, new_cls_idxs = nms_1d_cpu.batched_nms(
+            segs.contiguous().cpu(),
+            scores.contiguous().cpu(),
+            cls_idxs.contiguous().cpu(),
+            use_soft_nms=bool(use_soft_nms),
+            iou_threshold=float(iou_threshold),
+            sigma=float(sigma),
+            min_score=float(min_score),
+            method=int(method),
+            max_num=int(max_seg_num),
+            t1=float(t1),
+            t2=float(t2),
+            parallel=True,
+        )
+
+    elif multiclass:  # the extension is built before batched_nms is added, please rebuild it
         # multiclass nms: apply nms on each class independently
         new_segs, new_scores, new_cls_idxs = [], [], []
         for class_id in torch.unique(cls_idxs):
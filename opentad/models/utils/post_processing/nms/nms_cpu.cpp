@@ -1,4 +1,5 @@
 #include <ATen/ATen.h>
+#include <ATen/Parallel.h>
 #include <torch/library.h>
 #include <torch/extension.h>
 #include <vector>
@@ -171,15 +172,97 @@ Tensor softnms_1d(Tensor segs, Tensor scores, Tensor dets, float iou_threshold,
   return softnms_1d_cpu(segs, scores, dets, iou_threshold, sigma, min_score, method, t1, t2);
 }
 
+std::vector<Tensor> batched_nms_1d_cpu(Tensor segs, Tensor scores, Tensor cls_idxs, bool use_soft_nms,
+                                       float iou_threshold, float sigma, float min_score, int method,
+                                       int64_t max_num, float t1, float t2, bool parallel) {
+  // group the segs by class, the segs of each class keep their original order (same as torch.where)
+  auto nsegs = segs.size(0);
+  auto sorted_cls = cls_idxs.to(at::kLong).sort(/* stable=*/true, 0, /* descending=*/false);
+  auto cls_sorted_t = std::get<0>(sorted_cls).contiguous();
+  auto cls_order_t = std::get<1>(sorted_cls).contiguous();
+  auto cls_sorted = cls_sorted_t.data_ptr<int64_t>();
+
+  std::vector<int64_t> starts;
+  for (int64_t i = 0; i < nsegs; i++) {
+    if (i == 0 || cls_sorted[i] != cls_sorted[i - 1]) starts.push_back(i);
+  }
+  starts.push_back(nsegs);
+  int64_t nclasses = starts.size() - 1;
+
+  // per class nms, return the kept indices in the original segs, and their (decayed) scores
+  std::vector<Tensor> keep_inds(nclasses);
+  std::vector<Tensor> keep_scores(nclasses);
+  auto class_nms = [&](int64_t begin, int64_t end) {
+    for (int64_t c = begin; c < end; c++) {
+      auto cls_inds = cls_order_t.slice(0, starts[c], starts[c + 1]);
+      auto cls_segs = segs.index_select(0, cls_inds).contiguous();
+      auto cls_scores = scores.index_select(0, cls_inds).contiguous();
+
+      Tensor inds, out_scores;
+      if (use_soft_nms) {
+        auto dets = at::empty({cls_segs.size(0), 3}, cls_segs.options());
+        inds = softnms_1d_cpu(cls_segs, cls_scores, dets, iou_threshold, sigma, min_score, method, t1, t2);
+        auto num = max_num > 0 ? std::min(inds.size(0), max_num) : inds.size(0);
+        inds = inds.slice(0, 0, num);
+        out_scores = dets.select(1, 2).slice(0, 0, num);
+      } else {
+        // vanilla nms will not change the score, so we can filter segs first
+        if (min_score > 0) {
+          auto valid = (cls_scores > min_score).nonzero().squeeze(1);
+          cls_inds = cls_inds.index_select(0, valid);
+          cls_segs = cls_segs.index_select(0, valid).contiguous();
+          cls_scores = cls_scores.index_select(0, valid).contiguous();
+        }
+        inds = nms_1d_cpu(cls_segs, cls_scores, iou_threshold);
+        if (max_num > 0) inds = inds.slice(0, 0, std::min(inds.size(0), max_num));
+        out_scores = cls_scores.index_select(0, inds);
+      }
+      keep_inds[c] = cls_inds.index_select(0, inds);
+      keep_scores[c] = out_scores.contiguous();
+    }
+  };
+  if (parallel) {
+    at::parallel_for(0, nclasses, 1, class_nms);
+  } else {
+    class_nms(0, nclasses);
+  }
+
+  // concat the results in the ascending order of the class index
+  if (nclasses == 0) {
+    return {segs.new_empty({0, 2}), scores.new_empty({0}), cls_idxs.new_empty({0})};
+  }
+  auto inds_t = at::cat(keep_inds);
+  return {segs.index_select(0, inds_t), at::cat(keep_scores), cls_idxs.index_select(0, inds_t)};
+}
+
+std::vector<Tensor> batched_nms_1d(Tensor segs, Tensor scores, Tensor cls_idxs, bool use_soft_nms,
+                                   float iou_threshold, float sigma, float min_score, int method,
+                                   int64_t max_num, float t1, float t2, bool parallel) {
+  CHECK_CPU_INPUT(segs)
+  CHECK_CPU_INPUT(scores)
+  CHECK_CPU_INPUT(cls_idxs)
+  return batched_nms_1d_cpu(segs, scores, cls_idxs, use_soft_nms, iou_threshold, sigma, min_score, method,
+                            max_num, t1, t2, parallel);
+}
+
 // bind to torch interface
 PYBIND11_MODULE(TORCH_EXTENSION_NAME, m) {
   m.def(
     "nms", &nms_1d, "nms (CPU) ",
+    py::call_guard<py::gil_scoped_release>(),
     py::arg("segs"), py::arg("scores"), py::arg("iou_threshold")
   );
   m.def(
     "softnms", &softnms_1d, "softnms (CPU) ",
+    py::call_guard<py::gil_scoped_release>(),
     py::arg("segs"), py::arg("scores"), py::arg("dets"), py::arg("iou_threshold"),
     py::arg("sigma"), py::arg("min_score"), py::arg("method"), py::arg("t1"), py::arg("t2")
   );
+  m.def(
+    "batched_nms", &batched_nms_1d, "class-aware batched (soft) nms (CPU) ",
+    py::call_guard<py::gil_scoped_release>(),
+    py::arg("segs"), py::arg("scores"), py::arg("cls_idxs"), py::arg("use_soft_nms"), py::arg("iou_threshold"),
+    py::arg("sigma"), py::arg("min_score"), py::arg("method"), py::arg("max_num"), py::arg("t1"), py::arg("t2"),
+    py::arg("parallel")
+  );
 }
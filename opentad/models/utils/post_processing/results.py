@@ -0,0 +1,216 @@
+import json
+import numpy as np
+
+
+def to_numpy(data, dtype):
+    if hasattr(data, "detach"):  # torch tensor
+        data = data.detach().cpu().numpy()
+    return np.asarray(data, dtype=dtype)
+
+
+def round_as_json(values, ndigits):
+    # python round on each value, np.round scales by 10**ndigits first and differs on the decimal ties of float64 values
+    rounded = [round(value, ndigits) for value in values.ravel().tolist()]
+    return np.array(rounded, dtype=np.float64).reshape(values.shape)
+
+
+class DetectionResults:
+    """Columnar detection results, which keep one array per field instead of one dict per detection.
+
+    Each detection is stored as (video index, start, end, label id, score), where the video index and label id
+    point into the `video_names` and `label_names` lists. The segments and scores are rounded by python round
+    as in the original JSON format, i.e. 2 and 4 decimals. `to_dict()` exports the JSON format for compatibility:
+    {video_name: [dict(segment=[start, end], label=label_name, score=score), ...]}.
+    """
+
+    def __init__(self):
+        self.video_names = []  # video index -> video name, including the videos without detections
+        self.label_names = []  # label id -> label name
+        self._video_index = {}
+        self._label_index = {}
+        self._chunks = []  # list of (video_idxs, segments, label_ids, scores)
+        self._columns = None
+
+    def get_video_idx(self, video_name):
+        if video_name not in self._video_index:
+            self._video_index[video_name] = len(self.video_names)
+            self.video_names.append(video_name)
+        return self._video_index[video_name]
+
+    def get_label_ids(self, labels):
+        label_ids = np.empty(len(labels), dtype=np.int64)
+        for i, label in enumerate(labels):
+            if label not in self._label_index:
+                self._label_index[label] = len(self.label_names)
+                self.label_names.append(label)
+            label_ids[i] = self._label_index[label]
+        return label_ids
+
+    def add(self, video_name, segments, labels, scores):
+        """Add the detections of one video.
+
+        Args:
+            video_name (str): name of the video.
+            segments (Tensor | ndarray): [N,2] segments in seconds.
+            labels (list[str]): N label names.
+            scores (Tensor | ndarray): [N] scores.
+        """
+        self.add_label_ids(video_name, segments, self.get_label_ids(labels), scores)
+
+    def add_label_ids(self, video_name, segments, label_ids, scores):
+        """Add the detections of one video, whose labels are given by the ids in label_names."""
+        video_idx = self.get_video_idx(video_name)
+        segments = round_as_json(to_numpy(segments, np.float64).reshape(-1, 2), 2)
+        scores = round_as_json(to_numpy(scores, np.float64).reshape(-1), 4)
+        label_ids = to_numpy(label_ids, np.int64).reshape(-1)
+        video_idxs = np.full(len(scores), video_idx, dtype=np.int64)
+        self.add_columns(video_idxs, segments, label_ids, scores)
+
+    def add_columns(self, video_idxs, segments, label_ids, scores):
+        # the indices should already point to video_names and label_names
+        if len(scores) > 0:
+            self._chunks.append((video_idxs, segments, label_ids, scores))
+            self._columns = None
+
+    def extend(self, other):
+        """Merge the detections of another DetectionResults."""
+        video_map = np.array([self.get_video_idx(name) for name in other.video_names], dtype=np.int64)
+        label_map = self.get_label_ids(other.label_names)
+        if len(other) > 0:
+            self.add_columns(
+                video_map[other.video_idxs],
+                other.segments,
+                label_map[other.label_ids],
+                other.scores,
+            )
+        return self
+
+    @property
+    def columns(self):
+        if self._columns is None:
+            if len(self._chunks) == 0:
+                self._columns = (
+                    np.zeros(0, dtype=np.int64),
+                    np.zeros((0, 2), dtype=np.float64),
+                    np.zeros(0, dtype=np.int64),
+                    np.zeros(0, dtype=np.float64),
+                )
+            else:
+                self._columns = tuple(np.concatenate(column) for column in zip(*self._chunks))
+            self._chunks = [self._columns]
+        return self._columns
+
+    @property
+    def video_idxs(self):
+        return self.columns[0]
+
+    @property
+    def segments(self):
+        return self.columns[1]
+
+    @property
+    def label_ids(self):
+        return self.columns[2]
+
+    @property
+    def scores(self):
+        return self.columns[3]
+
+    def __len__(self):
+        return sum(len(chunk[3]) for chunk in self._chunks)
+
+    def split_by_video(self):
+        """Return the detection indices of each video, in the order of video_names."""
+        order = np.argsort(self.video_idxs, kind="stable")
+        counts = np.bincount(self.video_idxs, minlength=len(self.video_names))
+        return np.split(order, np.cumsum(counts)[:-1])
+
+    def to_dict(self):
+        """Export the JSON format: {video_name: [dict(segment=[start, end], label=label_name, score=score)]}."""
+        segments = self.segments.tolist()
+        label_ids = self.label_ids.tolist()
+        scores = self.scores.tolist()
+
+        results = {}
+        for video_name, inds in zip(self.video_names, self.split_by_video()):
+            results[video_name] = [
+                dict(segment=segments[i], label=self.label_names[label_ids[i]], score=scores[i]) for i in inds.tolist()
+            ]
+        return results
+
+    @classmethod
+    def from_dict(cls, result_dict):
+        """Build from the JSON format."""
+        results = cls()
+        for video_name, video_results in result_dict.items():
+            results.add(
+                video_name,
+                np.array([result["segment"] for result in video_results], dtype=np.float64).reshape(-1, 2),
+                [result["label"] for result in video_results],
+                np.array([result["score"] for result in video_results], dtype=np.float64),
+            )
+        return results
+
+    def save(self, path):
+        """Save as a npz file of the columns if the path ends with .npz, otherwise as the JSON format."""
+        if path.endswith(".npz"):
+            np.savez(
+                path,
+                video_names=np.array(self.video_names, dtype=str),
+                label_names=np.array(self.label_names, dtype=str),
+                video_idxs=self.video_idxs,
+                segments=self.segments,
+                label_ids=self.label_ids,
+                scores=self.scores,
+            )
+        else:
+            with open(path, "w") as f:
+                json.dump(dict(results=self.to_dict()), f)
+
+    @classmethod
+    def load(cls, path):
+        if not path.endswith(".npz"):
+            with open(path, "r") as f:
+                return cls.from_dict(json.load(f)["results"])
+
+        data = np.load(path)
+        return cls.from_columns(
+            data["video_names"].tolist(),
+            data["label_names"].tolist(),
+            data["video_idxs"],
+            data["segments"],
+            data["label_ids"],
+            data["scores"],
+        )
+
+    @classmethod
+    def from_columns(cls, video_names, label_names, video_idxs, segments, label_ids, scores):
+        results = cls()
+        for video_name in video_names:
+            results.get_video_idx(video_name)
+        results.get_label_ids(label_names)
+        results.add_columns(video_idxs, segments, label_ids, scores)
+        return results
+
+    def pack(self):
+        """Pack the detections into one float64 array [N,5] of (video index, start, end, label id, score), which
+        can be sent by the tensor communication. The indices are exactly represented by float64."""
+        return np.concatenate(
+            [self.video_idxs[:, None], self.segments, self.label_ids[:, None], self.scores[:, None]],
+            axis=1,
+        ).astype(np.float64)
+
+    @classmethod
+    def from_packed(cls, video_names, label_names, packed):
+        packed = np.asarray(packed, dtype=np.float64).reshape(-1, 5)
+        return cls.from_columns(
+            video_names,
+            label_names,
+            packed[:, 0].astype(np.int64),
+            packed[:, 1:3],
+            packed[:, 3].astype(np.int64),
+            packed[:, 4],
+        )
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(videos={len(self.video_names)}, detections={len(self)})"
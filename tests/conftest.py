@@ -0,0 +1,7 @@
+import os
+import sys
+
+# run the tests from the repo root without installing opentad
+path = os.path.join(os.path.dirname(__file__), "..")
+if path not in sys.path:
+    sys.path.insert(0, path)
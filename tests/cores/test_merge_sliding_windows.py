@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+import torch
+import torch.distributed as dist
+from mmengine.config import ConfigDict
+
+from opentad.cores.test_engine import gather_ddp_results, merge_sliding_windows
+from opentad.models.utils.post_processing import DetectionResults, batched_nms
+
+NMS_CFGS = [
+    dict(use_soft_nms=True, sigma=0.5, max_seg_num=20, iou_threshold=0.1, min_score=0.001, multiclass=True),
+    dict(use_soft_nms=False, max_seg_num=20, iou_threshold=0.5, min_score=0.0, multiclass=True, method=0),
+    dict(use_soft_nms=True, sigma=0.5, max_seg_num=20, iou_threshold=0.1, min_score=0.001, multiclass=False),
+]
+
+
+def build_window_results(num_videos=6, num_windows=3, seed=0):
+    # the detections of the overlapped windows of each video, the labels appear in a different order per video
+    rng = np.random.default_rng(seed)
+    labels = ["a", "b", "c", "d", "e"]
+    results = DetectionResults()
+    for v in range(num_videos):
+        video_labels = list(rng.permutation(labels)[: rng.integers(1, 5)])
+        for w in range(num_windows):
+            num_dets = int(rng.integers(0, 30))
+            starts = rng.uniform(w * 30, w * 30 + 40, num_dets)
+            segments = np.stack([starts, starts + rng.uniform(1, 10, num_dets)], axis=1)
+            results.add(f"video_{v}", segments, list(rng.choice(video_labels, num_dets)), rng.uniform(0, 1, num_dets))
+    results.add("video_empty", np.zeros((0, 2)), [], np.zeros(0))
+    return results
+
+
+def merge_by_dict(result_dict, nms_cfg):
+    # the per-video NMS of the JSON results, with the label ids encoded per video
+    merged = {}
+    for video_name, detections in result_dict.items():
+        segments = torch.Tensor([data["segment"] for data in detections]).reshape(-1, 2)
+        scores = torch.Tensor([data["score"] for data in detections])
+        class_idx = []
+        labels = []
+        for data in detections:
+            if data["label"] not in class_idx:
+                class_idx.append(data["label"])
+            labels.append(class_idx.index(data["label"]))
+        labels = torch.Tensor(labels)
+
+        segments, scores, labels = batched_nms(segments, scores, labels, **nms_cfg)
+        merged[video_name] = [
+            dict(
+                segment=[round(seg.item(), 2) for seg in segment],
+                label=class_idx[int(label.item())],
+                score=round(score.item(), 4),
+            )
+            for segment, label, score in zip(segments, labels, scores)
+        ]
+    return merged
+
+
+def sort_detections(result_dict):
+    # the classes may be processed in another order, since the label ids differ
+    return {
+        video_name: sorted(detections, key=lambda d: (d["label"], -d["score"], d["segment"]))
+        for video_name, detections in result_dict.items()
+    }
+
+
+@pytest.mark.parametrize("nms_cfg", NMS_CFGS)
+@pytest.mark.parametrize("num_workers", [0, 3])
+def test_merge_matches_the_per_video_nms_of_the_json_results(nms_cfg, num_workers):
+    results = build_window_results()
+    merged = merge_sliding_windows(results, nms_cfg, num_workers)
+    expected = merge_by_dict(results.to_dict(), nms_cfg)
+
+    assert merged.video_names == results.video_names
+    assert merged.to_dict()["video_empty"] == []
+    assert sort_detections(merged.to_dict()) == sort_detections(expected)
+
+
+@pytest.fixture
+def process_group(tmp_path):
+    dist.init_process_group("gloo", init_method=f"file://{tmp_path / 'store'}", rank=0, world_size=1)
+    yield
+    dist.destroy_process_group()
+
+
+@pytest.mark.parametrize("gather_mode", ["tensor", "file", "object"])
+def test_gather_modes_give_the_same_results(process_group, tmp_path, gather_mode):
+    results = build_window_results()
+    post_cfg = ConfigDict(sliding_window=True, nms=NMS_CFGS[0], gather_mode=gather_mode)
+    gathered = gather_ddp_results(1, results, post_cfg, rank=0, work_dir=str(tmp_path))
+
+    expected = merge_sliding_windows(results, NMS_CFGS[0])
+    assert gathered.video_names == expected.video_names
+    assert gathered.to_dict() == expected.to_dict()
+    assert not list(tmp_path.glob("result_shard_*"))  # the shards are removed
@@ -0,0 +1,113 @@
+import time
+from concurrent.futures import Future
+
+import numpy as np
+import pytest
+import torch
+from mmengine.config import ConfigDict
+
+from opentad.cores.test_engine import PostProcessingPool
+from opentad.models.detectors.base import BaseDetector
+from opentad.models.detectors.single_stage import SingleStageDetector
+from opentad.models.utils.post_processing import DetectionResults
+
+INFER_CFG = ConfigDict(load_from_raw_predictions=False, save_raw_prediction=False)
+POST_CFG = ConfigDict(
+    sliding_window=False,
+    nms=dict(use_soft_nms=True, sigma=0.5, max_seg_num=50, iou_threshold=0.1, min_score=0.001, multiclass=True),
+)
+CLASSES = ["a", "b", "c", "d"]
+
+
+class FakeDetector(SingleStageDetector):
+    """The post processing of the single stage detectors, on the predictions given as the inputs."""
+
+    def __init__(self, fail_on=None, delays=None):
+        BaseDetector.__init__(self)
+        self.fail_on = fail_on
+        self.delays = delays or {}
+
+    def forward_test(self, inputs, masks, metas=None, infer_cfg=None, **kwargs):
+        return inputs[..., :2], inputs[..., 2:].sigmoid()
+
+    def post_processing(self, predictions, metas, post_cfg, ext_cls, **kwargs):
+        video_name = metas[0]["video_name"]
+        time.sleep(self.delays.get(video_name, 0))  # the batches finish out of order
+        if video_name == self.fail_on:
+            raise RuntimeError(f"failed on {video_name}")
+        return super().post_processing(predictions, metas, post_cfg, ext_cls, **kwargs)
+
+
+def get_batches(num_batches=12, batch_size=2):
+    generator = torch.Generator().manual_seed(0)
+    batches = []
+    for b in range(num_batches):
+        starts = torch.rand(batch_size, 200, 1, generator=generator) * 90
+        lengths = torch.rand(batch_size, 200, 1, generator=generator) * 10
+        logits = torch.randn(batch_size, 200, len(CLASSES), generator=generator)
+        inputs = torch.cat([starts, starts + lengths, logits], dim=-1)
+        metas = [
+            dict(video_name=f"video_{b}_{i}", fps=10, duration=10.0, snippet_stride=1, offset_frames=0)
+            for i in range(batch_size)
+        ]
+        batches.append(dict(inputs=inputs, masks=None, metas=metas))
+    return batches
+
+
+def evaluate(model, batches, num_workers):
+    # the same result collection as eval_one_epoch
+    post_pool = PostProcessingPool(num_workers) if num_workers > 0 else None
+    extra_kwargs = dict(post_executor=post_pool) if post_pool is not None else {}
+    result_dict = DetectionResults()
+    for batch in batches:
+        results = model(
+            **batch,
+            return_loss=False,
+            infer_cfg=INFER_CFG,
+            post_cfg=POST_CFG,
+            ext_cls=CLASSES,
+            **extra_kwargs,
+        )
+        if post_pool is not None:
+            assert isinstance(results, Future)
+            for finished_results in post_pool.put(results):
+                result_dict.extend(finished_results)
+            assert len(post_pool.pending) <= post_pool.max_pending
+        else:
+            assert isinstance(results, DetectionResults)
+            result_dict.extend(results)
+
+    if post_pool is not None:
+        for finished_results in post_pool.close():
+            result_dict.extend(finished_results)
+    return result_dict
+
+
+@pytest.mark.parametrize("num_workers", [1, 3])
+def test_pool_results_match_the_synchronous_results(num_workers):
+    batches = get_batches()
+    delays = {f"video_{b}_0": 0.02 * (b % 3 == 0) for b in range(len(batches))}
+    expected = evaluate(FakeDetector(), batches, num_workers=0)
+    actual = evaluate(FakeDetector(delays=delays), batches, num_workers=num_workers)
+
+    assert len(expected) > 0
+    assert actual.video_names == expected.video_names
+    assert actual.label_names == expected.label_names
+    for a, b in zip(actual.columns, expected.columns):
+        np.testing.assert_array_equal(a, b)
+
+
+@pytest.mark.parametrize("num_workers", [0, 2])
+def test_errors_of_the_post_processing_are_raised(num_workers):
+    with pytest.raises(RuntimeError, match="failed on video_5_0"):
+        evaluate(FakeDetector(fail_on="video_5_0"), get_batches(), num_workers=num_workers)
+
+
+def test_pool_keeps_the_submission_order():
+    pool = PostProcessingPool(num_workers=4, max_pending=3)
+    finished = []
+    for i in range(10):
+        finished += pool.put(pool.submit(lambda i: time.sleep(0.01 * (i % 4 == 0)) or i, i))
+        assert len(pool.pending) <= 3
+    finished += pool.close()
+    assert finished == list(range(10))
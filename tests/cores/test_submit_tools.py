@@ -0,0 +1,52 @@
+import importlib.util
+import os
+from types import SimpleNamespace
+
+import pytest
+import torch.distributed as dist
+from mmengine.config import ConfigDict
+
+from test_post_processing_pool import CLASSES, INFER_CFG, POST_CFG, FakeDetector, evaluate, get_batches
+
+TOOLS_DIR = os.path.join(os.path.dirname(__file__), "../../tools/prepare_data")
+
+
+def load_tool(name, path):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(TOOLS_DIR, path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def process_group(tmp_path):
+    dist.init_process_group("gloo", init_method=f"file://{tmp_path / 'store'}", rank=0, world_size=1)
+    yield
+    dist.destroy_process_group()
+
+
+@pytest.mark.parametrize(
+    "name, path",
+    [
+        ("ego4d_challenge_submit", "ego4d/ego4d_challenge_submit.py"),
+        ("epic_sound_submit", "epic_sounds/epic_sound_submit.py"),
+    ],
+)
+def test_submit_inference_gathers_the_detector_results(process_group, name, path):
+    tool = load_tool(name, path)
+    batches = get_batches(num_batches=3)
+    args = SimpleNamespace(rank=0, world_size=1)
+    post_cfg = ConfigDict(POST_CFG, gather_mode="object")
+
+    result_dict = tool.inference(FakeDetector(), batches, INFER_CFG, post_cfg, CLASSES, False, args)
+    assert result_dict == evaluate(FakeDetector(), batches, num_workers=0).to_dict()
+    assert len(result_dict) == 6 and all(len(detections) > 0 for detections in result_dict.values())
+
+
+def test_epic_results_are_converted_to_interactions():
+    tool = load_tool("epic_sound_submit", "epic_sounds/epic_sound_submit.py")
+    result_dict = {"video": [dict(segment=[1.0, 2.5], label="id_12", score=0.75)], "empty": []}
+    assert tool.convert_to_epic(result_dict) == {
+        "video": [dict(interaction=12, score=0.75, segment=[1.0, 2.5])],
+        "empty": [],
+    }
@@ -0,0 +1,36 @@
+import json
+
+import numpy as np
+import pytest
+
+
+def write_annotations(ann_dir, num_videos=4, num_classes=3, seed=0):
+    """Write a small THUMOS-style annotation file and class map, return their paths."""
+    rng = np.random.default_rng(seed)
+    database = {}
+    for i in range(num_videos):
+        duration = float(rng.uniform(60, 300))
+        annotations = []
+        for _ in range(int(rng.integers(1, 8))):
+            start = float(rng.uniform(0, duration - 10))
+            end = start + float(rng.uniform(1, 10))
+            annotations.append(dict(segment=[start, end], label=f"class_{rng.integers(num_classes)}"))
+        database[f"video_{i}"] = dict(
+            subset="validation",
+            duration=duration,
+            frame=int(duration * 30),
+            annotations=annotations,
+        )
+
+    ann_file = ann_dir / "annotations.json"
+    with open(ann_file, "w") as f:
+        json.dump(dict(database=database), f)
+    class_map = ann_dir / "category_idx.txt"
+    with open(class_map, "w") as f:
+        f.write("\n".join(f"class_{i}" for i in range(num_classes)))
+    return str(ann_file), str(class_map)
+
+
+@pytest.fixture
+def thumos_annotations(tmp_path):
+    return write_annotations(tmp_path)
@@ -0,0 +1,93 @@
+import threading
+
+import numpy as np
+import pytest
+
+from opentad.datasets.transforms import CachedDecordDecode
+from opentad.datasets.transforms import frame_cache
+
+
+class FakeBatch:
+    def __init__(self, frames):
+        self.frames = frames
+
+    def asnumpy(self):
+        return self.frames
+
+
+class FakeReader:
+    """A decord-like reader with a keyframe every 10 frames, whose frame i is filled with the value i."""
+
+    def __init__(self):
+        self.requests = []
+        self.keyframe_requests = 0
+        self.lock = threading.Lock()
+
+    def get_key_indices(self):
+        self.keyframe_requests += 1
+        return list(range(0, 200, 10))
+
+    def get_batch(self, indices):
+        with self.lock:
+            self.requests.append(list(indices))
+        frames = np.empty((len(indices), 4, 6, 3), dtype=np.uint8)
+        frames[:] = np.asarray(indices, dtype=np.uint8)[:, None, None, None]
+        return FakeBatch(frames)
+
+
+@pytest.fixture
+def reader(monkeypatch):
+    reader = FakeReader()
+    monkeypatch.setattr(frame_cache.DecodePool, "get_thread_reader", lambda self, filename: reader)
+    frame_cache._DECODE_POOL = None
+    yield reader
+    frame_cache._DECODE_POOL = None
+
+
+@pytest.fixture
+def logs(monkeypatch):
+    logs = []
+    monkeypatch.setattr(frame_cache, "print_log", lambda msg, logger=None: logs.append(msg))
+    return logs
+
+
+@pytest.mark.parametrize("pool_size", [1, 2, 4, 16])
+def test_frames_are_decoded_in_order_and_by_gop(reader, pool_size):
+    frame_inds = np.array([1, 3, 12, 15, 18, 31, 55, 56, 57, 120, 199])
+    frames = frame_cache.DecodePool(pool_size).decode("video.mp4", frame_inds)
+    assert frames[:, 0, 0, 0].tolist() == frame_inds.tolist()
+
+    # each thread decodes a sorted group of whole gops, and each gop is decoded once
+    groups = sorted(reader.requests)
+    assert len(groups) == min(pool_size, 6)
+    assert [idx for group in groups for idx in group] == frame_inds.tolist()
+    gops = [sorted(set(idx // 10 for idx in group)) for group in groups]
+    assert sum(len(gop) for gop in gops) == 6
+
+
+def test_keyframes_are_read_once_per_video(reader):
+    pool = frame_cache.DecodePool(2)
+    pool.decode("video.mp4", [1, 25])
+    pool.decode("video.mp4", [40, 41])
+    assert reader.keyframe_requests == 1
+
+    # the keyframes of the video meta index are used as they are
+    pool.decode("other.mp4", [1, 25], keyframe_inds=[0, 10, 20])
+    assert reader.keyframe_requests == 1
+
+
+def test_statistics_are_not_logged_by_default(reader, logs):
+    pool = frame_cache.DecodePool(2)
+    for _ in range(3):
+        pool.decode("video.mp4", [1, 25])
+    assert logs == []
+    assert pool.num_requests == 3 and pool.num_frames == 6 and pool.num_gops == 6
+
+
+def test_statistics_are_logged_every_report_interval(reader, logs):
+    transform = CachedDecordDecode(cache_bytes=0, pool_size=2, report_interval=2)
+    for start in range(0, 50, 10):
+        results = transform(dict(filename="video.mp4", frame_inds=np.arange(start, start + 10, 3)))
+        assert [int(img[0, 0, 0]) for img in results["imgs"]] == list(range(start, start + 10, 3))
+    assert len(logs) == 2
+    assert "requests=2," in logs[0] and "requests=4," in logs[1]
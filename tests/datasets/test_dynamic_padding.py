@@ -0,0 +1,70 @@
+import pytest
+import torch
+
+from opentad.datasets.builder import collate
+from opentad.datasets.transforms import RandomTrunc
+from opentad.models.detectors.actionformer import ActionFormer
+from opentad.models.detectors.tridet import TriDet
+
+
+def make_sample(length, channels=4):
+    return dict(
+        inputs=torch.rand(channels, length),
+        masks=torch.ones(length, dtype=torch.bool),
+        metas=dict(video_name=f"video_{length}"),
+    )
+
+
+@pytest.mark.parametrize("pad_divisor, expected_len", [(1, 37), (8, 40), (32, 64)])
+def test_collate_pads_to_batch_max(pad_divisor, expected_len):
+    batch = [make_sample(length) for length in [20, 37, 5]]
+    originals = [(sample["inputs"], sample["masks"]) for sample in batch]
+    data = collate(batch, pad_divisor=pad_divisor)
+
+    assert data["inputs"].shape == (3, 4, expected_len)
+    assert data["masks"].shape == (3, expected_len) and data["masks"].dtype == torch.bool
+    assert data["metas"] == [sample["metas"] for sample in batch]
+    for i, (inputs, masks) in enumerate(originals):
+        length = inputs.shape[-1]
+        assert torch.equal(data["inputs"][i, :, :length], inputs)
+        assert data["inputs"][i, :, length:].abs().sum() == 0
+        assert data["masks"][i].sum() == length and data["masks"][i, :length].all()
+        assert batch[i]["inputs"] is inputs  # the samples are not modified
+
+
+def test_collate_without_padding_requires_the_same_length():
+    data = collate([make_sample(16), make_sample(16)])
+    assert data["inputs"].shape == (2, 4, 16)
+    with pytest.raises(RuntimeError):
+        collate([make_sample(16), make_sample(8)])
+
+
+def test_random_trunc_without_padding():
+    results = dict(
+        feats=torch.rand(50, 4),
+        gt_segments=torch.tensor([[5.0, 20.0]]),
+        gt_labels=torch.tensor([0]),
+    )
+    padded = RandomTrunc(trunc_len=64, trunc_thresh=0.5)(dict(results))
+    unpadded = RandomTrunc(trunc_len=64, trunc_thresh=0.5, pad=False)(dict(results))
+
+    assert padded["feats"].shape == (64, 4) and padded["masks"].sum() == 50
+    assert unpadded["feats"].shape == (50, 4) and unpadded["masks"].all()
+    assert torch.equal(padded["feats"][:50], unpadded["feats"])
+
+
+@pytest.mark.parametrize("detector", [ActionFormer, TriDet])
+@pytest.mark.parametrize("feat_len, expected_len", [(40, 64), (64, 64), (100, 128)])
+def test_detector_pads_to_the_divisor(detector, feat_len, expected_len):
+    model = detector.__new__(detector)
+    model.max_seq_len = 2304
+    model.max_div_factor = 32
+    model.dynamic_padding = True
+
+    inputs, masks = torch.rand(2, 4, feat_len), torch.ones(2, feat_len, dtype=torch.bool)
+    pad_inputs, pad_masks = model.pad_data(inputs, masks)
+    assert pad_inputs.shape == (2, 4, expected_len) and pad_masks.shape == (2, expected_len)
+    assert torch.equal(pad_inputs[..., :feat_len], inputs) and pad_masks.sum() == 2 * feat_len
+
+    model.dynamic_padding = False  # the fixed padding to max_seq_len
+    assert model.pad_data(inputs, masks)[0].shape[-1] == 2304
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+import torch
+
+from opentad.datasets.transforms import LoadFeats
+from opentad.datasets.transforms.arena import FeatureArena
+
+
+def build_videos():
+    rng = np.random.default_rng(0)
+    return {f"video_{i}": rng.random((int(rng.integers(5, 30)), 8)).astype(np.float32) for i in range(4)}
+
+
+def test_arena_returns_shared_views():
+    videos = build_videos()
+    arena = FeatureArena(list(videos.items()))
+
+    assert arena.storage.is_shared() and len(arena) == len(videos)
+    assert arena.nbytes == sum(feats.nbytes for feats in videos.values())
+    for name, feats in videos.items():
+        view = arena.get(name)
+        assert view.untyped_storage().data_ptr() == arena.storage.untyped_storage().data_ptr()
+        np.testing.assert_array_equal(view.numpy(), feats)
+
+
+def test_arena_rejects_mismatched_shapes():
+    with pytest.raises(AssertionError):
+        FeatureArena([("a", np.zeros((4, 8))), ("b", np.zeros((4, 6)))])
+
+
+@pytest.mark.parametrize("sample_stride", [1, 2])
+def test_preloaded_load_feats_matches_direct_read(tmp_path, sample_stride):
+    videos = build_videos()
+    for name, feats in videos.items():
+        np.save(tmp_path / f"{name}.npy", feats)
+
+    preloaded = LoadFeats(feat_format="npy", preload=True, preload_threads=2)
+    preloaded.build_arena(list(videos.keys()), str(tmp_path), logger=lambda msg: None)
+    direct = LoadFeats(feat_format="npy")
+    for name in videos.keys():
+        results = dict(video_name=name, data_path=str(tmp_path), sample_stride=sample_stride)
+        feats = preloaded(dict(results))["feats"]
+        assert isinstance(feats, torch.Tensor)
+        np.testing.assert_array_equal(feats.numpy(), direct(dict(results))["feats"])
@@ -0,0 +1,62 @@
+import os
+
+import numpy as np
+import pytest
+
+from opentad.datasets.transforms import LoadFeats
+from opentad.datasets.transforms import cache as cache_module
+from opentad.datasets.transforms.cache import FeatureCache
+
+
+@pytest.fixture(autouse=True)
+def reset_feature_cache():
+    cache_module._FEATURE_CACHE = None
+    yield
+    cache_module._FEATURE_CACHE = None
+
+
+def test_lru_eviction_by_bytes():
+    cache = FeatureCache(max_bytes=2 * 400)
+    feats = [np.zeros((100,), dtype=np.float32) for _ in range(3)]  # 400 bytes each
+
+    cache.put("a", feats[0])
+    cache.put("b", feats[1])
+    assert cache.get("a") is feats[0]  # "a" becomes the most recently used
+    cache.put("c", feats[2])  # evicts "b"
+
+    assert cache.get("b") is None
+    assert cache.get("a") is feats[0] and cache.get("c") is feats[2]
+    assert cache.cur_bytes == 800 and cache.evictions == 1
+
+
+def test_oversized_entry_is_not_cached():
+    cache = FeatureCache(max_bytes=100)
+    cache.put("a", np.zeros((100,), dtype=np.float32))
+    assert len(cache) == 0 and cache.cur_bytes == 0
+
+
+def test_key_changes_with_mtime(tmp_path):
+    path = tmp_path / "video.npy"
+    np.save(path, np.zeros((4, 2), dtype=np.float32))
+    key = FeatureCache.make_key("video", [str(path)])
+
+    np.save(path, np.ones((4, 2), dtype=np.float32))
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert FeatureCache.make_key("video", [str(path)]) != key
+
+
+def test_load_feats_with_cache_matches_direct_read(tmp_path):
+    feats = np.random.rand(50, 8).astype(np.float32)
+    np.save(tmp_path / "video.npy", feats)
+
+    cached = LoadFeats(feat_format="npy", cache_bytes=1024**2)
+    direct = LoadFeats(feat_format="npy")
+    for sample_stride in [1, 2]:
+        for _ in range(2):  # the second call is served from the cache
+            results = dict(video_name="video", data_path=str(tmp_path), sample_stride=sample_stride)
+            expected = direct(dict(results))["feats"]
+            np.testing.assert_array_equal(cached(dict(results))["feats"], expected)
+
+    stats = cache_module.get_feature_cache().stats()
+    assert stats["misses"] == 1 and stats["hits"] == 3
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+import torch
+
+from opentad.datasets.builder import collate
+from opentad.datasets.transforms import Collect, ConvertToTensor, LoadFeats, Rearrange, SlidingWindowTrunc
+from opentad.datasets.transforms import shard_store
+from opentad.datasets.transforms.shard_store import FeatureShardWriter, decode_feats, encode_feats
+from opentad.models.detectors.base import BaseDetector
+
+
+@pytest.fixture(autouse=True)
+def reset_shard_readers():
+    shard_store._SHARD_READERS.clear()
+    yield
+    shard_store._SHARD_READERS.clear()
+
+
+def test_int8_encoding_error_is_bounded():
+    feats = np.random.default_rng(0).normal(size=(64, 16)).astype(np.float32)
+    feats[:, 3] = 0  # an all-zero channel keeps a valid scale
+
+    encoded, scale = encode_feats(feats, "int8")
+    assert encoded.dtype == np.int8 and scale.shape == (16,) and scale[3] == 1.0
+    error = np.abs(decode_feats(encoded, scale) - feats)
+    assert np.all(error <= scale / 2 + 1e-6)
+
+
+def test_float16_encoding():
+    feats = np.random.default_rng(0).normal(size=(64, 16)).astype(np.float32)
+    encoded, scale = encode_feats(feats, "float16")
+    assert encoded.dtype == np.float16 and scale is None
+    np.testing.assert_allclose(decode_feats(encoded), feats, rtol=1e-3, atol=1e-3)
+
+
+def pipeline(store_dir, keep_dtype, window_size=32, rearrange=True):
+    results = dict(
+        video_name="video",
+        data_path=str(store_dir),
+        window_size=window_size,
+        feature_start_idx=8,
+        feature_end_idx=8 + window_size - 1,
+    )
+    results = LoadFeats(feat_format="shard", keep_dtype=keep_dtype)(results)
+    results = ConvertToTensor(keys=["feats"])(results)
+    results = SlidingWindowTrunc()(results)
+    if rearrange:
+        results = Rearrange(keys=["feats"], ops="t c -> c t")(results)
+    return Collect(inputs="feats", keys=["masks"], meta_keys=[])(results)
+
+
+@pytest.mark.parametrize("encoding", ["float16", "int8"])
+@pytest.mark.parametrize("window_size", [32, 16])  # 16 channels, C == T is not ambiguous
+def test_keep_dtype_upcast_matches_cpu_decoding(tmp_path, encoding, window_size):
+    feats = np.random.default_rng(0).normal(size=(40, 16)).astype(np.float32)
+    feats *= np.arange(1, 17, dtype=np.float32)  # different scales per channel
+    with FeatureShardWriter(str(tmp_path), encoding=encoding) as writer:
+        writer.add("video", feats)
+
+    compact = pipeline(tmp_path, keep_dtype=True, window_size=window_size)
+    decoded = pipeline(tmp_path, keep_dtype=False, window_size=window_size)
+    assert compact["inputs"].shape == (16, window_size)
+    assert compact["inputs"].dtype == getattr(torch, encoding)
+    assert decoded["inputs"].dtype == torch.float32
+    assert ("inputs_scale" in compact) == (encoding == "int8")
+
+    batch = collate([compact, compact])
+    inputs = BaseDetector.upcast_inputs(batch["inputs"], batch.get("inputs_scale", None))
+    assert inputs.dtype == torch.float32
+    torch.testing.assert_close(inputs, torch.stack([decoded["inputs"]] * 2))
+
+
+def test_int8_feats_should_be_channel_first(tmp_path):
+    feats = np.random.default_rng(0).normal(size=(40, 16)).astype(np.float32)
+    with FeatureShardWriter(str(tmp_path), encoding="int8") as writer:
+        writer.add("video", feats)
+    with pytest.raises(AssertionError, match=r"\[C,T\]"):
+        pipeline(tmp_path, keep_dtype=True, rearrange=False)
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from opentad.datasets.transforms import CachedDecordDecode
+from opentad.datasets.transforms import frame_cache
+
+
+class FakeBatch:
+    def __init__(self, frames):
+        self.frames = frames
+
+    def asnumpy(self):
+        return self.frames
+
+
+class FakeReader:
+    """A decord-like reader, whose frame i is filled with the value i."""
+
+    def __init__(self, num_frames=200):
+        self.num_frames = num_frames
+        self.requests = []
+
+    def get_batch(self, indices):
+        self.requests.append(list(indices))
+        frames = np.empty((len(indices), 4, 6, 3), dtype=np.uint8)
+        frames[:] = np.asarray(indices, dtype=np.uint8)[:, None, None, None]
+        return FakeBatch(frames)
+
+
+@pytest.fixture(autouse=True)
+def reset_frame_cache():
+    frame_cache._FRAME_CACHE = None
+    yield
+    frame_cache._FRAME_CACHE = None
+
+
+def decode(transform, reader, frame_inds):
+    results = dict(filename="video.mp4", frame_inds=np.asarray(frame_inds), video_reader=reader)
+    return transform(results)
+
+
+@pytest.mark.parametrize("cache_bytes", [0, 1024**2])
+def test_decoded_frames_follow_frame_inds(cache_bytes):
+    reader = FakeReader()
+    frame_inds = np.array([[5, 3, 3], [8, 5, 1]])  # 2-D and repeated indices, as LoadFrames gives
+    results = decode(CachedDecordDecode(cache_bytes=cache_bytes), reader, frame_inds)
+
+    assert [int(img[0, 0, 0]) for img in results["imgs"]] == frame_inds.reshape(-1).tolist()
+    assert reader.requests == [[1, 3, 5, 8]]  # sorted unique frames in one batch
+    assert results["original_shape"] == (4, 6) and results["video_reader"] is None
+
+
+def test_overlapping_windows_decode_each_frame_once():
+    reader = FakeReader()
+    transform = CachedDecordDecode(cache_bytes=1024**2)
+    first = decode(transform, reader, np.arange(0, 64, 4))
+    second = decode(transform, reader, np.arange(48, 112, 4))  # 25% overlap
+
+    assert reader.requests == [list(range(0, 64, 4)), list(range(64, 112, 4))]
+    assert [int(img[0, 0, 0]) for img in second["imgs"]] == list(range(48, 112, 4))
+    assert first["imgs"][12] is second["imgs"][0]  # the cached frame is shared
+
+
+def test_cache_budget_is_respected():
+    reader = FakeReader()
+    frame_bytes = 4 * 6 * 3
+    transform = CachedDecordDecode(cache_bytes=10 * frame_bytes)
+    decode(transform, reader, np.arange(20))
+
+    cache = frame_cache.get_frame_cache(10 * frame_bytes)
+    assert cache.cur_bytes <= 10 * frame_bytes and len(cache) == 10
+
+
+def test_cached_frames_do_not_keep_the_decoded_batch():
+    reader = FakeReader()
+    transform = CachedDecordDecode(cache_bytes=1024**2)
+    decode(transform, reader, np.arange(20))
+
+    cache = frame_cache.get_frame_cache(1024**2)
+    frame = cache.get(("video.mp4", -1, 3))  # the file does not exist, mtime -1
+    assert frame is not None and frame.base is None  # owns its memory, not a view of the [20,H,W,3] batch
+    assert cache.cur_bytes == 20 * frame.nbytes
@@ -0,0 +1,59 @@
+import json
+
+import numpy as np
+import pytest
+
+from opentad.datasets.transforms import FrameStoreDecode, FrameStoreInit
+from opentad.datasets.transforms import frame_store
+from opentad.datasets.transforms.frame_store import FRAME_STORE_VERSION, INDEX_FILENAME
+
+
+@pytest.fixture(autouse=True)
+def reset_frame_store_readers():
+    frame_store._FRAME_STORE_READERS.clear()
+    yield
+    frame_store._FRAME_STORE_READERS.clear()
+
+
+@pytest.fixture
+def store_dir(tmp_path):
+    # every 4th frame of a 100-frame video, the stored frame i is filled with the original frame index 4i
+    frame_stride = 4
+    frames = np.empty((25, 8, 10, 3), dtype=np.uint8)
+    frames[:] = (np.arange(25) * frame_stride)[:, None, None, None]
+    np.save(tmp_path / "v_video.npy", frames)
+
+    videos = {"v_video": dict(total_frames=100, avg_fps=30.0, num_stored_frames=25, height=8, width=10)}
+    with open(tmp_path / INDEX_FILENAME, "w") as f:
+        json.dump(dict(version=FRAME_STORE_VERSION, frame_stride=frame_stride, videos=videos), f)
+    return str(tmp_path)
+
+
+def load(store_dir, frame_inds):
+    results = FrameStoreInit(prefix="v_")(dict(video_name="video", data_path=store_dir))
+    results["frame_inds"] = np.asarray(frame_inds)
+    return FrameStoreDecode()(results)
+
+
+def test_init_reads_the_index(store_dir):
+    results = FrameStoreInit(prefix="v_")(dict(video_name="video", data_path=store_dir))
+    assert results["total_frames"] == 100 and results["avg_fps"] == 30.0
+
+
+def test_decode_returns_the_stored_frames(store_dir):
+    frame_inds = np.array([[8, 0, 8], [96, 40, 4]])
+    results = load(store_dir, frame_inds)
+
+    assert [int(img[0, 0, 0]) for img in results["imgs"]] == frame_inds.reshape(-1).tolist()
+    assert results["original_shape"] == (8, 10)
+    assert all(img.flags.writeable and not isinstance(img, np.memmap) for img in results["imgs"])
+
+
+def test_decode_uses_the_nearest_stored_frame(store_dir):
+    results = load(store_dir, [1, 3, 6, 99, 120])
+    assert [int(img[0, 0, 0]) for img in results["imgs"]] == [0, 4, 8, 96, 96]
+
+
+def test_missing_video_is_reported(store_dir):
+    with pytest.raises(AssertionError):
+        FrameStoreInit()(dict(video_name="video", data_path=store_dir))
@@ -0,0 +1,83 @@
+import json
+import os
+
+import numpy as np
+
+from opentad.datasets import ThumosSlidingDataset
+
+
+class ListLogger:
+    def __init__(self, logs):
+        self.logs = logs
+
+    def info(self, msg):
+        self.logs.append(msg)
+
+
+def build_dataset(ann_file, class_map, cache_dir, logs, window_size=64):
+    return ThumosSlidingDataset(
+        ann_file=ann_file,
+        subset_name="validation",
+        data_path="",
+        pipeline=[],
+        class_map=class_map,
+        feature_stride=4,
+        window_size=window_size,
+        cache_dir=str(cache_dir),
+        logger=ListLogger(logs),
+    )
+
+
+def assert_same_data_list(a, b):
+    assert len(a) == len(b)
+    for x, y in zip(a, b):
+        assert x[0] == y[0] and x[1] == y[1] and np.array_equal(x[3], y[3])
+        assert np.array_equal(x[2]["gt_segments"], y[2]["gt_segments"])
+        assert np.array_equal(x[2]["gt_labels"], y[2]["gt_labels"])
+
+
+def test_second_build_loads_the_cache(thumos_annotations, tmp_path):
+    logs = []
+    built = build_dataset(*thumos_annotations, tmp_path / "cache", logs)
+    assert any("Save" in log for log in logs)
+
+    logs.clear()
+    loaded = build_dataset(*thumos_annotations, tmp_path / "cache", logs)
+    assert any("Load" in log for log in logs)
+    assert_same_data_list(built.data_list, loaded.data_list)
+
+
+def test_cache_is_keyed_by_params_and_annotations(thumos_annotations, tmp_path):
+    ann_file, class_map = thumos_annotations
+    logs = []
+    build_dataset(ann_file, class_map, tmp_path / "cache", logs)
+
+    # a different window size builds a new entry
+    logs.clear()
+    build_dataset(ann_file, class_map, tmp_path / "cache", logs, window_size=32)
+    assert not any("Load" in log for log in logs)
+
+    # so does a changed annotation file
+    with open(ann_file, "r") as f:
+        anno = json.load(f)
+    anno["database"].pop("video_0")
+    with open(ann_file, "w") as f:
+        json.dump(anno, f)
+    logs.clear()
+    dataset = build_dataset(ann_file, class_map, tmp_path / "cache", logs)
+    assert not any("Load" in log for log in logs)
+    assert "video_0" not in [data[0] for data in dataset.data_list]
+    assert len(os.listdir(tmp_path / "cache")) == 3
+
+
+def test_broken_cache_is_rebuilt(thumos_annotations, tmp_path):
+    logs = []
+    built = build_dataset(*thumos_annotations, tmp_path / "cache", logs)
+    for file_name in os.listdir(tmp_path / "cache"):
+        with open(tmp_path / "cache" / file_name, "wb") as f:
+            f.write(b"broken")
+
+    logs.clear()
+    rebuilt = build_dataset(*thumos_annotations, tmp_path / "cache", logs)
+    assert any("Failed" in log for log in logs)
+    assert_same_data_list(built.data_list, rebuilt.data_list)
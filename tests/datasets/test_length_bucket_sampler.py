@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from opentad.datasets.samplers import LengthBucketBatchSampler
+
+
+class LengthDataset:
+    def __init__(self, lengths):
+        self.lengths = lengths
+
+    def get_data_lengths(self):
+        return self.lengths
+
+
+def build_samplers(lengths, batch_size=4, num_replicas=2, **kwargs):
+    dataset = LengthDataset(lengths)
+    return [
+        LengthBucketBatchSampler(dataset, batch_size, num_replicas=num_replicas, rank=rank, **kwargs)
+        for rank in range(num_replicas)
+    ]
+
+
+@pytest.fixture
+def lengths():
+    return np.random.default_rng(0).integers(10, 2000, size=160).tolist()
+
+
+def test_ranks_cover_each_sample_once(lengths):
+    samplers = build_samplers(lengths, bucket_size=4)
+    rank_batches = [list(sampler) for sampler in samplers]
+
+    assert all(len(batches) == len(sampler) == 20 for batches, sampler in zip(rank_batches, samplers))
+    indices = [idx for batches in rank_batches for batch in batches for idx in batch]
+    assert sorted(indices) == list(range(len(lengths)))
+
+
+def test_plan_is_seeded_by_epoch(lengths):
+    a, b = build_samplers(lengths, num_replicas=1) + build_samplers(lengths, num_replicas=1)
+    assert list(a) == list(b)  # the same plan without communication
+
+    b.set_epoch(1)
+    assert list(a) != list(b)
+
+
+def test_incomplete_batches(lengths):
+    samplers = build_samplers(lengths[:150], drop_last=True)
+    assert all(len(list(sampler)) == len(sampler) == 18 for sampler in samplers)
+
+    samplers = build_samplers(lengths[:150], drop_last=False)
+    indices = [idx for sampler in samplers for batch in sampler for idx in batch]
+    assert len(indices) == 152 and set(indices) == set(range(150))  # filled by repeating samples
+
+
+def test_bucketing_reduces_padding(lengths):
+    sampler = build_samplers(lengths, num_replicas=1, bucket_size=8)[0]
+    assert sampler.padding_efficiency is None
+    batches = list(sampler)
+
+    stats = sampler.padding_stats()
+    assert sampler.padding_efficiency == stats["padding_efficiency"]
+    assert stats["padding_efficiency"] > stats["padding_efficiency_no_bucket"]
+
+    # the batches are sorted by length inside each bucket
+    batch_lengths = np.array([[lengths[idx] for idx in batch] for batch in batches])
+    assert np.all(np.diff(batch_lengths, axis=1) >= 0)
+
+
+def test_padding_stats_follow_the_epoch(lengths):
+    # on resume, the stats logged at startup are those of the first trained epoch
+    sampler = build_samplers(lengths, num_replicas=1, bucket_size=8)[0]
+    epoch_0 = sampler.padding_stats()["padding_efficiency"]
+    sampler.set_epoch(5)
+    stats = sampler.padding_stats()
+    assert stats["padding_efficiency"] != epoch_0
+
+    list(sampler)
+    assert sampler.padding_efficiency == stats["padding_efficiency"]
+
+
+def test_repr_does_not_rebuild_the_batches(lengths, monkeypatch):
+    sampler = build_samplers(lengths, num_replicas=1)[0]
+    list(sampler)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("the batches are rebuilt")
+
+    monkeypatch.setattr(sampler, "get_global_batches", fail)
+    assert "padding_efficiency" in repr(sampler)
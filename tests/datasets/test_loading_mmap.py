@@ -0,0 +1,50 @@
+import random
+
+import numpy as np
+import pytest
+import torch
+
+from opentad.datasets.transforms import ConvertToTensor, LoadFeats, RandomTrunc, SlidingWindowTrunc
+
+
+@pytest.fixture
+def feats_dir(tmp_path):
+    np.save(tmp_path / "video.npy", np.random.rand(100, 16).astype(np.float32))
+    return tmp_path
+
+
+def sliding_window(loader, data_path, start, end, sample_stride):
+    results = dict(
+        video_name="video",
+        data_path=str(data_path),
+        sample_stride=sample_stride,
+        window_size=end - start + 1,
+        feature_start_idx=start,
+        feature_end_idx=end,
+    )
+    results = loader(results)
+    results = ConvertToTensor(keys=["feats"])(results)
+    return SlidingWindowTrunc()(results)
+
+
+@pytest.mark.parametrize("start, end, sample_stride", [(0, 31, 1), (40, 71, 1), (80, 111, 1), (10, 29, 2)])
+def test_mmap_window_matches_full_read(feats_dir, start, end, sample_stride):
+    full = sliding_window(LoadFeats(feat_format="npy"), feats_dir, start, end, sample_stride)
+    window = sliding_window(LoadFeats(feat_format="npy", mmap=True), feats_dir, start, end, sample_stride)
+
+    assert window["feats"].dtype == torch.float32
+    assert torch.equal(window["feats"], full["feats"])
+    assert torch.equal(window["masks"], full["masks"])
+
+
+def test_mmap_random_trunc_matches_full_read(feats_dir):
+    gt = dict(gt_segments=torch.tensor([[10.0, 30.0], [50.0, 70.0]]), gt_labels=torch.tensor([0, 1]))
+    outputs = []
+    for loader in [LoadFeats(feat_format="npy"), LoadFeats(feat_format="npy", mmap=True)]:
+        results = loader(dict(video_name="video", data_path=str(feats_dir), **gt))
+        results = ConvertToTensor(keys=["feats"])(results)
+        random.seed(0)  # the same truncation for both
+        outputs.append(RandomTrunc(trunc_len=64, trunc_thresh=0.5)(results))
+
+    assert torch.equal(outputs[0]["feats"], outputs[1]["feats"])
+    assert torch.equal(outputs[0]["gt_segments"], outputs[1]["gt_segments"])
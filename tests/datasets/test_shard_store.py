@@ -0,0 +1,59 @@
+import os
+
+import numpy as np
+import pytest
+
+from opentad.datasets.transforms import LoadFeats
+from opentad.datasets.transforms import shard_store
+from opentad.datasets.transforms.shard_store import FeatureShardReader, FeatureShardWriter
+
+
+@pytest.fixture(autouse=True)
+def reset_shard_readers():
+    shard_store._SHARD_READERS.clear()
+    yield
+    shard_store._SHARD_READERS.clear()
+
+
+def build_videos(num_videos=5):
+    rng = np.random.default_rng(0)
+    return {f"video_{i}": rng.random((int(rng.integers(10, 50)), 8)).astype(np.float32) for i in range(num_videos)}
+
+
+def test_round_trip_across_shards(tmp_path):
+    videos = build_videos()
+    with FeatureShardWriter(str(tmp_path), shard_bytes=1024, align=64) as writer:
+        for name, feats in videos.items():
+            writer.add(name, feats)
+
+    reader = FeatureShardReader(str(tmp_path))
+    assert len(reader) == len(videos) and len(reader.shards) > 1
+    for name, feats in videos.items():
+        assert reader.videos[name]["offset"] % 64 == 0
+        np.testing.assert_array_equal(reader.read(name), feats)
+        assert reader.read_scale(name) is None
+
+
+def test_duplicate_video_is_rejected(tmp_path):
+    writer = FeatureShardWriter(str(tmp_path))
+    writer.add("video", np.zeros((2, 2), dtype=np.float32))
+    with pytest.raises(AssertionError):
+        writer.add("video", np.zeros((2, 2), dtype=np.float32))
+    writer.close()
+
+
+def test_load_feats_from_shard_matches_npy(tmp_path):
+    videos = build_videos()
+    npy_dir = tmp_path / "npy"
+    store_dir = tmp_path / "store"
+    os.makedirs(npy_dir)
+    with FeatureShardWriter(str(store_dir)) as writer:
+        for name, feats in videos.items():
+            np.save(npy_dir / f"{name}.npy", feats)
+            writer.add(name, feats)
+
+    for mmap in [False, True]:
+        for name in videos.keys():
+            expected = LoadFeats(feat_format="npy")(dict(video_name=name, data_path=str(npy_dir)))["feats"]
+            results = LoadFeats(feat_format="shard", mmap=mmap)(dict(video_name=name, data_path=str(store_dir)))
+            np.testing.assert_array_equal(results["feats"], expected)
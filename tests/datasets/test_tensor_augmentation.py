@@ -0,0 +1,104 @@
+import random
+
+import numpy as np
+import pytest
+from mmaction.datasets.transforms import CenterCrop, Flip, FormatShape, RandomResizedCrop, Resize
+
+from opentad.datasets.transforms.augmentation import (
+    TensorCenterCrop,
+    TensorFlip,
+    TensorFormatShape,
+    TensorRandomResizedCrop,
+    TensorResize,
+)
+
+
+def get_results(num_frames=8, num_clips=1):
+    rng = np.random.default_rng(0)
+    imgs = [rng.integers(0, 256, (48, 64, 3), dtype=np.uint8) for _ in range(num_frames)]
+    return dict(imgs=imgs, img_shape=(48, 64), modality="RGB", num_clips=num_clips, clip_len=num_frames // num_clips)
+
+
+def apply(transform, results):
+    results = transform(dict(results, imgs=[img.copy() for img in results["imgs"]]))  # mmaction.Flip is in-place
+    imgs = results["imgs"]
+    results["imgs"] = imgs.numpy() if hasattr(imgs, "numpy") else np.stack(imgs)
+    return results
+
+
+@pytest.mark.parametrize(
+    "scale, keep_ratio",
+    [((-1, 32), True), ((-1, 100), True), ((256, 40), True), (0.5, True), ((40, 30), False)],
+)
+def test_resize_matches_mmaction(scale, keep_ratio):
+    results = get_results()
+    expected = apply(Resize(scale=scale, keep_ratio=keep_ratio), results)
+    actual = apply(TensorResize(scale=scale, keep_ratio=keep_ratio), results)
+
+    assert actual["img_shape"] == expected["img_shape"]
+    np.testing.assert_allclose(actual["scale_factor"], expected["scale_factor"])
+    # cv2 interpolates in fixed point, the rounding differs by at most one level
+    assert actual["imgs"].shape == expected["imgs"].shape
+    assert np.abs(actual["imgs"].astype(np.int32) - expected["imgs"].astype(np.int32)).max() <= 1
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_resized_crop_matches_mmaction(seed):
+    results = get_results()
+    random.seed(seed)
+    np.random.seed(seed)
+    expected = apply(RandomResizedCrop(), results)
+    random.seed(seed)
+    np.random.seed(seed)
+    actual = apply(TensorRandomResizedCrop(), results)
+
+    np.testing.assert_array_equal(actual["crop_bbox"], expected["crop_bbox"])
+    assert tuple(actual["img_shape"]) == tuple(expected["img_shape"])
+    np.testing.assert_array_equal(actual["imgs"], expected["imgs"])
+
+
+@pytest.mark.parametrize("crop_size", [32, (40, 24), (64, 48)])
+def test_center_crop_matches_mmaction(crop_size):
+    results = get_results()
+    expected = apply(CenterCrop(crop_size=crop_size), results)
+    actual = apply(TensorCenterCrop(crop_size=crop_size), results)
+
+    np.testing.assert_array_equal(actual["crop_bbox"], expected["crop_bbox"])
+    assert tuple(actual["img_shape"]) == tuple(expected["img_shape"])
+    np.testing.assert_array_equal(actual["imgs"], expected["imgs"])
+
+
+@pytest.mark.parametrize("flip_ratio", [0.0, 1.0])
+@pytest.mark.parametrize("direction", ["horizontal", "vertical"])
+def test_flip_matches_mmaction(flip_ratio, direction):
+    results = get_results()
+    expected = apply(Flip(flip_ratio=flip_ratio, direction=direction), results)
+    actual = apply(TensorFlip(flip_ratio=flip_ratio, direction=direction), results)
+
+    assert actual["flip"] == expected["flip"] and actual["flip_direction"] == expected["flip_direction"]
+    np.testing.assert_array_equal(actual["imgs"], expected["imgs"])
+
+
+@pytest.mark.parametrize("input_format, num_clips", [("NCTHW", 1), ("NCTHW", 4), ("NCHW", 1)])
+def test_format_shape_matches_mmaction(input_format, num_clips):
+    results = get_results(num_frames=8, num_clips=num_clips)
+    expected = apply(FormatShape(input_format=input_format), results)
+    actual = apply(TensorFormatShape(input_format=input_format), results)
+
+    assert actual["input_shape"] == expected["input_shape"]
+    assert actual["imgs"].dtype == np.uint8
+    np.testing.assert_array_equal(actual["imgs"], expected["imgs"])
+
+
+def test_pipeline_matches_mmaction():
+    # crop, resize, flip and format the whole window as in the test pipelines
+    results = get_results(num_frames=8, num_clips=2)
+    expected = dict(results, imgs=[img.copy() for img in results["imgs"]])
+    actual = dict(results)
+    for transform in [CenterCrop(crop_size=40), Resize(scale=(-1, 32)), Flip(flip_ratio=1.0), FormatShape("NCTHW")]:
+        expected = transform(expected)
+    for transform in [TensorCenterCrop(40), TensorResize((-1, 32)), TensorFlip(1.0), TensorFormatShape()]:
+        actual = transform(actual)
+
+    assert actual["imgs"].shape == expected["imgs"].shape == (2, 3, 4, 32, 32)
+    assert np.abs(actual["imgs"].numpy().astype(np.int32) - expected["imgs"].astype(np.int32)).max() <= 1
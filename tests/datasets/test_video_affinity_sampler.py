@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from opentad.datasets.samplers import VideoAffinityBatchSampler
+
+
+class WindowDataset:
+    def __init__(self, num_windows):
+        # the windows of each video are contiguous in the data list, as in SlidingWindowDataset
+        self.data_list = [[f"video_{i}"] for i, n in enumerate(num_windows) for _ in range(n)]
+
+
+@pytest.fixture
+def dataset():
+    return WindowDataset(np.random.default_rng(0).integers(1, 20, size=30).tolist())
+
+
+def build_samplers(dataset, num_replicas=2, num_workers=3, **kwargs):
+    return [
+        VideoAffinityBatchSampler(
+            dataset, batch_size=4, num_replicas=num_replicas, rank=rank, num_workers=num_workers, **kwargs
+        )
+        for rank in range(num_replicas)
+    ]
+
+
+@pytest.mark.parametrize("shuffle", [True, False])
+def test_each_video_is_loaded_by_one_worker(dataset, shuffle):
+    num_workers = 3
+    samplers = build_samplers(dataset, num_workers=num_workers, shuffle=shuffle)
+    rank_batches = [list(sampler) for sampler in samplers]
+    assert len(set(len(batches) for batches in rank_batches)) == 1
+
+    owner = {}
+    for rank, batches in enumerate(rank_batches):
+        for k, batch in enumerate(batches):
+            for idx in batch:  # the k-th batch of a rank goes to its (k % num_workers)-th worker
+                video_name = dataset.data_list[idx][0]
+                assert owner.setdefault(video_name, (rank, k % num_workers)) == (rank, k % num_workers)
+
+
+def test_windows_keep_their_order(dataset):
+    sampler = build_samplers(dataset, num_replicas=1, num_workers=1, shuffle=True)[0]
+    indices = [idx for batch in sampler for idx in batch]
+    assert sorted(set(indices)) == list(range(len(dataset.data_list)))
+
+    for video_name in set(data[0] for data in dataset.data_list):
+        video_indices = [idx for idx in indices if dataset.data_list[idx][0] == video_name]
+        assert video_indices == sorted(video_indices)
+
+
+def test_batch_sizes(dataset):
+    samplers = build_samplers(dataset, drop_last=False)
+    indices = [idx for sampler in samplers for batch in sampler for idx in batch]
+    assert set(indices) == set(range(len(dataset.data_list)))  # no window is dropped
+    assert all(0 < len(batch) <= 4 for sampler in samplers for batch in sampler)
+
+    samplers = build_samplers(dataset, drop_last=True)
+    assert all(len(batch) == 4 for sampler in samplers for batch in sampler)
+
+
+def test_len_matches_iteration(dataset):
+    for drop_last in [True, False]:
+        for sampler in build_samplers(dataset, drop_last=drop_last):
+            sampler.set_epoch(3)
+            assert len(list(sampler)) == len(sampler)
+
+
+def test_more_ranks_than_videos():
+    samplers = build_samplers(WindowDataset([5]), num_replicas=2, num_workers=1)
+    assert list(samplers[0]) == list(samplers[1]) and len(samplers[1]) == 2
@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+from opentad.datasets import ThumosPaddingDataset, ThumosSlidingDataset
+from opentad.datasets.base.util import get_video_meta, load_video_meta
+from opentad.datasets.transforms import frame_cache
+
+
+@pytest.fixture
+def video_meta_file(tmp_path):
+    videos = {
+        f"video_{i}": dict(frames=3000 + i, fps=30.0, duration=100.0, height=240, width=320, keyframes=[0, 250])
+        for i in range(4)
+    }
+    path = tmp_path / "video_meta.json"
+    with open(path, "w") as f:
+        json.dump(dict(videos=videos), f)
+    return str(path)
+
+
+def test_get_video_meta(video_meta_file):
+    video_meta = load_video_meta(video_meta_file)
+    assert get_video_meta(video_meta, "video_1") == dict(
+        total_frames=3001,
+        avg_fps=30.0,
+        video_resolution=(240, 320),
+        keyframe_inds=[0, 250],
+    )
+    assert get_video_meta(video_meta, "missing") == {}
+    assert get_video_meta(load_video_meta(None), "video_1") == {}
+
+
+@pytest.mark.parametrize("dataset_type", [ThumosSlidingDataset, ThumosPaddingDataset])
+def test_dataset_injects_the_meta(thumos_annotations, video_meta_file, dataset_type, monkeypatch):
+    ann_file, class_map = thumos_annotations
+    pipeline = [dict(type="PrepareVideoInfo", format="mp4"), dict(type="CachedDecordInit")]
+    kwargs = dict(window_size=64) if dataset_type is ThumosSlidingDataset else {}
+    dataset = dataset_type(
+        ann_file=ann_file,
+        subset_name="validation",
+        data_path="videos",
+        pipeline=pipeline,
+        class_map=class_map,
+        feature_stride=4,
+        video_meta=video_meta_file,
+        **kwargs,
+    )
+
+    # the video container should never be opened
+    def fail(*args, **kwargs):
+        raise AssertionError("the video is opened")
+
+    monkeypatch.setattr(frame_cache.VideoReaderCache, "get", fail)
+    for i in range(len(dataset)):
+        results = dataset[i]
+        video_index = int(results["video_name"].split("_")[-1])
+        assert results["total_frames"] == 3000 + video_index and results["avg_fps"] == 30.0
+        assert results["video_reader"] is None and results["keyframe_inds"] == [0, 250]
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from opentad.datasets.base import SlidingWindowDataset
+from opentad.datasets.base.sliding_dataset import (
+    compute_gt_completeness,
+    compute_gt_completeness_batched,
+    compute_windows,
+)
+
+
+def sliding_windows(snippet_num, window_size, window_stride):
+    # the window-by-window sliding of the previous implementation
+    windows = []
+    for idx in range(max(1, snippet_num // window_stride)):
+        start, end = idx * window_stride, idx * window_stride + window_size
+        if end > snippet_num:
+            windows.append((max(0, snippet_num - window_size), snippet_num))
+            break
+        windows.append((start, end))
+    return windows
+
+
+def build_dataset(window_size, window_overlap_ratio, snippet_stride=4, ioa_thresh=0.75):
+    dataset = SlidingWindowDataset.__new__(SlidingWindowDataset)
+    dataset.fps = -1
+    dataset.snippet_stride = snippet_stride
+    dataset.window_size = window_size
+    dataset.window_stride = int(window_size * (1 - window_overlap_ratio))
+    dataset.ioa_thresh = ioa_thresh
+    return dataset
+
+
+@pytest.mark.parametrize("snippet_num", [1, 10, 63, 64, 65, 127, 128, 129, 1000])
+@pytest.mark.parametrize("window_size, window_stride", [(64, 48), (64, 64), (64, 16), (128, 32)])
+def test_compute_windows(snippet_num, window_size, window_stride):
+    window_starts, window_ends = compute_windows(snippet_num, window_size, window_stride)
+    assert list(zip(window_starts.tolist(), window_ends.tolist())) == sliding_windows(
+        snippet_num, window_size, window_stride
+    )
+
+
+@pytest.mark.parametrize("dtype", [np.float32, np.float64, np.int64])
+def test_batched_completeness_matches_per_window(dtype):
+    rng = np.random.default_rng(0)
+    gt_start = rng.uniform(0, 1000, size=50)
+    gt_boxes = np.stack([gt_start, gt_start + rng.uniform(0, 100, size=50)], axis=1).astype(dtype)
+    gt_boxes[0] = [500, 500]  # zero-length gt
+    anchors = np.array([[0, 252], [192, 444], [384, 636], [748, 1000]])
+
+    scores, truncated = compute_gt_completeness_batched(gt_boxes, anchors)
+    for i, anchor in enumerate(anchors):
+        expected_scores, expected_truncated = compute_gt_completeness(gt_boxes, anchor)
+        np.testing.assert_array_equal(scores[i], expected_scores)
+        np.testing.assert_array_equal(truncated[i], expected_truncated)
+        assert truncated[i].dtype == expected_truncated.dtype
+
+
+@pytest.mark.parametrize("num_frames", [100, 1000, 4321])
+def test_split_video_to_windows(num_frames):
+    dataset = build_dataset(window_size=64, window_overlap_ratio=0.25)
+    rng = np.random.default_rng(num_frames)
+    gt_start = rng.uniform(0, num_frames, size=20)
+    video_anno = dict(
+        gt_segments=np.stack([gt_start, gt_start + rng.uniform(4, 200, size=20)], axis=1).astype(np.float32),
+        gt_labels=rng.integers(0, 5, size=20).astype(np.int32),
+    )
+    video_info = dict(frame=num_frames)
+    data_list = dataset.split_video_to_windows("video", video_info, video_anno)
+
+    snippet_centers = np.arange(0, num_frames, dataset.snippet_stride)
+    expected = []
+    for start, end in sliding_windows(len(snippet_centers), dataset.window_size, dataset.window_stride):
+        window_centers = snippet_centers[start:end]
+        anchor = np.array([window_centers[0], window_centers[-1]])
+        completeness, truncated_gt = compute_gt_completeness(video_anno["gt_segments"], anchor)
+        valid = completeness > dataset.ioa_thresh
+        if valid.any():  # only the windows with gt are kept
+            expected.append((window_centers, truncated_gt[valid], video_anno["gt_labels"][valid]))
+
+    assert len(data_list) == len(expected)
+    for data, (window_centers, gt_segments, gt_labels) in zip(data_list, expected):
+        assert data[0] == "video" and data[1] is video_info
+        np.testing.assert_array_equal(data[3], window_centers)
+        np.testing.assert_array_equal(data[2]["gt_segments"], gt_segments)
+        np.testing.assert_array_equal(data[2]["gt_labels"], gt_labels)
+        assert data[2]["gt_segments"].dtype == gt_segments.dtype
+
+
+def test_split_video_to_windows_in_test_mode():
+    dataset = build_dataset(window_size=64, window_overlap_ratio=0.25)
+    data_list = dataset.split_video_to_windows("video", dict(frame=1000), {})
+    starts = [data[3][0] // dataset.snippet_stride for data in data_list]
+    assert starts == [start for start, _ in sliding_windows(250, 64, 48)]
+    assert all(data[2] == {} for data in data_list)
@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from opentad.evaluations.mAP import (
+    compute_average_precision_detection,
+    interpolated_prec_rec,
+    match_detections,
+    segment_iou,
+)
+
+TIOU_THRESHOLDS = np.linspace(0.5, 0.95, 10)
+
+
+def loop_match(pred_segments, gt_segments, tiou_thresholds):
+    # the per-prediction greedy matching of the original evaluation, on the predictions sorted by score
+    tp = np.zeros((len(tiou_thresholds), len(pred_segments)), dtype=bool)
+    locked = np.zeros((len(tiou_thresholds), len(gt_segments)), dtype=bool)
+    for idx, pred_segment in enumerate(pred_segments):
+        tiou = segment_iou(pred_segment, gt_segments)
+        for tidx, tiou_thr in enumerate(tiou_thresholds):
+            for jdx in tiou.argsort()[::-1]:
+                if tiou[jdx] < tiou_thr:
+                    break
+                if not locked[tidx, jdx]:
+                    tp[tidx, idx] = locked[tidx, jdx] = True
+                    break
+    return tp
+
+
+def loop_average_precision(ground_truth, prediction, tiou_thresholds):
+    sort_idx = prediction["score"].values.argsort()[::-1]
+    prediction = prediction.loc[sort_idx].reset_index(drop=True)
+    tp = np.zeros((len(tiou_thresholds), len(prediction)), dtype=bool)
+    for video_id, video_pred in prediction.groupby("video-id"):
+        video_gt = ground_truth[ground_truth["video-id"] == video_id]
+        if len(video_gt) > 0:  # otherwise, all the predictions are false positives
+            tp[:, video_pred.index] = loop_match(
+                video_pred[["t-start", "t-end"]].values,
+                video_gt[["t-start", "t-end"]].values,
+                tiou_thresholds,
+            )
+    tp_cumsum = np.cumsum(tp, axis=1)
+    rec = tp_cumsum / len(ground_truth)
+    prec = tp_cumsum / np.arange(1, len(prediction) + 1)
+    return np.array([interpolated_prec_rec(prec[t], rec[t]) for t in range(len(tiou_thresholds))])
+
+
+def build_class_data(seed, num_videos=8, max_gts=6, num_preds=40):
+    rng = np.random.default_rng(seed)
+    gt_list, pred_list = [], []
+    for i in range(num_videos):
+        num_gts = int(rng.integers(1, max_gts + 1))
+        gt_start = np.round(rng.uniform(0, 100, num_gts), 1)
+        gt_end = gt_start + np.round(rng.uniform(1, 20, num_gts), 1)
+        gt_list.append(pd.DataFrame({"video-id": f"video_{i}", "t-start": gt_start, "t-end": gt_end}))
+
+        # jittered ground truths and random segments, with the rounding of the result file
+        ref = rng.integers(0, num_gts, size=num_preds // 2)
+        pred_start = np.concatenate([gt_start[ref] + rng.normal(0, 1, len(ref)), rng.uniform(0, 100, len(ref))])
+        pred_end = np.concatenate([gt_end[ref] + rng.normal(0, 1, len(ref)), pred_start[len(ref) :] + 10])
+        pred_list.append(
+            pd.DataFrame(
+                {
+                    "video-id": f"video_{i}",
+                    "t-start": np.round(pred_start, 2),
+                    "t-end": np.round(np.maximum(pred_end, pred_start + 0.1), 2),
+                    "score": np.round(rng.uniform(0, 1, num_preds), 2),  # many ties
+                }
+            )
+        )
+    # a video with predictions but no ground truth, and a video with ground truth but no prediction
+    pred_list.append(pd.DataFrame({"video-id": "no_gt", "t-start": [1.0, 5.0], "t-end": [2.0, 9.0], "score": 0.5}))
+    gt_list.append(pd.DataFrame({"video-id": ["no_pred"], "t-start": [3.0], "t-end": [4.0]}))
+    return pd.concat(gt_list).reset_index(drop=True), pd.concat(pred_list).reset_index(drop=True)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_average_precision_matches_the_loop(seed):
+    ground_truth, prediction = build_class_data(seed)
+    expected = loop_average_precision(ground_truth, prediction, TIOU_THRESHOLDS)
+    actual = compute_average_precision_detection(ground_truth, prediction, TIOU_THRESHOLDS)
+    assert expected.max() > 0
+    np.testing.assert_allclose(actual, expected, rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize(
+    "pred_segments, gt_segments",
+    [
+        ([[0, 10], [0, 10], [0, 10]], [[0, 10], [0, 10]]),  # duplicated ground truths, the tIoU ties
+        ([[2, 8], [0, 10]], [[0, 6], [4, 10]]),  # one prediction with the same tIoU to two ground truths
+        ([[0, 10], [1, 10], [0, 9]], [[0, 10], [0.5, 10]]),  # a later prediction fits a taken ground truth
+        ([[50, 60]], [[0, 10]]),  # no overlap
+        ([[0, 10], [5, 15]], [[0, 10], [5, 15], [2, 12]]),  # more ground truths than predictions
+    ],
+)
+def test_matching_matches_the_loop_on_ties(pred_segments, gt_segments):
+    pred_segments = np.array(pred_segments, dtype=float)
+    gt_segments = np.array(gt_segments, dtype=float)
+    thresholds = np.array([0.1, 0.3, 0.5, 0.7, 0.95])
+    expected = loop_match(pred_segments, gt_segments, thresholds)
+    np.testing.assert_array_equal(match_detections(pred_segments, gt_segments, thresholds), expected)
+
+
+def test_videos_without_ground_truth_are_false_positives():
+    ground_truth = pd.DataFrame({"video-id": ["a"], "t-start": [0.0], "t-end": [10.0]})
+    prediction = pd.DataFrame(
+        {"video-id": ["b", "a", "b"], "t-start": [0.0, 0.0, 0.0], "t-end": [10.0, 10.0, 10.0], "score": [0.9, 0.8, 0.7]}
+    )
+    # the true positive comes after one false positive: precision 1/2 at recall 1
+    ap = compute_average_precision_detection(ground_truth, prediction, TIOU_THRESHOLDS)
+    np.testing.assert_allclose(ap, 0.5)
+    np.testing.assert_allclose(ap, loop_average_precision(ground_truth, prediction, TIOU_THRESHOLDS))
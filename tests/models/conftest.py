@@ -0,0 +1,59 @@
+import pytest
+import torch
+from mmengine.config import ConfigDict
+
+import opentad.datasets  # noqa: F401, register the pipelines
+import opentad.models  # noqa: F401
+from opentad.models.backbones.backbone_wrapper import BACKBONES, BackboneWrapper
+
+
+@BACKBONES.register_module(force=True)
+class TubeletBackbone(torch.nn.Module):
+    """A backbone whose features of each tubelet (2 frames x 4 x 4 pixels) only depend on the tubelet itself."""
+
+    def __init__(self, embed_dims=8):
+        super().__init__()
+        self.proj = torch.nn.Conv3d(3, embed_dims, kernel_size=(2, 4, 4), stride=(2, 4, 4))
+
+    def forward(self, x):
+        return torch.tanh(self.proj(x))  # [B,C,T/2,H/4,W/4]
+
+
+@pytest.fixture
+def build_wrapper():
+    """Build a BackboneWrapper with the given custom settings, the default backbone is a tiny ViT with adapters
+    on [B,1,3,4,32,32] inputs."""
+
+    def build(backbone=None, format_shape="NCTHW", **custom):
+        if backbone is None:
+            backbone = dict(
+                type="VisionTransformerAdapter",
+                img_size=32,
+                patch_size=16,
+                embed_dims=32,
+                depth=2,
+                num_heads=2,
+                num_frames=4,
+                return_feat_map=True,
+                total_frames=4,
+                adapter_index=[1],
+            )
+        custom.setdefault(
+            "post_processing_pipeline",
+            [dict(type="Reduce", keys=["feats"], ops="b n c t h w -> b c t", reduction="mean")],
+        )
+        torch.manual_seed(0)
+        cfg = ConfigDict(
+            type="mmaction.Recognizer3D",
+            backbone=backbone,
+            data_preprocessor=dict(
+                type="mmaction.ActionDataPreprocessor",
+                mean=[123.675, 116.28, 103.53],
+                std=[58.395, 57.12, 57.375],
+                format_shape=format_shape,
+            ),
+            custom=custom,
+        )
+        return BackboneWrapper(cfg)
+
+    return build
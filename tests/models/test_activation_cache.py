@@ -0,0 +1,63 @@
+import glob
+import os
+
+import torch
+
+
+def cache_files(cache_dir):
+    return glob.glob(os.path.join(str(cache_dir), "**", "*.pt"), recursive=True)
+
+
+def forward(wrapper, frames, keys):
+    wrapper.set_clip_keys([dict(clip_key=key) for key in keys])
+    return wrapper(frames)
+
+
+def get_frames(batch_size=2):
+    torch.manual_seed(1)
+    return torch.randint(0, 256, (batch_size, 1, 3, 4, 32, 32), dtype=torch.uint8)
+
+
+def test_cached_forward_matches_the_full_forward(build_wrapper, tmp_path):
+    wrapper = build_wrapper(activation_cache_dir=str(tmp_path), activation_cache_dtype="float32").eval()
+    frames = get_frames()
+    with torch.no_grad():
+        expected = wrapper(frames)  # no clip keys, no cache
+        first = forward(wrapper, frames, ["aa01", "bb02"])
+        second = forward(wrapper, frames, ["aa01", "bb02"])
+
+    assert len(cache_files(tmp_path)) == 2
+    assert wrapper.activation_cache.hits == 2 and wrapper.activation_cache.misses == 2
+    torch.testing.assert_close(first, expected)
+    torch.testing.assert_close(second, expected)
+
+
+def test_training_skips_the_cache_by_default(build_wrapper, tmp_path):
+    wrapper = build_wrapper(activation_cache_dir=str(tmp_path)).train()
+    forward(wrapper, get_frames(), ["aa01", "bb02"]).sum().backward()
+    assert wrapper.activation_cache is None
+    assert len(cache_files(tmp_path)) == 0
+
+
+def test_training_uses_the_cache_for_deterministic_pipelines(build_wrapper, tmp_path):
+    wrapper = build_wrapper(activation_cache_dir=str(tmp_path), activation_cache_deterministic=True).train()
+    forward(wrapper, get_frames(), ["aa01", "bb02"]).sum().backward()
+    assert len(cache_files(tmp_path)) == 2
+
+    # the adapters are still trained from the cached tokens
+    grads = [p.grad for name, p in wrapper.named_parameters() if "adapter" in name]
+    assert len(grads) > 0 and all(grad is not None for grad in grads)
+
+
+def test_cache_size_is_limited(build_wrapper, tmp_path):
+    # one entry is 8 tokens x 32 channels in float16, about 2KB on disk with the overhead of torch.save
+    wrapper = build_wrapper(activation_cache_dir=str(tmp_path), activation_cache_max_gb=5000 / 1024**3).eval()
+    frames = get_frames(batch_size=1)
+    with torch.no_grad():
+        for i in range(6):
+            forward(wrapper, frames, [f"{i:02d}key"])
+
+    files = cache_files(tmp_path)
+    assert 1 <= len(files) < 6
+    assert sum(os.path.getsize(path) for path in files) <= 5000
+    assert os.path.basename(wrapper.activation_cache.get_path("05key")) in [os.path.basename(f) for f in files]
@@ -0,0 +1,84 @@
+import pytest
+import torch
+
+nms_1d_cpu = pytest.importorskip("nms_1d_cpu")
+from opentad.models.utils.post_processing.nms.nms import batched_nms  # noqa: E402
+
+
+def build_predictions(num_segs=300, num_classes=7, seed=0):
+    generator = torch.Generator().manual_seed(seed)
+    centers = torch.rand(num_segs, generator=generator) * 100
+    lengths = torch.rand(num_segs, generator=generator) * 20 + 0.1
+    segs = torch.stack([centers - lengths / 2, centers + lengths / 2], dim=1)
+    scores = (torch.rand(num_segs, generator=generator) * 100).round() / 100  # rounded scores have ties
+    cls_idxs = torch.randint(0, num_classes, (num_segs,), generator=generator) * 3  # sparse class ids
+    return segs, scores, cls_idxs
+
+
+def loop_nms(monkeypatch, *args, **kwargs):
+    # hide the native batched kernel to run the per-class python loop
+    with monkeypatch.context() as m:
+        m.delattr(nms_1d_cpu, "batched_nms")
+        return batched_nms(*args, **kwargs)
+
+
+NMS_CFGS = [
+    dict(use_soft_nms=False, iou_threshold=0.5, min_score=0.0, method=0),
+    dict(use_soft_nms=False, iou_threshold=0.3, min_score=0.2, method=0),
+    dict(use_soft_nms=True, iou_threshold=0.5, min_score=0.001, sigma=0.5, method=1),
+    dict(use_soft_nms=True, iou_threshold=0.5, min_score=0.001, sigma=0.5, method=2),
+    dict(use_soft_nms=True, iou_threshold=0.5, min_score=0.001, sigma=0.5, method=3, t1=0.2, t2=0.8),
+]
+
+
+@pytest.mark.parametrize("nms_cfg", NMS_CFGS)
+@pytest.mark.parametrize("max_seg_num", [0, 5, 100])
+@pytest.mark.parametrize("seed", [0, 1])
+def test_batched_nms_matches_the_per_class_loop(monkeypatch, nms_cfg, max_seg_num, seed):
+    predictions = build_predictions(seed=seed)
+    expected = loop_nms(monkeypatch, *predictions, max_seg_num=max_seg_num, multiclass=True, **nms_cfg)
+    actual = batched_nms(*predictions, max_seg_num=max_seg_num, multiclass=True, **nms_cfg)
+    for a, b in zip(actual, expected):
+        assert a.dtype == b.dtype
+        assert torch.equal(a, b)
+
+
+def test_batched_nms_corner_cases(monkeypatch):
+    # one segment per class, duplicated segments, and a class filtered out by min_score
+    segs = torch.tensor([[0.0, 1.0], [0.0, 1.0], [0.0, 1.0], [5.0, 6.0], [2.0, 3.0]], dtype=torch.float64)
+    scores = torch.tensor([0.9, 0.9, 0.5, 0.05, 0.7], dtype=torch.float64)
+    cls_idxs = torch.tensor([4, 4, 4, 0, 2])
+    for nms_cfg in NMS_CFGS:
+        expected = loop_nms(monkeypatch, segs, scores, cls_idxs, max_seg_num=100, **nms_cfg)
+        actual = batched_nms(segs, scores, cls_idxs, max_seg_num=100, **nms_cfg)
+        for a, b in zip(actual, expected):
+            assert torch.equal(a, b)
+
+
+def test_batched_nms_without_predictions():
+    segs, scores, cls_idxs = batched_nms(torch.zeros(0, 2), torch.zeros(0), torch.zeros(0, dtype=torch.long))
+    assert segs.shape == (0, 2) and scores.shape == (0,) and cls_idxs.dtype == torch.long
+
+
+def test_parallel_kernel_is_deterministic():
+    segs, scores, cls_idxs = build_predictions(num_segs=2000, num_classes=50)
+    outputs = [
+        nms_1d_cpu.batched_nms(
+            segs,
+            scores,
+            cls_idxs,
+            use_soft_nms=True,
+            iou_threshold=0.5,
+            sigma=0.5,
+            min_score=0.001,
+            method=2,
+            max_num=100,
+            t1=0.0,
+            t2=0.0,
+            parallel=parallel,
+        )
+        for parallel in [False, True, True]
+    ]
+    for output in outputs[1:]:
+        for a, b in zip(output, outputs[0]):
+            assert torch.equal(a, b)
@@ -0,0 +1,47 @@
+import pytest
+import torch
+
+
+def get_frames(format_shape, dtype):
+    torch.manual_seed(1)
+    shape = (2, 3, 3, 4, 32, 32) if format_shape == "NCTHW" else (2, 3, 3, 32, 32)  # [B,N,C,(T),H,W]
+    return torch.randint(0, 256, shape, dtype=torch.uint8).to(dtype)
+
+
+@pytest.mark.parametrize("format_shape", ["NCTHW", "NCHW"])
+@pytest.mark.parametrize("dtype", [torch.uint8, torch.float32])
+def test_batched_normalize_matches_the_data_preprocessor(build_wrapper, format_shape, dtype):
+    wrapper = build_wrapper(format_shape=format_shape, batched_normalize=True)
+    assert wrapper.support_batched_normalize(wrapper.model.data_preprocessor)
+    frames = get_frames(format_shape, dtype)
+
+    batched = wrapper.preprocess(frames)
+    wrapper.batched_normalize = False
+    expected = wrapper.preprocess(frames)
+    assert batched.dtype == expected.dtype == torch.float32
+    torch.testing.assert_close(batched, expected)
+
+
+def test_batched_normalize_is_disabled_by_default(build_wrapper):
+    assert not build_wrapper().batched_normalize
+
+
+def test_channel_conversion_falls_back_to_the_data_preprocessor(build_wrapper):
+    wrapper = build_wrapper(batched_normalize=True)
+    data_preprocessor = wrapper.model.data_preprocessor
+    data_preprocessor.to_rgb = True  # BGR -> RGB
+    assert not wrapper.support_batched_normalize(data_preprocessor)
+
+    frames = get_frames("NCTHW", torch.uint8)
+    expected = (frames.flip(2).float() - data_preprocessor.mean) / data_preprocessor.std
+    torch.testing.assert_close(wrapper.preprocess(frames), expected)
+
+
+def test_forward_is_the_same_with_batched_normalize(build_wrapper):
+    wrapper = build_wrapper(batched_normalize=True).eval()
+    frames = get_frames("NCTHW", torch.uint8)[:, :1]
+    with torch.no_grad():
+        batched = wrapper(frames)
+        wrapper.batched_normalize = False
+        expected = wrapper(frames)
+    torch.testing.assert_close(batched, expected)
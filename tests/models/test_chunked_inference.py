@@ -0,0 +1,52 @@
+import pytest
+import torch
+
+
+def get_frames(shape):
+    torch.manual_seed(1)
+    return torch.randint(0, 256, shape, dtype=torch.uint8)
+
+
+def full_forward(wrapper, frames):
+    use_inference_chunking, wrapper.use_inference_chunking = wrapper.use_inference_chunking, False
+    with torch.no_grad():
+        features = wrapper(frames)
+    wrapper.use_inference_chunking = use_inference_chunking
+    return features
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 5])
+def test_chunks_along_the_batch_match_the_full_forward(build_wrapper, chunk_size):
+    wrapper = build_wrapper(inference_chunk_size=chunk_size).eval()
+    frames = get_frames((5, 1, 3, 4, 32, 32))
+    with torch.no_grad():
+        features = wrapper(frames)
+    torch.testing.assert_close(features, full_forward(wrapper, frames))
+
+
+@pytest.mark.parametrize("chunk_size", [2, 6, 16])
+def test_chunks_along_the_time_match_the_full_forward(build_wrapper, chunk_size):
+    # the chunks are aligned to the tubelets, the last chunk is shorter
+    wrapper = build_wrapper(dict(type="TubeletBackbone"), inference_chunk_size=chunk_size, inference_chunk_dim=2)
+    wrapper.eval()
+    frames = get_frames((2, 1, 3, 14, 16, 16))
+    with torch.no_grad():
+        features = wrapper(frames)
+    assert features.shape == (2, 8, 7)
+    torch.testing.assert_close(features, full_forward(wrapper, frames))
+
+
+def test_memory_budget_on_cpu_uses_one_chunk(build_wrapper):
+    wrapper = build_wrapper(dict(type="TubeletBackbone"), inference_memory_budget=1, inference_chunk_dim=2).eval()
+    frames = get_frames((2, 1, 3, 14, 16, 16))
+    with torch.no_grad():
+        features = wrapper(frames)
+    assert wrapper.auto_chunk_sizes == {(2, 3, 16, 16): 14}
+    torch.testing.assert_close(features, full_forward(wrapper, frames))
+
+
+def test_training_does_not_use_chunks(build_wrapper, monkeypatch):
+    wrapper = build_wrapper(inference_chunk_size=1).train()
+    monkeypatch.setattr(wrapper, "chunked_inference", lambda frames: pytest.fail("chunked in training"))
+    features = wrapper(get_frames((2, 1, 3, 4, 32, 32)))
+    assert features.requires_grad
@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+import torch
+
+from opentad.models.utils.post_processing import DetectionResults
+
+
+def build_results(video_names, labels, seed=0, num_dets=5):
+    rng = np.random.default_rng(seed)
+    results = DetectionResults()
+    for video_name in video_names:
+        starts = rng.uniform(0, 100, num_dets)
+        segments = np.stack([starts, starts + rng.uniform(0, 10, num_dets)], axis=1)
+        results.add(video_name, segments, list(rng.choice(labels, num_dets)), rng.uniform(0, 1, num_dets))
+    return results
+
+
+def assert_same(a, b):
+    assert a.video_names == b.video_names and a.label_names == b.label_names
+    for column_a, column_b in zip(a.columns, b.columns):
+        assert column_a.dtype == column_b.dtype
+        np.testing.assert_array_equal(column_a, column_b)
+
+
+def test_detections_are_rounded_as_the_json_format():
+    results = DetectionResults()
+    results.add("video", np.array([[1.23456, 7.891011]]), ["run"], np.array([0.123456789]))
+    assert results.to_dict() == {"video": [dict(segment=[1.23, 7.89], label="run", score=0.1235)]}
+
+
+@pytest.mark.parametrize("dtype", [torch.float32, torch.float64])
+def test_rounding_matches_the_old_dict_output(dtype):
+    # random predictions, and the decimal ties such as 92.025 on which np.round differs from round for float64
+    generator = torch.Generator().manual_seed(0)
+    segments = torch.rand(4000, 2, generator=generator, dtype=dtype) * 100
+    scores = torch.rand(4000, generator=generator, dtype=dtype)
+    segments[:2000] = (torch.randint(0, 20000, (2000, 2), generator=generator, dtype=dtype) + 0.5) / 100
+    scores[:2000] = (torch.randint(0, 10000, (2000,), generator=generator, dtype=dtype) + 0.5) / 10000
+    labels = ["a"] * len(scores)
+
+    results = DetectionResults()
+    results.add("video", segments, labels, scores)
+    expected = [
+        dict(segment=[round(seg.item(), 2) for seg in segment], label=label, score=round(score.item(), 4))
+        for segment, label, score in zip(segments, labels, scores)
+    ]
+    assert results.to_dict() == {"video": expected}
+
+
+def test_pack_and_from_packed_round_trip():
+    results = build_results([f"video_{i}" for i in range(300)], ["a", "b", "c"])
+    packed = results.pack()
+    assert packed.shape == (len(results), 5) and packed.dtype == np.float64
+
+    unpacked = DetectionResults.from_packed(results.video_names, results.label_names, packed)
+    assert_same(unpacked, results)
+    assert unpacked.to_dict() == results.to_dict()
+
+    # the rounded values are kept exactly, so packing again gives the same array
+    np.testing.assert_array_equal(unpacked.pack(), packed)
+    np.testing.assert_array_equal(unpacked.segments, np.round(unpacked.segments, 2))
+    np.testing.assert_array_equal(unpacked.scores, np.round(unpacked.scores, 4))
+
+
+def test_extend_with_overlapping_videos_and_labels():
+    first = build_results(["v1", "v2"], ["x", "y"], seed=0)
+    second = build_results(["v3", "v2"], ["z", "y", "x"], seed=1)
+    merged = DetectionResults().extend(first).extend(second)
+
+    assert merged.video_names == ["v1", "v2", "v3"]
+    assert merged.label_names == first.label_names + [n for n in second.label_names if n not in first.label_names]
+
+    # the same as merging the JSON format, the detections of v2 are appended after the first ones
+    expected = first.to_dict()
+    for video_name, detections in second.to_dict().items():
+        expected.setdefault(video_name, []).extend(detections)
+    assert merged.to_dict() == expected
+    assert len(merged) == len(first) + len(second)
+
+
+def test_videos_without_detections_are_kept():
+    results = DetectionResults()
+    results.add("empty_1", np.zeros((0, 2)), [], np.zeros(0))
+    results.add("video", np.array([[1.0, 2.0], [3.0, 4.0]]), ["a", "b"], np.array([0.9, 0.8]))
+    results.add("empty_2", np.zeros((0, 2)), [], np.zeros(0))
+
+    assert len(results) == 2
+    assert [inds.tolist() for inds in results.split_by_video()] == [[], [0, 1], []]
+    assert results.to_dict()["empty_1"] == [] and results.to_dict()["empty_2"] == []
+    assert_same(DetectionResults.from_dict(results.to_dict()), results)
+    assert_same(DetectionResults.from_packed(results.video_names, results.label_names, results.pack()), results)
+
+    merged = DetectionResults().extend(results)
+    assert merged.video_names == ["empty_1", "video", "empty_2"]
+
+
+def test_no_detections_at_all():
+    results = DetectionResults()
+    results.add("empty", np.zeros((0, 2)), [], np.zeros(0))
+    assert results.pack().shape == (0, 5)
+    unpacked = DetectionResults.from_packed(["empty"], [], results.pack())
+    assert unpacked.to_dict() == {"empty": []} and len(unpacked) == 0
+
+
+@pytest.mark.parametrize("filename", ["results.json", "results.npz"])
+def test_save_and_load(tmp_path, filename):
+    results = build_results(["v1", "v2", "v3"], ["x", "y"])
+    results.add("empty", np.zeros((0, 2)), [], np.zeros(0))
+    results.save(str(tmp_path / filename))
+    loaded = DetectionResults.load(str(tmp_path / filename))
+    assert loaded.to_dict() == results.to_dict()
+    assert loaded.video_names == results.video_names
@@ -0,0 +1,93 @@
+import os
+
+import pytest
+import torch
+
+from opentad.models.backbones.feature_cache import DiskFeatureCache, get_module_hash
+
+
+def build_module():
+    torch.manual_seed(0)
+    return torch.nn.Sequential(torch.nn.Linear(4, 4), torch.nn.BatchNorm1d(4), torch.nn.Linear(4, 2))
+
+
+def test_put_and_get(tmp_path):
+    cache = DiskFeatureCache(str(tmp_path), "model")
+    value = torch.rand(3, 5)
+    assert cache.get("abcdef") is None
+
+    cache.put("abcdef", value)
+    assert os.path.exists(tmp_path / "model" / "ab" / "abcdef.pt")
+    assert torch.equal(cache.get("abcdef"), value)
+    assert cache.hits == 1 and cache.misses == 1
+
+
+def test_broken_entry_is_a_miss(tmp_path):
+    cache = DiskFeatureCache(str(tmp_path), "model")
+    os.makedirs(tmp_path / "model" / "ab")
+    with open(tmp_path / "model" / "ab" / "abcdef.pt", "wb") as f:
+        f.write(b"broken")
+    assert cache.get("abcdef") is None and cache.misses == 1
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    value = torch.rand(64)
+    probe = DiskFeatureCache(str(tmp_path), "probe")
+    probe.put("aa0", value)
+    entry_size = os.path.getsize(probe.get_path("aa0"))
+
+    cache = DiskFeatureCache(str(tmp_path), "model", max_bytes=int(entry_size * 2.5))
+    cache.put("aa1", value)
+    cache.put("aa2", value)
+    assert cache.get("aa1") is not None  # aa2 is the least recently used now
+    cache.put("aa3", value)
+
+    assert cache.get("aa2") is None
+    assert cache.get("aa1") is not None and cache.get("aa3") is not None
+    assert cache.total_bytes == 2 * entry_size
+
+
+def test_existing_entries_count_towards_the_limit(tmp_path):
+    value = torch.rand(64)
+    cache = DiskFeatureCache(str(tmp_path), "model")
+    for i in range(4):
+        cache.put(f"aa{i}", value)
+    entry_size = os.path.getsize(cache.get_path("aa0"))
+    for i in range(4):  # the order of use is kept by the mtime
+        os.utime(cache.get_path(f"aa{i}"), (i, i))
+
+    cache = DiskFeatureCache(str(tmp_path), "model", max_bytes=entry_size * 3)
+    assert cache.total_bytes == 4 * entry_size
+    cache.put("aa4", value)
+    assert [cache.get(f"aa{i}") is not None for i in range(5)] == [False, False, True, True, True]
+
+
+def test_module_hash_is_stable():
+    assert get_module_hash(build_module(), "cfg") == get_module_hash(build_module(), "cfg")
+    assert get_module_hash(build_module(), "cfg") != get_module_hash(build_module(), "other cfg")
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        lambda m: m[0].weight.neg_(),  # sign flip, the same sum of absolute values
+        lambda m: m[0].weight.copy_(m[0].weight.flip(0)),  # swapped rows, the same sums
+        lambda m: m[0].weight.view(-1)[0].add_(1e-6),  # a tiny change
+        lambda m: m[1].running_mean.add_(1),  # buffers
+    ],
+)
+def test_module_hash_changes_with_the_weights(change):
+    module = build_module()
+    before = get_module_hash(module)
+    with torch.no_grad():
+        change(module)
+    assert get_module_hash(module) != before
+
+
+def test_module_hash_skips_excluded_weights():
+    module = build_module()
+    before = get_module_hash(module, exclude=("2.",))
+    with torch.no_grad():
+        module[2].weight.add_(1)
+    assert get_module_hash(module, exclude=("2.",)) == before
+    assert get_module_hash(module) != get_module_hash(build_module())
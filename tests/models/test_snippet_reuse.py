@@ -0,0 +1,113 @@
+import numpy as np
+import pytest
+import torch
+
+from opentad.datasets.transforms.end_to_end import ClipKey
+
+SNIPPET_POOLING = [dict(type="Reduce", keys=["feats"], ops="b n c t h w -> b c n", reduction="mean")]
+
+
+def get_video(num_snippets=10):
+    # [num_snippets,3,clip_len,H,W] snippets of one video
+    torch.manual_seed(1)
+    return torch.randint(0, 256, (num_snippets, 3, 2, 16, 16), dtype=torch.uint8)
+
+
+def get_windows(video, starts, window_size):
+    frames = torch.stack([video[start : start + window_size] for start in starts])
+    metas = [dict(snippet_keys=[f"video-{i}" for i in range(start, start + window_size)]) for start in starts]
+    return frames, metas
+
+
+def build(build_wrapper, **custom):
+    wrapper = build_wrapper(dict(type="TubeletBackbone"), post_processing_pipeline=SNIPPET_POOLING, **custom)
+    num_inputs = []
+    wrapper.model.backbone.register_forward_hook(lambda module, inputs, output: num_inputs.append(len(inputs[0])))
+    return wrapper.eval(), num_inputs
+
+
+def forward(wrapper, frames, metas):
+    wrapper.set_clip_keys(metas)
+    with torch.no_grad():
+        return wrapper(frames)
+
+
+@pytest.mark.parametrize("batch_windows", [False, True])
+def test_overlapped_windows_match_the_forward_without_reuse(build_wrapper, batch_windows):
+    video = get_video()
+    reference, _ = build(build_wrapper)
+    wrapper, num_inputs = build(build_wrapper, snippet_feature_reuse=True)
+
+    # windows of 6 snippets with a stride of 4, the last window is padded with the last snippet
+    video = torch.cat([video, video[-1:].expand(2, -1, -1, -1, -1)])
+    frames, metas = get_windows(video, [0, 4, 6], window_size=6)
+    metas[2]["snippet_keys"] = [f"video-{min(i, 9)}" for i in range(6, 12)]
+
+    if batch_windows:
+        features = forward(wrapper, frames, metas)
+    else:
+        features = torch.cat([forward(wrapper, frames[i : i + 1], metas[i : i + 1]) for i in range(3)])
+    torch.testing.assert_close(features, forward(reference, frames, metas))
+
+    # each of the 10 snippets is forwarded once
+    assert sum(num_inputs) == 10
+    assert features.shape == (3, 8, 6)
+
+
+def test_buffer_size_is_limited(build_wrapper):
+    video = get_video()
+    reference, _ = build(build_wrapper)
+    wrapper, num_inputs = build(build_wrapper, snippet_feature_reuse=True, snippet_buffer_size=3)
+
+    frames, metas = get_windows(video, [0, 2, 4], window_size=6)
+    for i in range(3):
+        features = forward(wrapper, frames[i : i + 1], metas[i : i + 1])
+        torch.testing.assert_close(features, forward(reference, frames[i : i + 1], metas[i : i + 1]))
+        assert len(wrapper.snippet_buffer) == 3
+
+    # the 3 most recently used snippets are kept: 3, 4, 5 for the second window, 2, 6, 7 for the third one
+    assert num_inputs == [6, 3, 4]
+
+
+def test_buffer_keeps_two_windows_of_copies(build_wrapper):
+    wrapper, num_inputs = build(build_wrapper, snippet_feature_reuse=True)
+    frames, metas = get_windows(get_video(), [0, 3, 6], window_size=3)
+    for i in range(3):
+        forward(wrapper, frames[i : i + 1], metas[i : i + 1])
+    assert list(wrapper.snippet_buffer.keys()) == [f"video-{i}" for i in range(3, 9)]
+
+    # each snippet owns its memory instead of keeping the output of the whole batch alive
+    storages = {feature.untyped_storage().data_ptr() for feature in wrapper.snippet_buffer.values()}
+    assert len(storages) == 6
+    assert all(feature.untyped_storage().nbytes() == feature.nbytes for feature in wrapper.snippet_buffer.values())
+
+
+def test_training_clears_the_buffer(build_wrapper):
+    wrapper, num_inputs = build(build_wrapper, snippet_feature_reuse=True)
+    frames, metas = get_windows(get_video(), [0], window_size=6)
+    forward(wrapper, frames, metas)
+    assert len(wrapper.snippet_buffer) == 6
+
+    wrapper.train()
+    wrapper.set_clip_keys(metas)
+    wrapper(frames)
+    assert len(wrapper.snippet_buffer) == 0
+
+    wrapper.eval()
+    forward(wrapper, frames, metas)
+    assert num_inputs == [6, 6, 6]
+
+
+def test_clip_key_gives_the_same_keys_to_the_same_snippets():
+    frame_inds = np.arange(40).reshape(10, 4)  # 10 snippets of 4 frames
+    transform = ClipKey(snippet_keys=True)
+    first = transform(dict(video_name="video", frame_inds=frame_inds[0:6], flip=False))
+    second = transform(dict(video_name="video", frame_inds=frame_inds[4:10], flip=False))
+    flipped = transform(dict(video_name="video", frame_inds=frame_inds[4:10], flip=True))
+    other = transform(dict(video_name="other", frame_inds=frame_inds[4:10], flip=False))
+
+    assert first["snippet_keys"][4:] == second["snippet_keys"][:2]
+    assert len(set(first["snippet_keys"] + second["snippet_keys"])) == 10
+    assert first["clip_key"] != second["clip_key"]
+    assert not set(flipped["snippet_keys"]) & set(second["snippet_keys"])
+    assert not set(other["snippet_keys"]) & set(second["snippet_keys"])
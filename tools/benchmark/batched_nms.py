@@ -0,0 +1,74 @@
+import os
+import sys
+
+sys.dont_write_bytecode = True
+path = os.path.join(os.path.dirname(__file__), "../..")
+if path not in sys.path:
+    sys.path.insert(0, path)
+
+import argparse
+import time
+import torch
+import nms_1d_cpu
+from opentad.models.utils.post_processing.nms import nms as nms_module
+
+
+def build_predictions(args, generator):
+    # dense multiclass predictions of one video, such as ActionFormer on ActivityNet / FineAction
+    centers = torch.rand(args.num_segs, generator=generator) * 100
+    lengths = torch.rand(args.num_segs, generator=generator) * 20 + 0.1
+    segs = torch.stack([centers - lengths / 2, centers + lengths / 2], dim=1)
+    scores = torch.rand(args.num_segs, generator=generator)
+    cls_idxs = torch.randint(0, args.num_classes, (args.num_segs,), generator=generator)
+    return segs, scores, cls_idxs
+
+
+def run(videos, nms_cfg, batched):
+    # temporarily hide the native batched kernel to run the per-class python loop
+    batched_fn = nms_1d_cpu.batched_nms
+    if not batched:
+        del nms_1d_cpu.batched_nms
+    try:
+        tic = time.time()
+        results = [nms_module.batched_nms(*video, **nms_cfg) for video in videos]
+        return results, time.time() - tic
+    finally:
+        nms_1d_cpu.batched_nms = batched_fn
+
+
+def main(args):
+    generator = torch.Generator().manual_seed(args.seed)
+    videos = [build_predictions(args, generator) for _ in range(args.num_videos)]
+
+    for use_soft_nms in [True, False]:
+        nms_cfg = dict(
+            iou_threshold=0.5,
+            min_score=0.001,
+            max_seg_num=100,
+            use_soft_nms=use_soft_nms,
+            multiclass=True,
+            sigma=0.5,
+            method=2 if use_soft_nms else 0,
+        )
+        loop_results, loop_time = run(videos, nms_cfg, batched=False)
+        batched_results, batched_time = run(videos, nms_cfg, batched=True)
+
+        # the results should be identical
+        for loop_result, batched_result in zip(loop_results, batched_results):
+            for a, b in zip(loop_result, batched_result):
+                assert torch.equal(a, b)
+
+        name = "soft-nms" if use_soft_nms else "nms"
+        print(f"{name}: {args.num_videos} videos x {args.num_segs} segs x {args.num_classes} classes, identical")
+        print(f"  loop: {loop_time:.3f}s, batched: {batched_time:.3f}s, speedup: {loop_time / batched_time:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the multiclass batched_nms")
+    parser.add_argument("--num_videos", type=int, default=100)
+    parser.add_argument("--num_segs", type=int, default=2000, help="number of segments per video")
+    parser.add_argument("--num_classes", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    main(args)
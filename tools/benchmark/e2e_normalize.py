@@ -0,0 +1,74 @@
+import os
+import sys
+
+sys.dont_write_bytecode = True
+path = os.path.join(os.path.dirname(__file__), "../..")
+if path not in sys.path:
+    sys.path.insert(0, path)
+
+import argparse
+import time
+import torch
+from mmaction.models import ActionDataPreprocessor
+
+
+def timeit(fn, device, repeat):
+    fn()  # warm up
+    if device.type == "cuda":
+        torch.cuda.synchronize()
+    tic = time.time()
+    for _ in range(repeat):
+        fn()
+    if device.type == "cuda":
+        torch.cuda.synchronize()
+    return (time.time() - tic) / repeat
+
+
+def main(args):
+    device = torch.device(args.device)
+    data_preprocessor = ActionDataPreprocessor(
+        mean=[123.675, 116.28, 103.53],
+        std=[58.395, 57.12, 57.375],
+        format_shape="NCTHW",
+    ).to(device)
+
+    # [B,N,C,T,H,W] uint8 frames in pinned memory, as given by the DataLoader
+    shape = (args.batch_size, args.num_clips, 3, args.clip_len, args.img_size, args.img_size)
+    frames_uint8 = torch.randint(0, 256, shape, dtype=torch.uint8)
+    frames_float = frames_uint8.float()
+    if device.type == "cuda":
+        frames_uint8 = frames_uint8.pin_memory()
+        frames_float = frames_float.pin_memory()
+
+    def per_sample_float():  # float32 transfer, then the per-sample data_preprocessor
+        frames = frames_float.to(device, non_blocking=True)
+        frames, _ = data_preprocessor.preprocess([frame for frame in frames], data_samples=None, training=False)
+        return frames
+
+    def batched_uint8():  # uint8 transfer, then one batched normalization on the device
+        frames = frames_uint8.to(device, non_blocking=True).float()
+        return (frames - data_preprocessor.mean) / data_preprocessor.std
+
+    # the results should be identical
+    assert torch.allclose(per_sample_float(), batched_uint8(), atol=1e-5)
+
+    per_sample_time = timeit(per_sample_float, device, args.repeat)
+    batched_time = timeit(batched_uint8, device, args.repeat)
+    num_frames = args.batch_size * args.num_clips * args.clip_len
+    print(f"batch {tuple(shape)}: {frames_uint8.numel() / 1024**2:.1f}MB uint8, {num_frames} frames")
+    print(f"float32 + per-sample normalize: {per_sample_time * 1000:.2f}ms, {num_frames / per_sample_time:.0f} fps")
+    print(f"uint8 + batched normalize: {batched_time * 1000:.2f}ms, {num_frames / batched_time:.0f} fps")
+    print(f"speedup: {per_sample_time / batched_time:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the input transfer and normalization of BackboneWrapper")
+    parser.add_argument("--device", type=str, default="cuda" if torch.cuda.is_available() else "cpu")
+    parser.add_argument("--batch_size", type=int, default=2)
+    parser.add_argument("--num_clips", type=int, default=128, help="number of snippets in each video / window")
+    parser.add_argument("--clip_len", type=int, default=16)
+    parser.add_argument("--img_size", type=int, default=160)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    main(args)
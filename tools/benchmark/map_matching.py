@@ -0,0 +1,145 @@
+import os
+import sys
+
+sys.dont_write_bytecode = True
+path = os.path.join(os.path.dirname(__file__), "../..")
+if path not in sys.path:
+    sys.path.insert(0, path)
+
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from opentad.evaluations.mAP import compute_average_precision_detection, interpolated_prec_rec, segment_iou
+
+
+def build_class_data(args, rng):
+    # the ground truths and predictions of one class, with the segments rounded as in the result file
+    gt_list, pred_list = [], []
+    for i in range(args.num_videos):
+        duration = rng.uniform(60, 600)
+        num_gts = int(rng.integers(1, args.max_gts + 1))
+        gt_start = rng.uniform(0, duration, size=num_gts)
+        gt_end = gt_start + rng.uniform(1, 60, size=num_gts)
+        gt_list.append(pd.DataFrame({"video-id": f"video_{i}", "t-start": gt_start, "t-end": gt_end}))
+
+        # half of the predictions are jittered ground truths, the others are random
+        num_preds = args.num_preds
+        ref = rng.integers(0, num_gts, size=num_preds // 2)
+        jitter = rng.normal(0, 3, size=(num_preds // 2, 2))
+        random_start = rng.uniform(0, duration, num_preds - len(ref))
+        random_end = random_start + rng.uniform(1, 60, num_preds - len(ref))
+        pred_start = np.concatenate([gt_start[ref] + jitter[:, 0], random_start])
+        pred_end = np.concatenate([gt_end[ref] + jitter[:, 1], random_end])
+        pred_list.append(
+            pd.DataFrame(
+                {
+                    "video-id": f"video_{i}",
+                    "t-start": np.round(pred_start, 2),
+                    "t-end": np.round(np.maximum(pred_end, pred_start + 0.1), 2),
+                    "score": np.round(rng.uniform(0, 1, size=num_preds), 4),  # rounded scores have ties
+                }
+            )
+        )
+
+    # predictions of videos without ground truth are false positives
+    pred_list.append(pd.DataFrame({"video-id": "video_empty", "t-start": [1.0], "t-end": [2.0], "score": [0.5]}))
+    ground_truth = pd.concat(gt_list).reset_index(drop=True)
+    prediction = pd.concat(pred_list).reset_index(drop=True)
+    return ground_truth, prediction
+
+
+def compute_average_precision_detection_loop(
+    ground_truth,
+    prediction,
+    tiou_thresholds=np.linspace(0.5, 0.95, 10),
+):
+    """The per-prediction loop of the original compute_average_precision_detection, the reference of the
+    vectorized matching."""
+    npos = float(len(ground_truth))
+    lock_gt = np.ones((len(tiou_thresholds), len(ground_truth))) * -1
+    # Sort predictions by decreasing score order.
+    sort_idx = prediction["score"].values.argsort()[::-1]
+    prediction = prediction.loc[sort_idx].reset_index(drop=True)
+
+    # Initialize true positive and false positive vectors.
+    tp = np.zeros((len(tiou_thresholds), len(prediction)))
+    fp = np.zeros((len(tiou_thresholds), len(prediction)))
+
+    # Adaptation to query faster
+    ground_truth_gbvn = ground_truth.groupby("video-id")
+
+    # Assigning true positive to truly grount truth instances.
+    for idx, this_pred in prediction.iterrows():
+        try:
+            # Check if there is at least one ground truth in the video associated.
+            ground_truth_videoid = ground_truth_gbvn.get_group(this_pred["video-id"])
+        except Exception as e:
+            fp[:, idx] = 1
+            continue
+
+        this_gt = ground_truth_videoid.reset_index()
+        tiou_arr = segment_iou(this_pred[["t-start", "t-end"]].values, this_gt[["t-start", "t-end"]].values)
+        # We would like to retrieve the predictions with highest tiou score.
+        tiou_sorted_idx = tiou_arr.argsort()[::-1]
+        for tidx, tiou_thr in enumerate(tiou_thresholds):
+            for jdx in tiou_sorted_idx:
+                if tiou_arr[jdx] < tiou_thr:
+                    fp[tidx, idx] = 1
+                    break
+                if lock_gt[tidx, this_gt.loc[jdx]["index"]] >= 0:
+                    continue
+                # Assign as true positive after the filters above.
+                tp[tidx, idx] = 1
+                lock_gt[tidx, this_gt.loc[jdx]["index"]] = idx
+                break
+
+            if fp[tidx, idx] == 0 and tp[tidx, idx] == 0:
+                fp[tidx, idx] = 1
+
+    ap = np.zeros(len(tiou_thresholds))
+
+    for tidx in range(len(tiou_thresholds)):
+        # Computing prec-rec
+        this_tp = np.cumsum(tp[tidx, :]).astype(float)
+        this_fp = np.cumsum(fp[tidx, :]).astype(float)
+        rec = this_tp / npos
+        prec = this_tp / (this_tp + this_fp)
+        ap[tidx] = interpolated_prec_rec(prec, rec)
+    return ap
+
+
+def main(args):
+    rng = np.random.default_rng(args.seed)
+    tiou_thresholds = np.linspace(0.5, 0.95, 10)
+    data = [build_class_data(args, rng) for _ in range(args.num_classes)]
+
+    tic = time.time()
+    loop_ap = [compute_average_precision_detection_loop(gt, pred, tiou_thresholds) for gt, pred in data]
+    loop_time = time.time() - tic
+
+    tic = time.time()
+    vectorized_ap = [compute_average_precision_detection(gt, pred, tiou_thresholds) for gt, pred in data]
+    vectorized_time = time.time() - tic
+
+    # the average precisions should be the same
+    max_diff = np.abs(np.array(loop_ap) - np.array(vectorized_ap)).max()
+    assert max_diff < 1e-6, f"the average precisions differ by {max_diff}"
+
+    num_gts = sum(len(gt) for gt, _ in data)
+    num_preds = sum(len(pred) for _, pred in data)
+    print(f"{args.num_classes} classes, {num_gts} ground truths, {num_preds} predictions, max AP diff {max_diff:.2e}")
+    print(f"mAP: {np.mean(vectorized_ap) * 100:.2f}%")
+    print(f"loop: {loop_time:.3f}s, vectorized: {vectorized_time:.3f}s, speedup: {loop_time / vectorized_time:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the matching engine of the mAP evaluation")
+    parser.add_argument("--num_classes", type=int, default=5)
+    parser.add_argument("--num_videos", type=int, default=50, help="number of videos of each class")
+    parser.add_argument("--max_gts", type=int, default=10, help="maximum number of ground truths in each video")
+    parser.add_argument("--num_preds", type=int, default=100, help="number of predictions in each video")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    main(args)
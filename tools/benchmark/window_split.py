@@ -0,0 +1,141 @@
+import os
+import sys
+
+sys.dont_write_bytecode = True
+path = os.path.join(os.path.dirname(__file__), "../..")
+if path not in sys.path:
+    sys.path.insert(0, path)
+
+import argparse
+import time
+import numpy as np
+from opentad.datasets.base import SlidingWindowDataset
+from opentad.datasets.base.sliding_dataset import compute_gt_completeness
+
+
+def split_video_to_windows_loop(dataset, video_name, video_info, video_anno):
+    """The previous window-by-window implementation of SlidingWindowDataset.split_video_to_windows."""
+    # need: video frame, video duration, video fps
+    if dataset.fps > 0:
+        num_frames = int(video_info["duration"] * dataset.fps)
+    else:
+        num_frames = video_info["frame"]
+
+    video_snippet_centers = np.arange(0, num_frames, dataset.snippet_stride)
+    snippet_num = len(video_snippet_centers)
+
+    data_list = []
+    last_window = False  # whether it is the last window
+
+    for idx in range(max(1, snippet_num // dataset.window_stride)):  # at least one window
+        window_start = idx * dataset.window_stride
+        window_end = window_start + dataset.window_size
+
+        if window_end > snippet_num:  # this is the last window
+            window_end = snippet_num
+            window_start = max(0, window_end - dataset.window_size)
+            last_window = True
+
+        window_snippet_centers = video_snippet_centers[window_start:window_end]
+        window_start_frame = window_snippet_centers[0]
+        window_end_frame = window_snippet_centers[-1]
+
+        if (video_anno != {}) and (dataset.ioa_thresh > 0):
+            gt_segments = video_anno["gt_segments"]
+            gt_labels = video_anno["gt_labels"]
+            anchor = np.array([window_start_frame, window_end_frame])
+
+            # truncate the gt segments inside the window and compute the completeness
+            gt_completeness, truncated_gt = compute_gt_completeness(gt_segments, anchor)
+            valid_idx = gt_completeness > dataset.ioa_thresh
+
+            # only append window who has gt
+            if np.sum(valid_idx) > 0:
+                window_anno = dict(
+                    gt_segments=truncated_gt[valid_idx],
+                    gt_labels=gt_labels[valid_idx],
+                )
+                data_list.append(
+                    [
+                        video_name,
+                        video_info,
+                        window_anno,
+                        window_snippet_centers,
+                    ]
+                )
+        else:
+            data_list.append(
+                [
+                    video_name,
+                    video_info,
+                    video_anno,
+                    window_snippet_centers,
+                ]
+            )
+
+        if last_window:  # the last window
+            break
+
+    return data_list
+
+
+def build_videos(args):
+    rng = np.random.default_rng(args.seed)
+    videos = []
+    for i in range(args.num_videos):  # long videos with many gts, such as Ego4D / EPIC-KITCHENS
+        num_frames = int(rng.integers(args.min_minutes, args.max_minutes) * 60 * 30)
+        gt_start = rng.uniform(0, num_frames, size=args.num_gts)
+        gt_end = gt_start + rng.uniform(10, 900, size=args.num_gts)
+        video_anno = dict(
+            gt_segments=np.stack([gt_start, gt_end], axis=1).astype(np.float32),
+            gt_labels=rng.integers(0, 100, size=args.num_gts).astype(np.int32),
+        )
+        videos.append((f"video_{i}", dict(frame=num_frames), video_anno))
+    return videos
+
+
+def main(args):
+    # only the window settings are needed for splitting, so we skip the annotation loading
+    dataset = SlidingWindowDataset.__new__(SlidingWindowDataset)
+    dataset.fps = -1
+    dataset.snippet_stride = args.snippet_stride
+    dataset.window_size = args.window_size
+    dataset.window_stride = int(args.window_size * (1 - args.window_overlap_ratio))
+    dataset.ioa_thresh = args.ioa_thresh
+
+    videos = build_videos(args)
+
+    tic = time.time()
+    loop_list = [data for video in videos for data in split_video_to_windows_loop(dataset, *video)]
+    loop_time = time.time() - tic
+
+    tic = time.time()
+    batched_list = [data for video in videos for data in dataset.split_video_to_windows(*video)]
+    batched_time = time.time() - tic
+
+    # the data list should be identical
+    assert len(loop_list) == len(batched_list)
+    for a, b in zip(loop_list, batched_list):
+        assert a[0] == b[0] and np.array_equal(a[3], b[3])
+        assert a[2]["gt_segments"].dtype == b[2]["gt_segments"].dtype
+        assert np.array_equal(a[2]["gt_segments"], b[2]["gt_segments"])
+        assert np.array_equal(a[2]["gt_labels"], b[2]["gt_labels"])
+
+    print(f"{len(videos)} videos, {len(batched_list)} windows, the data lists are identical.")
+    print(f"loop: {loop_time:.3f}s, batched: {batched_time:.3f}s, speedup: {loop_time / batched_time:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the window splitting of SlidingWindowDataset")
+    parser.add_argument("--num_videos", type=int, default=20)
+    parser.add_argument("--num_gts", type=int, default=2000, help="number of gts per video")
+    parser.add_argument("--min_minutes", type=int, default=60)
+    parser.add_argument("--max_minutes", type=int, default=120)
+    parser.add_argument("--snippet_stride", type=int, default=16)
+    parser.add_argument("--window_size", type=int, default=256)
+    parser.add_argument("--window_overlap_ratio", type=float, default=0.25)
+    parser.add_argument("--ioa_thresh", type=float, default=0.75)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    main(args)
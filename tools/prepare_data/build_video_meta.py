@@ -0,0 +1,62 @@
+import argparse
+import json
+import os
+import tqdm
+from multiprocessing import Pool
+
+
+def read_video_meta(job):
+    video_name, video_path = job
+    import decord
+
+    reader = decord.VideoReader(video_path, num_threads=1)
+    height, width = reader[0].shape[:2]
+    frames = len(reader)
+    fps = float(reader.get_avg_fps())
+    return video_name, dict(
+        frames=frames,
+        fps=fps,
+        duration=frames / fps,
+        height=height,
+        width=width,
+        keyframes=[int(i) for i in reader.get_key_indices()],
+    )
+
+
+def main(args):
+    anno_database = json.load(open(args.anno_file))["database"]
+
+    jobs = []
+    missing_list = []
+    for video_name in anno_database.keys():
+        video_path = os.path.join(args.video_dir, f"{args.prefix}{video_name}.{args.format}")
+        if os.path.exists(video_path):
+            jobs.append((video_name, video_path))
+        else:
+            missing_list.append(video_name)
+
+    videos = {}
+    with Pool(args.workers) as pool:
+        for video_name, video_meta in tqdm.tqdm(pool.imap_unordered(read_video_meta, jobs), total=len(jobs)):
+            videos[video_name] = video_meta
+
+    # saved next to the annotation by default
+    out_file = args.out_file or os.path.join(os.path.dirname(args.anno_file), "video_meta.json")
+    with open(out_file, "w") as f:
+        json.dump(dict(videos=dict(sorted(videos.items()))), f)
+
+    print(f"Total {len(anno_database.keys())} videos in dataset, missing {len(missing_list)} videos.")
+    print(f"Video metadata index has been saved in {out_file}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the video metadata index for end-to-end datasets")
+    parser.add_argument("anno_file", metavar="FILE", type=str, help="path to annotation")
+    parser.add_argument("video_dir", metavar="FILE", type=str, help="path to video folder")
+    parser.add_argument("--out_file", type=str, default=None, help="default is video_meta.json next to annotation")
+    parser.add_argument("--prefix", type=str, default="")
+    parser.add_argument("--format", type=str, default="mp4")
+    parser.add_argument("--workers", type=int, default=8, help="number of videos read in parallel")
+    args = parser.parse_args()
+
+    main(args)
@@ -17,7 +17,7 @@ from opentad.models import build_detector
 from opentad.datasets import build_dataset, build_dataloader
 from opentad.utils import update_workdir, set_seed, create_folder, setup_logger
 from opentad.datasets.base import SlidingWindowDataset
-from opentad.models.utils.post_processing import build_classifier
+from opentad.models.utils.post_processing import build_classifier, DetectionResults
 from opentad.cores.test_engine import gather_ddp_results
 
 
@@ -34,6 +34,27 @@ def parse_args():
     return args
 
 
+def inference(model, test_loader, infer_cfg, post_cfg, ext_cls, use_amp, args):
+    """Forward the whole test set, and return the gathered detections in the JSON format."""
+    result_dict = DetectionResults()
+    for data_dict in tqdm.tqdm(test_loader, disable=(args.rank != 0)):
+        with torch.cuda.amp.autocast(dtype=torch.float16, enabled=use_amp):
+            with torch.no_grad():
+                results = model(
+                    **data_dict,
+                    return_loss=False,
+                    infer_cfg=infer_cfg,
+                    post_cfg=post_cfg,
+                    ext_cls=ext_cls,
+                )
+
+        # update the result dict
+        result_dict.extend(results)
+
+    result_dict = gather_ddp_results(args.world_size, result_dict, post_cfg)
+    return result_dict.to_dict()
+
+
 def main():
     args = parse_args()
 
@@ -131,52 +152,16 @@ def main():
     model.eval()
 
     # mAP model forward
-    map_result_dict = {}
     mAP_post_processing_cfg = cfg.post_processing.copy()
     mAP_post_processing_cfg.nms.sigma = args.map_sigma
-    for data_dict in tqdm.tqdm(test_loader, disable=(args.rank != 0)):
-        with torch.cuda.amp.autocast(dtype=torch.float16, enabled=use_amp):
-            with torch.no_grad():
-                results = model(
-                    **data_dict,
-                    return_loss=False,
-                    infer_cfg=cfg.inference,
-                    post_cfg=mAP_post_processing_cfg,
-                    ext_cls=external_cls,
-                )
-
-        # update the result dict
-        for k, v in results.items():
-            if k in map_result_dict.keys():
-                map_result_dict[k].extend(v)
-            else:
-                map_result_dict[k] = v
-
-    map_result_dict = gather_ddp_results(args.world_size, map_result_dict, mAP_post_processing_cfg)
+    map_result_dict = inference(model, test_loader, cfg.inference, mAP_post_processing_cfg, external_cls, use_amp, args)
 
     # recall model forward
-    recall_result_dict = {}
     recall_post_processing_cfg = cfg.post_processing.copy()
     recall_post_processing_cfg.nms.sigma = args.recall_sigma
-    for data_dict in tqdm.tqdm(test_loader, disable=(args.rank != 0)):
-        with torch.cuda.amp.autocast(dtype=torch.float16, enabled=use_amp):
-            with torch.no_grad():
-                results = model(
-                    **data_dict,
-                    return_loss=False,
-                    infer_cfg=cfg.inference,
-                    post_cfg=recall_post_processing_cfg,
-                    ext_cls=external_cls,
-                )
-
-        # update the result dict
-        for k, v in results.items():
-            if k in recall_result_dict.keys():
-                recall_result_dict[k].extend(v)
-            else:
-                recall_result_dict[k] = v
-
-    recall_result_dict = gather_ddp_results(args.world_size, recall_result_dict, recall_post_processing_cfg)
+    recall_result_dict = inference(
+        model, test_loader, cfg.inference, recall_post_processing_cfg, external_cls, use_amp, args
+    )
 
     if args.rank == 0:
         result_eval = dict(
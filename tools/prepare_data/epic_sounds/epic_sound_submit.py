@@ -15,7 +15,7 @@ from torch.nn.parallel import DistributedDataParallel
 from mmengine.config import Config
 from opentad.cores.test_engine import gather_ddp_results
 from opentad.models import build_detector
-from opentad.models.utils.post_processing import build_classifier
+from opentad.models.utils.post_processing import build_classifier, DetectionResults
 from opentad.datasets import build_dataset, build_dataloader
 from opentad.utils import update_workdir, set_seed, create_folder, setup_logger
 from opentad.datasets.base import SlidingWindowDataset
@@ -33,6 +33,43 @@ def parse_args():
     return args
 
 
+def inference(model, test_loader, infer_cfg, post_cfg, ext_cls, use_amp, args):
+    """Forward the whole test set, and return the gathered detections in the JSON format."""
+    result_dict = DetectionResults()
+    for data_dict in tqdm.tqdm(test_loader, disable=(args.rank != 0)):
+        with torch.cuda.amp.autocast(dtype=torch.float16, enabled=use_amp):
+            with torch.no_grad():
+                results = model(
+                    **data_dict,
+                    return_loss=False,
+                    infer_cfg=infer_cfg,
+                    post_cfg=post_cfg,
+                    ext_cls=ext_cls,
+                )
+
+        # update the result dict
+        result_dict.extend(results)
+
+    result_dict = gather_ddp_results(args.world_size, result_dict, post_cfg)
+    return result_dict.to_dict()
+
+
+def convert_to_epic(result_dict):
+    result_dict_converted = {}
+    for k, v in result_dict.items():
+        tmp_result = []
+        for result in v:
+            tmp_result.append(
+                dict(
+                    interaction=int(result["label"].replace("id_", "")),
+                    score=result["score"],
+                    segment=result["segment"],
+                )
+            )
+        result_dict_converted[k] = tmp_result
+    return result_dict_converted
+
+
 def main():
     args = parse_args()
 
@@ -126,43 +163,13 @@ def main():
     model.eval()
 
     # mAP model forward
-    result_dict = {}
     post_processing_cfg = cfg.post_processing.copy()
     post_processing_cfg.pre_nms_topk = args.pre_nms_topk
     post_processing_cfg.nms.max_seg_num = args.max_seg_num
-    for data_dict in tqdm.tqdm(test_loader, disable=(args.rank != 0)):
-        with torch.cuda.amp.autocast(dtype=torch.float16, enabled=use_amp):
-            with torch.no_grad():
-                results = model(
-                    **data_dict,
-                    return_loss=False,
-                    infer_cfg=cfg.inference,
-                    post_cfg=post_processing_cfg,
-                    ext_cls=external_cls,
-                )
-
-        # update the result dict
-        for k, v in results.items():
-            if k in result_dict.keys():
-                result_dict[k].extend(v)
-            else:
-                result_dict[k] = v
-
-    result_dict = gather_ddp_results(args.world_size, result_dict, post_processing_cfg)
+    result_dict = inference(model, test_loader, cfg.inference, post_processing_cfg, external_cls, use_amp, args)
 
     # convert the output to epic format
-    result_dict_converted = {}
-    for k, v in result_dict.items():
-        tmp_result = []
-        for result in v:
-            tmp_result.append(
-                dict(
-                    interaction=int(result["label"].replace("id_", "")),
-                    score=result["score"],
-                    segment=result["segment"],
-                )
-            )
-        result_dict_converted[k] = tmp_result
+    result_dict_converted = convert_to_epic(result_dict)
 
     if args.rank == 0:
         result_dict_submit = dict(
@@ -0,0 +1,59 @@
+import os
+import sys
+
+path = os.path.join(os.path.dirname(__file__), "../..")
+if path not in sys.path:
+    sys.path.insert(0, path)
+
+import argparse
+import json
+import torch
+import tqdm
+
+from opentad.datasets.transforms.loading import LoadFeats
+from opentad.datasets.transforms.shard_store import FeatureShardWriter
+
+
+def main(args):
+    loader = LoadFeats(feat_format=args.ext)
+
+    # collect the feature files to pack
+    suffix = f"{args.suffix}.{args.ext}"
+    if args.anno_file is not None:
+        anno_database = json.load(open(args.anno_file))["database"]
+        names = [f"{args.prefix}{video_name}{args.suffix}" for video_name in anno_database.keys()]
+        names = [name for name in names if os.path.exists(os.path.join(args.data_dir, f"{name}.{args.ext}"))]
+    else:
+        names = [
+            entry.name[: -len(f".{args.ext}")]
+            for entry in os.scandir(args.data_dir)
+            if entry.name.startswith(args.prefix) and entry.name.endswith(suffix)
+        ]
+    names = sorted(names)
+
+    # the key inside the store keeps the prefix and suffix, so LoadFeats can use the same config
+    encoding = None if args.encoding == "none" else args.encoding
+    shard_bytes = int(args.shard_size * 1024**3)
+    with FeatureShardWriter(args.out_dir, shard_bytes=shard_bytes, encoding=encoding) as writer:
+        for name in tqdm.tqdm(names):
+            feats = loader.load_single_feat(os.path.join(args.data_dir, f"{name}.{args.ext}"), args.ext)
+            if isinstance(feats, torch.Tensor):
+                feats = feats.numpy()
+            writer.add(name, feats)
+
+    print(f"Packed {len(names)} features into {len(writer.shards)} shards, saved in {args.out_dir}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pack per-video features into a shard store")
+    parser.add_argument("data_dir", metavar="FILE", type=str, help="path to feature folder")
+    parser.add_argument("out_dir", metavar="FILE", type=str, help="path to the output shard store")
+    parser.add_argument("--anno_file", type=str, default=None, help="only pack the videos in the annotation")
+    parser.add_argument("--prefix", type=str, default="")
+    parser.add_argument("--suffix", type=str, default="")
+    parser.add_argument("--ext", type=str, default="npy", help="npy, npz, pt, csv, or pkl")
+    parser.add_argument("--shard_size", type=float, default=4, help="size of each shard in GB")
+    parser.add_argument("--encoding", type=str, default="none", choices=["none", "float16", "int8"])
+    args = parser.parse_args()
+
+    main(args)
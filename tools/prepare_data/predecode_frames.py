@@ -0,0 +1,121 @@
+import os
+import sys
+
+path = os.path.join(os.path.dirname(__file__), "../..")
+if path not in sys.path:
+    sys.path.insert(0, path)
+
+import argparse
+import json
+import numpy as np
+import tqdm
+from multiprocessing import Pool
+
+from opentad.datasets.transforms.frame_store import FRAME_STORE_VERSION, INDEX_FILENAME
+
+
+def get_resized_shape(height, width, short_side):
+    if short_side <= 0:
+        return height, width
+    scale = short_side / min(height, width)
+    # keep the size even, which is friendly to the following crops
+    return int(round(height * scale / 2) * 2), int(round(width * scale / 2) * 2)
+
+
+def decode_video(job):
+    video_key, video_path, out_dir, short_side, frame_stride, chunk_size = job
+    import decord
+
+    # read the original shape, then reopen the video with the decoder-side resizing
+    reader = decord.VideoReader(video_path, num_threads=1)
+    total_frames = len(reader)
+    avg_fps = float(reader.get_avg_fps())
+    height, width = reader[0].shape[:2]
+    height, width = get_resized_shape(height, width, short_side)
+    reader = decord.VideoReader(video_path, width=width, height=height, num_threads=1)
+
+    frame_inds = np.arange(0, total_frames, frame_stride)
+    out_path = os.path.join(out_dir, f"{video_key}.npy")
+    tmp_path = out_path + ".tmp.npy"
+    frames = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.uint8, shape=(len(frame_inds), height, width, 3))
+    for start in range(0, len(frame_inds), chunk_size):
+        chunk_inds = frame_inds[start : start + chunk_size]
+        frames[start : start + len(chunk_inds)] = reader.get_batch(chunk_inds.tolist()).asnumpy()
+    frames.flush()
+    del frames
+    os.replace(tmp_path, out_path)
+
+    return video_key, dict(
+        total_frames=total_frames,
+        avg_fps=avg_fps,
+        num_stored_frames=len(frame_inds),
+        height=height,
+        width=width,
+    )
+
+
+def main(args):
+    # collect the videos to decode
+    if args.anno_file is not None:
+        anno_database = json.load(open(args.anno_file))["database"]
+        video_keys = [f"{args.prefix}{video_name}" for video_name in anno_database.keys()]
+    else:
+        video_keys = [
+            entry.name[: -len(f".{args.format}")]
+            for entry in os.scandir(args.video_dir)
+            if entry.name.startswith(args.prefix) and entry.name.endswith(f".{args.format}")
+        ]
+    video_keys = sorted(set(video_keys))
+
+    # resume from the existing store
+    os.makedirs(args.out_dir, exist_ok=True)
+    index_path = os.path.join(args.out_dir, INDEX_FILENAME)
+    videos = {}
+    if os.path.exists(index_path):
+        index = json.load(open(index_path))
+        assert index["frame_stride"] == args.frame_stride, "frame_stride mismatches the existing store"
+        assert index["short_side"] == args.short_side, "short_side mismatches the existing store"
+        videos = index["videos"]
+
+    jobs = []
+    missing = []
+    for video_key in video_keys:
+        video_path = os.path.join(args.video_dir, f"{video_key}.{args.format}")
+        if video_key in videos:
+            continue
+        if not os.path.exists(video_path):
+            missing.append(video_key)
+            continue
+        jobs.append((video_key, video_path, args.out_dir, args.short_side, args.frame_stride, args.chunk_size))
+
+    with Pool(args.workers) as pool:
+        for video_key, video_meta in tqdm.tqdm(pool.imap_unordered(decode_video, jobs), total=len(jobs)):
+            videos[video_key] = video_meta
+
+    index = dict(
+        version=FRAME_STORE_VERSION,
+        frame_stride=args.frame_stride,
+        short_side=args.short_side,
+        videos=videos,
+    )
+    with open(index_path, "w") as f:
+        json.dump(index, f)
+
+    print(f"Decoded {len(jobs)} videos, total {len(videos)} videos in the store, missing {len(missing)} videos.")
+    print(f"Frame store is saved in {args.out_dir}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-decode the videos into a uint8 memory-mapped frame store")
+    parser.add_argument("video_dir", metavar="FILE", type=str, help="path to video folder")
+    parser.add_argument("out_dir", metavar="FILE", type=str, help="path to the output frame store")
+    parser.add_argument("--anno_file", type=str, default=None, help="only decode the videos in the annotation")
+    parser.add_argument("--prefix", type=str, default="")
+    parser.add_argument("--format", type=str, default="mp4")
+    parser.add_argument("--short_side", type=int, default=256, help="resize the short side, -1 to keep the size")
+    parser.add_argument("--frame_stride", type=int, default=1, help="keep every frame_stride-th frame")
+    parser.add_argument("--chunk_size", type=int, default=256, help="number of frames decoded at once")
+    parser.add_argument("--workers", type=int, default=8, help="number of videos decoded in parallel")
+    args = parser.parse_args()
+
+    main(args)
@@ -173,8 +173,16 @@ def main():
     logger.info("Training Starts...\n")
     val_loss_best = 1e6
     val_start_epoch = cfg.workflow.get("val_start_epoch", 0)
+    if hasattr(train_loader.batch_sampler, "set_epoch"):  # custom batch sampler, e.g. LengthBucketBatchSampler
+        train_loader.batch_sampler.set_epoch(resume_epoch + 1)  # the stats of the first trained epoch
+        logger.info(f"Batch sampler: {train_loader.batch_sampler}")
+        if hasattr(train_loader.batch_sampler, "padding_stats"):
+            logger.info(f"Batch sampler padding: {train_loader.batch_sampler.padding_stats()}")
     for epoch in range(resume_epoch + 1, max_epoch):
-        train_loader.sampler.set_epoch(epoch)
+        if hasattr(train_loader.batch_sampler, "set_epoch"):
+            train_loader.batch_sampler.set_epoch(epoch)
+        else:
+            train_loader.sampler.set_epoch(epoch)
 
         # train for one epoch
         train_one_epoch(